@@ -1,103 +1,122 @@
-import pandas as pd
-import networkx as nx
 import matplotlib.pyplot as plt
-import numpy as np
 from scipy.stats import spearmanr
-from collections import defaultdict, Counter
-
-# ----------------------
-# Load and clean the data
-# ----------------------
-df = pd.read_csv("/Users/loganbarrios/NetBIMAS/Simulation_Runs_2lights/1-bacteria-path-data.csv")
-df = df[df['who'] != 'who']
-numeric_cols = ['who', 'tick', 'start-x', 'start-y', 'end-x', 'end-y', 'total-distance', 'straight-line', 'efficiency']
-df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
-df = df.dropna(subset=numeric_cols)
-df = df.sort_values(by='tick').drop_duplicates(subset='who', keep='last').reset_index(drop=True)
-df['end-coords'] = list(zip(df['end-x'].round(3), df['end-y'].round(3)))
-
-# ----------------------
-# Build Empirical Network
-# ----------------------
-G = nx.Graph()
-for _, row in df.iterrows():
-    node = f"Cell-{row['who']}"
-    G.add_node(node)
-# Group by shared endpoints
-path_groups = defaultdict(list)
-for _, row in df.iterrows():
-    path_groups[row['end-coords']].append(f"Cell-{row['who']}")
-for group in path_groups.values():
-    for i in range(len(group)):
-        for j in range(i + 1, len(group)):
-            G.add_edge(group[i], group[j], weight=1.0)
-
-# ----------------------
-# Chung-Lu Null Models
-# ----------------------
-num_nulls = 10000
-degrees = [deg for _, deg in G.degree()]
-null_clustering = []
-null_efficiencies = []
-
-for _ in range(num_nulls):
-    G_null = nx.expected_degree_graph(degrees, selfloops=False)
-    null_clustering.append(nx.average_clustering(G_null))
-    if nx.is_connected(G_null):
-        null_efficiencies.append(nx.global_efficiency(G_null))
+
+from netbimas.clique_metrics import graph_metrics
+from netbimas.graph import shared_endpoint_graph
+from netbimas.loader import load_path_data
+from netbimas.accumulators import Histogram, QuantileSketch
+from netbimas.ensemble import run_ensemble
+from netbimas.nulls import chung_lu_metric_chunk
+from netbimas.sequential import sequential_test
+
+def main(sequential=False):
+    # ----------------------
+    # Load and clean the data
+    # ----------------------
+    df = load_path_data("/Users/loganbarrios/NetBIMAS/Simulation_Runs_2lights/1-bacteria-path-data.csv")
+
+    # ----------------------
+    # Build Empirical Network
+    # ----------------------
+    # Group by shared endpoints (rounded to 3 decimals)
+    G = shared_endpoint_graph(df)
+
+    # ----------------------
+    # Chung-Lu Null Models
+    # ----------------------
+    num_nulls = 10000
+    degrees = [deg for _, deg in G.degree()]
+
+    # ----------------------
+    # Real Network Metrics
+    # ----------------------
+    real_metrics = graph_metrics(G)
+    real_clustering = real_metrics['avg_clustering']
+    real_efficiency = real_metrics['global_eff']
+
+    print(f"Empirical Clustering: {real_clustering:.4f}")
+    print(f"Empirical Global Efficiency: {real_efficiency:.4f}")
+
+    # Chunks run on every core, each from its own SeedSequence child stream
+    # (set seed= for reproducible, worker-count independent results); only
+    # the histogram and quantile sketches are kept, not every replicate
+    null_clustering = Histogram(0, 1, bins=20)
+    null_clustering_q = QuantileSketch()
+    null_efficiency_q = QuantileSketch()
+
+    def fold(batch):
+        null_clustering.update(batch[:, 0])
+        null_clustering_q.update(batch[:, 0])
+        null_efficiency_q.update(batch[:, 1])
+
+    if sequential:
+        # Sequential mode: replicates are drawn in growing batches until both
+        # p-values are resolved against alpha, using at most num_nulls
+        test = sequential_test(chung_lu_metric_chunk, [real_clustering, real_efficiency], args=(degrees,),
+                               max_replicates=num_nulls, on_batch=fold, chunk_size=250, workers=None)
+        print(f"Chung-Lu replicates used: {test['n']} ({test['stopped']})")
     else:
-        # take the largest connected component
-        largest_cc = max(nx.connected_components(G_null), key=len)
-        G_sub = G_null.subgraph(largest_cc)
-        null_efficiencies.append(nx.global_efficiency(G_sub))
-
-# ----------------------
-# Real Network Metrics
-# ----------------------
-real_clustering = nx.average_clustering(G)
-real_efficiency = nx.global_efficiency(G)
-
-print(f"Empirical Clustering: {real_clustering:.4f}")
-print(f"Empirical Global Efficiency: {real_efficiency:.4f}")
-
-# ----------------------
-# Degree vs Distance
-# ----------------------
-node_to_distance = {
-    f"Cell-{row['who']}": row['total-distance']
-    for _, row in df.iterrows()
-}
-degrees = dict(G.degree())
-degree_list = []
-distance_list = []
-
-for node in G.nodes():
-    if node in node_to_distance:
-        degree_list.append(degrees[node])
-        distance_list.append(node_to_distance[node])
-
-rho, pval = spearmanr(degree_list, distance_list)
-print(f"Spearman Correlation (Degree vs Distance): rho = {rho:.3f}, p = {pval:.4f}")
-
-# ----------------------
-# Visualizations
-# ----------------------
-fig, ax = plt.subplots(1, 2, figsize=(12, 5))
-
-# Left: Clustering Distribution
-ax[0].hist(null_clustering, bins=20, alpha=0.7, label='Chung-Lu Null')
-ax[0].axvline(real_clustering, color='red', linestyle='--', label='Empirical')
-ax[0].set_title("Clustering Coefficient")
-ax[0].set_xlabel("Average Clustering")
-ax[0].set_ylabel("Frequency")
-ax[0].legend()
-
-# Right: Degree vs Distance (scatter)
-ax[1].scatter(degree_list, distance_list, alpha=0.7, s=40, c='green')
-ax[1].set_xlabel("Degree")
-ax[1].set_ylabel("Travel Distance")
-ax[1].set_title("Degree vs. Travel Distance")
-
-plt.tight_layout()
-plt.show()
-plt.savefig("degree_vs_distance.png", dpi=300)
+        run_ensemble(chung_lu_metric_chunk, num_nulls, args=(degrees,), chunk_size=250, workers=None,
+                     reduce=lambda acc, chunk: fold(chunk), progress=True)
+
+    for i, (name, sketch) in enumerate((("Clustering", null_clustering_q),
+                                        ("Global Efficiency", null_efficiency_q))):
+        lo, mid, hi = sketch.quantile([0.025, 0.5, 0.975])
+        line = f"Null {name}: median {mid:.4f}, 95% interval [{lo:.4f}, {hi:.4f}]"
+        if sequential:
+            line += (f"; z = {test['z'][i]:.2f}, p = {test['p_value'][i]:.4f} "
+                     f"[{test['p_low'][i]:.4f}, {test['p_high'][i]:.4f}]")
+        print(line)
+
+    # ----------------------
+    # Degree vs Distance
+    # ----------------------
+    node_to_distance = {
+        f"Cell-{who}": dist
+        for who, dist in zip(df['who'], df['total-distance'])
+    }
+    degrees = dict(G.degree())
+    degree_list = []
+    distance_list = []
+
+    for node in G.nodes():
+        if node in node_to_distance:
+            degree_list.append(degrees[node])
+            distance_list.append(node_to_distance[node])
+
+    rho, pval = spearmanr(degree_list, distance_list)
+    print(f"Spearman Correlation (Degree vs Distance): rho = {rho:.3f}, p = {pval:.4f}")
+
+    # ----------------------
+    # Visualizations
+    # ----------------------
+    fig, ax = plt.subplots(1, 2, figsize=(12, 5))
+
+    # Left: Clustering Distribution
+    ax[0].hist(null_clustering.centers, bins=null_clustering.edges, weights=null_clustering.counts,
+               alpha=0.7, label='Chung-Lu Null')
+    ax[0].axvline(real_clustering, color='red', linestyle='--', label='Empirical')
+    ax[0].set_title("Clustering Coefficient")
+    ax[0].set_xlabel("Average Clustering")
+    ax[0].set_ylabel("Frequency")
+    ax[0].legend()
+
+    # Right: Degree vs Distance (scatter)
+    ax[1].scatter(degree_list, distance_list, alpha=0.7, s=40, c='green')
+    ax[1].set_xlabel("Degree")
+    ax[1].set_ylabel("Travel Distance")
+    ax[1].set_title("Degree vs. Travel Distance")
+
+    plt.tight_layout()
+    # Save before show: closing the window leaves an empty current figure
+    plt.savefig("degree_vs_distance.png", dpi=300)
+    plt.show()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shared-endpoint network against Chung-Lu nulls")
+    parser.add_argument('--sequential', action='store_true',
+                        help="stop drawing nulls once both p-values are decided (at most num_nulls)")
+    main(parser.parse_args().sequential)
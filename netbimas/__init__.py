@@ -0,0 +1 @@
+"""Analysis tools for the cyanobacteria NetLogo model (cyano_final)."""
@@ -0,0 +1,4 @@
+"""`python -m netbimas`: see `netbimas.cli`."""
+from netbimas.cli import main
+
+main()
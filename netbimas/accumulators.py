@@ -0,0 +1,193 @@
+"""Streaming, mergeable summaries of null-model ensembles.
+
+Each accumulator takes replicates in batches with `update` and combines with
+another accumulator of the same shape with `merge`, so chunk results from
+`netbimas.ensemble` can be folded as they arrive and memory stays bounded
+no matter how many replicates are drawn:
+
+- `Moments`: count, mean and variance per column (Welford / Chan et al.)
+- `Histogram`: fixed bins over a known range, plus out-of-range counts
+- `QuantileSketch`: KLL quantile sketch with deterministic compaction
+
+`merge` returns the accumulator itself, so `run_ensemble(..., reduce=merge)`
+style folds work directly.
+"""
+import numpy as np
+
+
+def merge(acc, other):
+    """Reduce function for `run_ensemble`: fold `other` into `acc`."""
+    return acc.merge(other)
+
+
+# --------------------
+# Mean and variance
+# --------------------
+class Moments:
+    """Running mean and variance of `width` columns (scalar if width is None)."""
+
+    def __init__(self, width=None):
+        shape = () if width is None else (width,)
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+    def update(self, values):
+        """Add a batch of replicates, one per row of `values`."""
+        values = np.asarray(values, dtype=np.float64).reshape((-1,) + self.mean.shape)
+        if not len(values):
+            return self
+        batch = Moments()
+        batch.count = len(values)
+        batch.mean = values.mean(axis=0)
+        batch.m2 = ((values - batch.mean) ** 2).sum(axis=0)
+        return self.merge(batch)
+
+    def merge(self, other):
+        """Combine with another `Moments` (Chan et al. pairwise update)."""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / total)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / total)
+        self.count = total
+        return self
+
+    def variance(self, ddof=0):
+        if self.count - ddof <= 0:
+            return np.full(self.mean.shape, np.nan)
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        return np.sqrt(self.variance(ddof))
+
+
+# --------------------
+# Histograms
+# --------------------
+class Histogram:
+    """Counts in `bins` equal-width bins over [lo, hi].
+
+    Values below `lo` or above `hi` go to `underflow`/`overflow`; NaNs are
+    counted in `missing`. The last bin includes `hi`, as in np.histogram.
+    """
+
+    def __init__(self, lo, hi, bins=50):
+        self.edges = np.linspace(lo, hi, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.missing = 0
+
+    @property
+    def centers(self):
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    @property
+    def count(self):
+        return int(self.counts.sum()) + self.underflow + self.overflow + self.missing
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        nan = np.isnan(values)
+        self.missing += int(nan.sum())
+        values = values[~nan]
+        self.underflow += int((values < self.edges[0]).sum())
+        self.overflow += int((values > self.edges[-1]).sum())
+        self.counts += np.histogram(values, bins=self.edges)[0]
+        return self
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("histograms have different bins")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.missing += other.missing
+        return self
+
+
+# --------------------
+# Quantiles
+# --------------------
+class QuantileSketch:
+    """KLL sketch of a scalar distribution (Karnin, Lang & Liberty 2016).
+
+    Level h holds items of weight 2**h. While the sketch is over capacity
+    its lowest full level is sorted and every other item is promoted to the
+    next level; the kept half alternates between even and odd positions per
+    level instead of being chosen at random, so the sketch is a
+    deterministic function of the update and merge order. Rank error is
+    about 1.7 / k of the count. NaNs are ignored.
+    """
+
+    def __init__(self, k=200):
+        self.k = k
+        self.count = 0
+        self.levels = [np.zeros(0)]
+        self._offsets = [0]
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        # Compact the lowest full level until everything fits again
+        while sum(level.size for level in self.levels) > \
+                sum(self._capacity(h) for h in range(len(self.levels))):
+            h = next(h for h in range(len(self.levels)) if self.levels[h].size >= self._capacity(h))
+            if h + 1 == len(self.levels):
+                self.levels.append(np.zeros(0))
+                self._offsets.append(0)
+            items = np.sort(self.levels[h])
+            # An odd item out stays behind at its current weight
+            odd = items.size % 2
+            promoted = items[odd + self._offsets[h]::2]
+            self._offsets[h] ^= 1
+            self.levels[h] = items[:odd]
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += values.size
+        self._compress()
+        return self
+
+    def merge(self, other):
+        if other.k != self.k:
+            raise ValueError("sketches have different k")
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.zeros(0))
+                self._offsets.append(0)
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Approximate quantile(s) `q` in [0, 1]; nan when empty."""
+        q = np.asarray(q, dtype=np.float64)
+        if self.count == 0:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+        items, cum = self._weighted()
+        idx = np.searchsorted(cum, q * cum[-1], side='left')
+        out = items[np.minimum(idx, items.size - 1)]
+        return out if q.ndim else float(out)
+
+    def rank(self, x):
+        """Approximate fraction of values <= `x`."""
+        if self.count == 0:
+            return np.nan
+        items, cum = self._weighted()
+        i = np.searchsorted(items, x, side='right')
+        return float(cum[i - 1] / cum[-1]) if i else 0.0
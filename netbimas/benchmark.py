@@ -0,0 +1,204 @@
+"""Stage benchmarks on synthetic path-data files.
+
+`benchmark_file` times every stage of the analysis on one CSV: load/clean
+(parse plus latest-per-`who`), dedup alone, the NPZ sidecar reload,
+quadrant assignment, endpoint codes and graph build, each closed-form
+metric and each null model. Every stage runs once untraced for its wall
+time and, with `memory=True`, once more under `tracemalloc` for its peak
+allocation (NumPy and pandas buffers included). The weighted endpoint null
+and the Chung-Lu clustering/efficiency null are skipped above `null_limit`
+cells: both compute all-pairs efficiencies, quadratic in the cell count.
+
+`run_benchmarks` generates (or reuses) one `netbimas.synthetic` file per
+agent count, benchmarks it and appends an entry per file to a JSON history
+together with the git commit, so `regressions` can compare a run with the
+last one on the same dataset.
+"""
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from netbimas import clique_metrics, nulls
+from netbimas.accumulators import Moments, merge
+from netbimas.catalog import QUADRANTS, analyze_path_data, quadrant_labels
+from netbimas.clique_metrics import group_sizes
+from netbimas.ensemble import run_ensemble
+from netbimas.graph import clique_adjacency, endpoint_codes
+from netbimas.loader import finalize, latest_per_who, load_path_data, parse_path_data, read_chunks
+from netbimas.synthetic import write_synthetic_csv
+
+HISTORY = 'benchmarks.json'
+NULL_LIMIT = 3000
+TOLERANCE = 1.25
+MIN_SECONDS = 0.01  # faster stages are too noisy to compare
+
+
+def measure(fn, *args, memory=True, **kwargs):
+    """Call `fn` and return `(result, seconds, peak bytes or None)`."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        del result
+        tracemalloc.start()
+        try:
+            result = fn(*args, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+
+def _raw_frame(path):
+    return pd.concat(read_chunks(path), ignore_index=True)
+
+
+def benchmark_file(path, n_nulls=100, seed=0, memory=True, null_limit=NULL_LIMIT):
+    """{stage: {'seconds', 'peak_mb'}} for one path-data CSV."""
+    stages = {}
+
+    def stage(name, fn, *args, **kwargs):
+        result, seconds, peak = measure(fn, *args, memory=memory, **kwargs)
+        stages[name] = {'seconds': seconds, 'peak_mb': None if peak is None else peak / 2 ** 20}
+        return result
+
+    df = stage('load_clean', parse_path_data, path)
+    raw = _raw_frame(path)
+    stage('dedup', lambda frame: finalize(latest_per_who(frame)), raw)
+    del raw
+    load_path_data(path)  # write the sidecar outside the timed reads
+    stage('load_sidecar', load_path_data, path)
+    quadrant = stage('quadrant', quadrant_labels, df['end-x'], df['end-y'])
+    codes = stage('endpoint_codes', endpoint_codes, df['end-x'], df['end-y'])
+    stage('graph_build', clique_adjacency, codes)
+
+    sizes = group_sizes(codes)
+    stage('global_eff', clique_metrics.global_efficiency, sizes)
+    stage('avg_clustering', clique_metrics.average_clustering, sizes)
+    stage('lcc_diameter', clique_metrics.diameter, sizes, largest=True)
+    stage('lcc_avg_path_length', clique_metrics.average_shortest_path_length, sizes, largest=True)
+    stage('modularity', clique_metrics.modularity, codes,
+          np.where(np.isin(quadrant, QUADRANTS), quadrant, None))
+    stage('node_closeness', clique_metrics.node_closeness, codes)
+    stage('summarize', clique_metrics.summarize, sizes)
+    stage('analyze_path_data', analyze_path_data, df)
+
+    degree = clique_metrics.node_degree(codes)
+    stage('chung_lu_degrees', run_ensemble, nulls.chung_lu_degree_chunk, n_nulls, args=(degree,),
+          chunk_size=10, seed=seed, reduce=merge, initial=Moments(max(len(degree), 1)))
+    if len(df) <= null_limit:
+        stage('endpoint_null', nulls.random_endpoint_null, df, n=n_nulls, seed=seed, weighted=True)
+        stage('chung_lu_metrics', run_ensemble, nulls.chung_lu_metric_chunk, n_nulls, args=(degree,),
+              chunk_size=250, seed=seed)
+    return stages
+
+
+# --------------------
+# History
+# --------------------
+def _commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def load_history(path=HISTORY):
+    """List of benchmark entries, oldest first."""
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return []
+
+
+def append_history(entries, path=HISTORY):
+    history = load_history(path) + list(entries)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as fh:
+        json.dump(history, fh, indent=1)
+    os.replace(tmp, path)
+    return history
+
+
+def regressions(history, tolerance=TOLERANCE, min_seconds=MIN_SECONDS):
+    """Stages of the newest entry per dataset slower than the previous entry.
+
+    Returns a DataFrame with the dataset, stage, both timings and their
+    ratio for every stage that got more than `tolerance` times slower and
+    took at least `min_seconds` in the newer run.
+    """
+    rows = []
+    latest = {}
+    for entry in history:
+        key = json.dumps(entry['dataset'], sort_keys=True)
+        latest.setdefault(key, []).append(entry)
+    for key, entries in latest.items():
+        if len(entries) < 2:
+            continue
+        before, after = entries[-2], entries[-1]
+        for name, result in after['stages'].items():
+            if name not in before['stages'] or result['seconds'] < min_seconds:
+                continue
+            ratio = result['seconds'] / before['stages'][name]['seconds'] \
+                if before['stages'][name]['seconds'] > 0 else np.inf
+            if ratio > tolerance:
+                rows.append({'dataset': key, 'stage': name, 'before': before['stages'][name]['seconds'],
+                             'after': result['seconds'], 'ratio': ratio,
+                             'commits': f"{before.get('commit')}..{after.get('commit')}"})
+    return pd.DataFrame(rows, columns=['dataset', 'stage', 'before', 'after', 'ratio', 'commits'])
+
+
+# --------------------
+# Suite
+# --------------------
+def run_benchmarks(agents=(1000, 10000, 100000), work_dir='benchmark-data', history=HISTORY,
+                   duplication=4.0, cluster_size=2.0, headers=10, n_nulls=100, seed=0, memory=True,
+                   null_limit=NULL_LIMIT, progress=False):
+    """Benchmark one synthetic file per agent count and append to `history`.
+
+    Files are written to `work_dir` once per parameter set and reused.
+    `history=None` skips writing. Returns the new entries.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    commit = _commit()
+    entries = []
+    for n in agents:
+        dataset = {'agents': int(n), 'duplication': duplication, 'cluster_size': cluster_size,
+                   'headers': headers, 'seed': seed}
+        path = os.path.join(work_dir, f"synthetic-{n}-d{duplication:g}-c{cluster_size:g}-h{headers}-s{seed}.csv")
+        if not os.path.exists(path):
+            write_synthetic_csv(path, n, headers=headers, duplication=duplication, cluster_size=cluster_size,
+                                seed=seed)
+        if progress:
+            print(f"[bench] {n} agents", flush=True)
+        entries.append({
+            'commit': commit,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'dataset': dataset,
+            'n_nulls': n_nulls,
+            'stages': benchmark_file(path, n_nulls, seed, memory, null_limit),
+        })
+    if history is not None:
+        append_history(entries, history)
+    return entries
+
+
+def stage_table(entries):
+    """Seconds (and peak MB) per stage and dataset size of benchmark entries."""
+    frames = {}
+    for entry in entries:
+        frames[entry['dataset']['agents']] = pd.DataFrame(entry['stages']).T
+    return pd.concat(frames, names=['agents', 'stage'])
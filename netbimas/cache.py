@@ -0,0 +1,131 @@
+"""Content-addressed on-disk cache for analysis results.
+
+A result is stored under a SHA-256 key built from the content hash of its
+input files, the metric name, its parameters and a version string that is
+bumped whenever the code computing the metric changes. Editing or replacing
+an input therefore misses the cache, while renaming or touching it does not.
+
+Entries live in one SQLite file (pickled, zlib-compressed). Each hit
+refreshes the entry's access time, and writes evict the least recently used
+entries until the store is under `max_bytes`. File digests are remembered by
+(path, size, mtime) so unchanged inputs are not rehashed.
+
+`force=True`, or NETBIMAS_FORCE=1 in the environment, recomputes and
+overwrites every result. NETBIMAS_CACHE sets the cache file.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+import zlib
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'netbimas', 'results.sqlite')
+MAX_BYTES = 256 * 2 ** 20
+HASH_BLOCK = 2 ** 20
+_MISSING = object()
+
+
+def file_digest(path):
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def result_key(name, digests, params=None, version='1'):
+    """Cache key for metric `name` of inputs with content `digests`."""
+    spec = json.dumps([name, list(digests), params or {}, str(version)], sort_keys=True, default=str)
+    return hashlib.sha256(spec.encode()).hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU store of pickled results keyed by `result_key`."""
+
+    def __init__(self, path=None, max_bytes=MAX_BYTES, force=None):
+        self.path = path or os.environ.get('NETBIMAS_CACHE') or DEFAULT_PATH
+        self.max_bytes = max_bytes
+        self.force = os.environ.get('NETBIMAS_FORCE', '') not in ('', '0') if force is None else force
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30)
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS results ("
+                             "key TEXT PRIMARY KEY, value BLOB, size INTEGER, accessed REAL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS digests ("
+                             "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT)")
+
+    def close(self):
+        self._db.close()
+
+    # --------------------
+    # Inputs
+    # --------------------
+    def digest(self, path):
+        """`file_digest(path)`, reused while the file's size and mtime are unchanged."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        row = self._db.execute("SELECT size, mtime_ns, digest FROM digests WHERE path = ?",
+                               (path,)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+        digest = file_digest(path)
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?)",
+                             (path, st.st_size, st.st_mtime_ns, digest))
+        return digest
+
+    def key(self, name, paths=(), params=None, version='1'):
+        return result_key(name, [self.digest(p) for p in paths], params, version)
+
+    # --------------------
+    # Results
+    # --------------------
+    def get(self, key, default=None):
+        row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default
+        with self._db:
+            self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def __contains__(self, key):
+        return self._db.execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
+
+    def put(self, key, value):
+        blob = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                             (key, blob, len(blob), time.time()))
+        self.evict()
+
+    def evict(self, max_bytes=None):
+        """Drop least recently used entries until the store fits in `max_bytes`."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= limit:
+            return
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if total <= limit:
+                break
+            doomed.append((key,))
+            total -= size
+        with self._db:
+            self._db.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._db:
+            self._db.execute("DELETE FROM results")
+
+    def cached(self, name, fn, paths=(), params=None, version='1'):
+        """`fn()` for metric `name` of input files `paths`, from the cache if present."""
+        key = self.key(name, paths, params, version)
+        value = _MISSING if self.force else self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = fn()
+        self.put(key, value)
+        return value
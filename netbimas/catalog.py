@@ -0,0 +1,164 @@
+"""Catalog of simulation runs and a parallel comparison engine.
+
+A run directory holds one `N-bacteria-path-data.csv` per NetLogo run.
+`discover_runs` finds them, `analyze_run` loads one file once and computes
+every metric compare.py reports (plus, with `n_nulls`, a Chung-Lu null
+ensemble), and `compare_runs` maps it over a process pool, collecting the
+results into DataFrames indexed by run number. With a
+`netbimas.cache.ResultCache`, runs whose CSV content and parameters
+(rounding, quadrant set, null count and seed) are unchanged are read back
+instead of recomputed; bump ANALYSIS_VERSION when `analyze_run` changes.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from netbimas import clique_metrics, profiling
+from netbimas.accumulators import Moments
+from netbimas.cache import ResultCache
+from netbimas.clique_metrics import group_sizes
+from netbimas.ensemble import run_ensemble
+from netbimas.graph import endpoint_codes
+from netbimas.loader import load_path_data
+from netbimas.nulls import NULL_VERSION, chung_lu_metric_chunk
+
+RUN_PATTERN = re.compile(r'^(\d+)-bacteria-path-data\.csv$')
+QUADRANTS = ('Q1', 'Q3')
+ANALYSIS_VERSION = '2'
+
+
+def discover_runs(run_dir):
+    """{run number: path} of every run CSV in `run_dir`, sorted by run."""
+    runs = {}
+    for name in os.listdir(run_dir):
+        match = RUN_PATTERN.match(name)
+        if match:
+            runs[int(match.group(1))] = os.path.join(run_dir, name)
+    return dict(sorted(runs.items()))
+
+
+def quadrant_labels(x, y):
+    """'Q1' to 'Q4' counter-clockwise from x > 0 and y > 0; 'Other' on an axis."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    return np.select([(x > 0) & (y > 0), (x < 0) & (y > 0), (x < 0) & (y < 0), (x > 0) & (y < 0)],
+                     ['Q1', 'Q2', 'Q3', 'Q4'], 'Other')
+
+
+# --------------------
+# Per-run metrics
+# --------------------
+def analyze_run(path, decimals=3, quadrants=QUADRANTS, n_nulls=0, seed=0):
+    """All compare.py metrics of one run CSV, loaded once (see `analyze_path_data`)."""
+    return analyze_path_data(load_path_data(path), decimals, quadrants, n_nulls, seed)
+
+
+def chung_lu_null(degree, n_nulls, seed=0):
+    """Mean and SD of Chung-Lu clustering and efficiency for a degree sequence."""
+    null = run_ensemble(chung_lu_metric_chunk, n_nulls, args=(degree,), chunk_size=250, seed=seed,
+                        reduce=lambda acc, chunk: acc.update(chunk), initial=Moments(2))
+    std = null.std(ddof=1)
+    return {
+        'clustering_null_mean': null.mean[0],
+        'clustering_null_std': std[0],
+        'global_eff_null_mean': null.mean[1],
+        'global_eff_null_std': std[1],
+    }
+
+
+@profiling.profiled('metric')
+def analyze_path_data(df, decimals=3, quadrants=QUADRANTS, n_nulls=0, seed=0):
+    """All compare.py metrics of one run's latest path records.
+
+    Returns `(metrics, degree_counts)`: a flat dict of scalars and the
+    number of cells per degree in the full shared-endpoint graph. With
+    `n_nulls`, the metrics include `chung_lu_null` of that degree sequence.
+    """
+    quadrants = tuple(quadrants)
+    quadrant = quadrant_labels(df['end-x'], df['end-y'])
+    codes = endpoint_codes(df['end-x'], df['end-y'], decimals)
+    degree = clique_metrics.node_degree(codes)
+
+    # Cells in `quadrants` plus any other cell that shares an endpoint; the
+    # network is a union of cliques, one per endpoint group code
+    keep = np.isin(quadrant, quadrants) | (degree > 0)
+    kept_codes = codes[keep]
+    kept_quadrant = quadrant[keep]
+    kept_sizes = group_sizes(kept_codes)
+    metrics = {
+        'global_eff': clique_metrics.global_efficiency(kept_sizes),
+        'modularity': clique_metrics.modularity(
+            kept_codes, np.where(np.isin(kept_quadrant, quadrants), kept_quadrant, None)),
+        'clustering': clique_metrics.average_clustering(kept_sizes),
+    }
+    for q in quadrants:
+        in_q = kept_quadrant == q
+        metrics[f'{q.lower()}_eff'] = (clique_metrics.global_efficiency(group_sizes(kept_codes, in_q))
+                                       if in_q.sum() > 1 else np.nan)
+        metrics[f'n_{q.lower()}'] = int(in_q.sum())
+
+    # Quadrant subgraphs of every cell ending there
+    for q in quadrants:
+        in_q = quadrant == q
+        summary = clique_metrics.summarize(group_sizes(codes, in_q))
+        prefix = f'{q.lower()}_community'
+        metrics[f'{prefix}_eff'] = summary['global_eff']
+        metrics[f'{prefix}_clustering'] = summary['avg_clustering']
+        metrics[f'{prefix}_path_length'] = summary['avg_path_length']  # nan if disconnected
+        metrics[f'{prefix}_closeness'] = summary['avg_closeness']
+        metrics[f'{prefix}_betweenness'] = summary['avg_betweenness']
+        metrics[f'{prefix}_nodes'] = int(in_q.sum())
+    if n_nulls:
+        metrics.update(chung_lu_null(degree, n_nulls, seed))
+
+    degree_counts = np.bincount(degree) if degree.size else np.zeros(0, dtype=np.int64)
+    return metrics, degree_counts
+
+
+def compare_runs(runs, workers=None, decimals=3, cache=None, quadrants=QUADRANTS, n_nulls=0, seed=0):
+    """Run `analyze_run` over `runs` ({run: path} or a run directory).
+
+    Runs go to a process pool of `workers` (None for every core, 1 to stay
+    in-process). `cache` may be a `ResultCache`, or True for the default
+    one. `n_nulls` Chung-Lu replicates from `seed` are drawn per run (none
+    by default). Returns `(metrics, degrees)`: one row per run with a column
+    per metric, and the node count per degree of every run.
+    """
+    if isinstance(runs, (str, os.PathLike)):
+        runs = discover_runs(runs)
+    if cache is True:
+        cache = ResultCache()
+    paths = list(runs.values())
+    quadrants = tuple(quadrants)
+    params = {'decimals': decimals, 'quadrants': list(quadrants), 'n_nulls': n_nulls, 'seed': seed}
+    analyze = partial(analyze_run, decimals=decimals, quadrants=quadrants, n_nulls=n_nulls, seed=seed)
+
+    results = [None] * len(paths)
+    keys = [None] * len(paths)
+    if cache is not None:
+        for i, path in enumerate(paths):
+            keys[i] = cache.key('analyze_run', [path], params, f'{ANALYSIS_VERSION}/{NULL_VERSION}')
+            if not cache.force:
+                results[i] = cache.get(keys[i])
+    todo = [i for i, result in enumerate(results) if result is None]
+    if workers == 1 or len(todo) <= 1:
+        computed = [analyze(paths[i]) for i in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            computed = [profiling.collect(r) for r in pool.map(profiling.captured(analyze),
+                                                               [paths[i] for i in todo])]
+    for i, result in zip(todo, computed):
+        results[i] = result
+        if cache is not None:
+            cache.put(keys[i], result)
+
+    index = pd.Index(list(runs), name='run')
+    metrics = pd.DataFrame([m for m, _ in results], index=index)
+    width = max((len(c) for _, c in results), default=0)
+    degrees = pd.DataFrame([np.pad(c, (0, width - len(c))) for _, c in results],
+                           index=index, columns=pd.RangeIndex(width, name='degree'))
+    return metrics, degrees
@@ -0,0 +1,266 @@
+"""The `netbimas` command.
+
+    python -m netbimas metrics bacteria-path-data.csv
+    python -m netbimas metrics bacteria-path-data.csv --metric global_eff
+    python -m netbimas nulls bacteria-path-data.csv --max-replicates 10000
+    python -m netbimas compare Simulation_Runs_2lights
+    python -m netbimas report Simulation_Runs_2lights figures/
+    python -m netbimas simulate --ticks 750 --seed 1 --out run.nbev
+    python -m netbimas ingest bacteria-path-data.csv
+    python -m netbimas synth synthetic.csv --agents 100000
+    python -m netbimas bench --agents 1000 10000 100000 --history benchmarks.json
+    python -m netbimas --profile --trace trace.json compare Simulation_Runs_2lights
+
+Every subcommand imports its dependencies when it runs, so `metrics` never
+loads networkx, matplotlib or the null-model machinery.
+"""
+import argparse
+import json
+import sys
+
+
+def _print_metrics(metrics, as_json):
+    if as_json:
+        print(json.dumps(metrics, default=float, indent=1))
+    else:
+        width = max(map(len, metrics), default=0)
+        for name, value in metrics.items():
+            print(f"{name:<{width}}  {value:.4f}" if isinstance(value, float) else f"{name:<{width}}  {value}")
+
+
+# --------------------
+# Subcommands
+# --------------------
+def cmd_ingest(args):
+    from netbimas.events import convert_csv, read_events
+
+    out = convert_csv(args.path, args.out, latest=not args.all)
+    print(f"{out}: {len(read_events(out))} records")
+
+
+def cmd_metrics(args):
+    from netbimas import clique_metrics
+    from netbimas.clique_metrics import group_sizes
+    from netbimas.graph import endpoint_codes
+    from netbimas.loader import load_path_data
+
+    df = load_path_data(args.path)
+    codes = endpoint_codes(df['end-x'], df['end-y'], args.decimals)
+    metrics = clique_metrics.summarize(group_sizes(codes), nest=args.nest)
+    if args.metric:
+        unknown = [name for name in args.metric if name not in metrics]
+        if unknown:
+            sys.exit(f"unknown metric(s) {', '.join(unknown)}; choose from {', '.join(metrics)}")
+        metrics = {name: metrics[name] for name in args.metric}
+        if len(metrics) == 1 and not args.json:
+            print(next(iter(metrics.values())))
+            return
+    _print_metrics(metrics, args.json)
+
+
+def cmd_nulls(args):
+    from netbimas import clique_metrics
+    from netbimas.clique_metrics import group_sizes
+    from netbimas.graph import endpoint_codes
+    from netbimas.loader import load_path_data
+    from netbimas.nulls import chung_lu_metric_chunk
+    from netbimas.sequential import sequential_test
+
+    df = load_path_data(args.path)
+    codes = endpoint_codes(df['end-x'], df['end-y'], args.decimals)
+    sizes = group_sizes(codes)
+    observed = [clique_metrics.average_clustering(sizes), clique_metrics.global_efficiency(sizes)]
+    test = sequential_test(chung_lu_metric_chunk, observed, args=(clique_metrics.node_degree(codes),),
+                           alpha=args.alpha, min_replicates=args.min_replicates,
+                           max_replicates=args.max_replicates, seed=args.seed, workers=args.workers,
+                           chunk_size=250)
+    out = {'replicates': test['n'], 'stopped': test['stopped']}
+    for i, name in enumerate(('avg_clustering', 'global_eff')):
+        out.update({name: observed[i], f'{name}_null_mean': test['null_mean'][i],
+                    f'{name}_null_std': test['null_std'][i], f'{name}_z': test['z'][i],
+                    f'{name}_p': test['p_value'][i]})
+    _print_metrics(out, args.json)
+
+
+def cmd_compare(args):
+    import pandas as pd
+
+    from netbimas.cache import ResultCache
+    from netbimas.catalog import compare_runs
+
+    metrics, _ = compare_runs(args.run_dir, workers=args.workers, decimals=args.decimals,
+                              cache=None if args.no_cache else ResultCache(force=args.force or None),
+                              n_nulls=args.nulls, seed=args.seed)
+    if args.out:
+        metrics.to_csv(args.out)
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(metrics[list(args.columns)] if args.columns else metrics)
+
+
+def cmd_report(args):
+    import os
+
+    from netbimas.report import FIGURES, render_report, render_run
+
+    options = dict(figures=args.figures or FIGURES, n_nulls=args.nulls, seed=args.seed,
+                   decimals=args.decimals, dpi=args.dpi, force=args.force)
+    if os.path.isdir(args.runs):
+        status = render_report(args.runs, args.out_dir, workers=args.workers, **options)
+        print(status.to_string())
+    else:
+        for name, state in render_run(args.runs, args.out_dir, **options).items():
+            print(f"{name}: {state}")
+
+
+def cmd_simulate(args):
+    import os
+
+    from netbimas.simulator import Simulation
+
+    sim = Simulation(seed=args.seed, log=args.log)
+    if args.trails:
+        from netbimas.trails import TrailRecorder
+
+        with TrailRecorder(args.trails, sim.trail.shape, every=args.trail_every, compress=True) as recorder:
+            sim.run(args.ticks, recorder)
+    else:
+        sim.run(args.ticks)
+    if args.out.endswith('.nbev'):
+        # Event files are appended to; replace instead, as the CSV is
+        tmp = f"{args.out}.{os.getpid()}.tmp"
+        sim.write_events(tmp)
+        os.replace(tmp, args.out)
+    else:
+        sim.to_csv(args.out)
+    print(f"{args.out}: {len(sim.path_data())} finished cells of {sim.n} after {sim.ticks} ticks")
+
+
+def cmd_synth(args):
+    from netbimas.synthetic import write_synthetic_csv
+
+    write_synthetic_csv(args.out, args.agents, headers=args.headers, duplication=args.duplication,
+                        cluster_size=args.cluster_size, seed=args.seed)
+    print(f"{args.out}: {args.agents} agents")
+
+
+def cmd_bench(args):
+    import pandas as pd
+
+    from netbimas.benchmark import load_history, regressions, run_benchmarks, stage_table
+
+    entries = run_benchmarks(args.agents, args.work_dir, args.history or None, duplication=args.duplication,
+                             cluster_size=args.cluster_size, headers=args.headers, n_nulls=args.nulls,
+                             seed=args.seed, memory=not args.no_memory, progress=True)
+    with pd.option_context('display.max_rows', None, 'display.float_format', '{:.4f}'.format):
+        print(stage_table(entries).unstack('agents'))
+    if args.history:
+        slower = regressions(load_history(args.history), args.tolerance)
+        if len(slower):
+            print(f"\nStages more than {args.tolerance:g}x slower than the previous run:")
+            print(slower.to_string(index=False))
+
+
+# --------------------
+# Arguments
+# --------------------
+def build_parser():
+    parser = argparse.ArgumentParser(prog='netbimas', description=__doc__.splitlines()[0])
+    parser.add_argument('--profile', action='store_true',
+                        help="record stage timings (also NETBIMAS_PROFILE=<trace>)")
+    parser.add_argument('--trace', default='netbimas-trace.json', help="Chrome trace written by --profile")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('ingest', help="convert a path-data CSV to a binary event file")
+    p.add_argument('path', help="bacteria-path-data CSV")
+    p.add_argument('--out', help="event file (default: next to the CSV, .nbev)")
+    p.add_argument('--all', action='store_true', help="keep every row, not only the latest per cell")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser('metrics', help="shared-endpoint network metrics of one run")
+    p.add_argument('path', help="bacteria-path-data CSV or .nbev file")
+    p.add_argument('--metric', action='append', help="print only this metric (repeatable)")
+    p.add_argument('--nest', action='store_true', help="include the Nest star")
+    p.add_argument('--decimals', type=int, default=3, help="rounding of end-coords")
+    p.add_argument('--json', action='store_true', help="print JSON")
+    p.set_defaults(func=cmd_metrics)
+
+    p = sub.add_parser('nulls', help="Chung-Lu null test of clustering and efficiency")
+    p.add_argument('path', help="bacteria-path-data CSV or .nbev file")
+    p.add_argument('--alpha', type=float, default=0.05)
+    p.add_argument('--min-replicates', type=int, default=100)
+    p.add_argument('--max-replicates', type=int, default=10000)
+    p.add_argument('--seed', type=int)
+    p.add_argument('--workers', type=int, help="worker processes (default: every core)")
+    p.add_argument('--decimals', type=int, default=3, help="rounding of end-coords")
+    p.add_argument('--json', action='store_true', help="print JSON")
+    p.set_defaults(func=cmd_nulls)
+
+    p = sub.add_parser('compare', help="metrics of every run in a run directory")
+    p.add_argument('run_dir', help="directory of N-bacteria-path-data.csv files")
+    p.add_argument('--columns', nargs='+', help="metrics to print")
+    p.add_argument('--out', help="also write the table to this CSV")
+    p.add_argument('--workers', type=int, help="worker processes (default: every core)")
+    p.add_argument('--no-cache', action='store_true', help="do not use the result cache")
+    p.add_argument('--force', action='store_true', help="recompute and overwrite cached results")
+    p.add_argument('--nulls', type=int, default=0, help="Chung-Lu replicates per run")
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--decimals', type=int, default=3, help="rounding of end-coords")
+    p.set_defaults(func=cmd_compare)
+
+    p = sub.add_parser('report', help="render the figures of a run or run directory")
+    p.add_argument('runs', help="run directory or one path-data file")
+    p.add_argument('out_dir', help="output directory")
+    p.add_argument('--figures', nargs='+', help="figures to render (default: all)")
+    p.add_argument('--nulls', type=int, default=1000, help="Chung-Lu replicates per run")
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--dpi', type=int, default=150)
+    p.add_argument('--workers', type=int, help="worker processes (default: every core)")
+    p.add_argument('--force', action='store_true', help="redraw unchanged figures")
+    p.add_argument('--decimals', type=int, default=3, help="rounding of end-coords")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser('simulate', help="run the headless model and write its path data")
+    p.add_argument('--ticks', type=int, default=750)
+    p.add_argument('--seed', type=int)
+    p.add_argument('--out', default='bacteria-path-data.csv', help="CSV, or .nbev for an event file")
+    p.add_argument('--log', action='store_true', help="write every save, not only the latest per cell")
+    p.add_argument('--trails', help="also record trail frames to this file")
+    p.add_argument('--trail-every', type=int, default=1, help="ticks between trail frames")
+    p.set_defaults(func=cmd_simulate)
+
+    def add_dataset_options(p):
+        p.add_argument('--duplication', type=float, default=4.0, help="mean rows per agent")
+        p.add_argument('--cluster-size', type=float, default=2.0, help="mean agents per shared endpoint")
+        p.add_argument('--headers', type=int, default=10, help="repeated header lines")
+        p.add_argument('--seed', type=int, default=0)
+
+    p = sub.add_parser('synth', help="write a synthetic path-data CSV")
+    p.add_argument('out', help="CSV to write")
+    p.add_argument('--agents', type=int, default=1000)
+    add_dataset_options(p)
+    p.set_defaults(func=cmd_synth)
+
+    p = sub.add_parser('bench', help="time each analysis stage on synthetic files")
+    p.add_argument('--agents', type=int, nargs='+', default=[1000, 10000, 100000])
+    p.add_argument('--work-dir', default='benchmark-data', help="where the synthetic files are kept")
+    p.add_argument('--history', default='benchmarks.json', help="JSON history to append to ('' for none)")
+    p.add_argument('--nulls', type=int, default=100, help="replicates per null model")
+    p.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    p.add_argument('--tolerance', type=float, default=1.25, help="slowdown reported as a regression")
+    add_dataset_options(p)
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        # Before the subcommand imports anything, so every stage is wrapped
+        from netbimas import profiling
+
+        profiling.enable(args.trace)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
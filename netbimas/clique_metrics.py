@@ -0,0 +1,241 @@
+"""Exact network metrics for disjoint unions of cliques.
+
+The shared-endpoint graph is a disjoint union of cliques, one per rounded
+`end-coords` group, optionally with a 'Nest' node joined to every cell as in
+network_analysis.py. Every metric the scripts report then follows from the
+vector of group sizes in O(number of cells), with the same conventions as
+networkx (unweighted distances, `wf_improved` closeness, normalized
+betweenness). Where networkx raises for a disconnected graph, these return
+nan unless `largest=True` asks for the largest component.
+
+`graph_metrics` takes an arbitrary networkx graph and only falls back to the
+generic algorithms (sparse kernels from `netbimas.kernels` and networkx) when
+it is not clique-structured.
+"""
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from netbimas import profiling
+
+
+# --------------------
+# Group sizes
+# --------------------
+def group_sizes(codes, mask=None):
+    """Clique sizes from per-node group codes, optionally for a node subset.
+
+    The subgraph induced by any node subset of a clique union is again a
+    clique union, so per-quadrant subgraphs only need `mask`.
+    """
+    codes = np.asarray(codes)
+    if mask is not None:
+        codes = codes[np.asarray(mask, dtype=bool)]
+    sizes = np.bincount(codes) if codes.size else np.zeros(0, dtype=np.int64)
+    return sizes[sizes > 0].astype(np.int64)
+
+
+def clique_sizes(A):
+    """Component sizes if the symmetric adjacency `A` is a union of cliques.
+
+    Returns None when some component is not complete (or has self-loops).
+    """
+    A = sp.csr_array(A)
+    n = A.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if A.diagonal().any():
+        return None
+    _, labels = connected_components(A, directed=False)
+    sizes = np.bincount(labels)
+    degree = np.diff(A.indptr)
+    if not np.array_equal(degree, sizes[labels] - 1):
+        return None
+    return sizes
+
+
+def _sums(sizes):
+    sizes = np.asarray(sizes, dtype=np.int64)
+    n = int(sizes.sum())
+    return sizes, n, int((sizes * sizes).sum())
+
+
+# --------------------
+# Graph-level metrics
+# --------------------
+def global_efficiency(sizes, nest=False):
+    """nx.global_efficiency of the clique union (plus Nest star if `nest`)."""
+    sizes, n, sq = _sums(sizes)
+    within = sq - n  # ordered pairs at distance 1 inside a clique
+    if not nest:
+        return within / (n * (n - 1)) if n > 1 else 0.0
+    if n == 0:
+        return 0.0
+    cross = n * n - sq  # ordered cell pairs at distance 2 through the Nest
+    return (2 * n + within + cross / 2) / ((n + 1) * n)
+
+
+def average_clustering(sizes, nest=False):
+    """nx.average_clustering; nan for an empty graph."""
+    sizes, n, sq = _sums(sizes)
+    if not nest:
+        return sizes[sizes >= 3].sum() / n if n else np.nan
+    # With the Nest every cell in a clique of size >= 2 has clustering 1
+    nest_c = (sq - n) / (n * (n - 1)) if n > 1 else 0.0
+    return (sizes[sizes >= 2].sum() + nest_c) / (n + 1)
+
+
+def diameter(sizes, nest=False, largest=False):
+    """nx.diameter; nan if disconnected unless `largest` is set."""
+    sizes, n, _ = _sums(sizes)
+    if nest:
+        return 0 if n == 0 else (1 if sizes.size == 1 else 2)
+    if n == 0 or (sizes.size > 1 and not largest):
+        return np.nan
+    return 1 if sizes.max() > 1 else 0
+
+
+def average_shortest_path_length(sizes, nest=False, largest=False):
+    """nx.average_shortest_path_length; nan if disconnected unless `largest`."""
+    sizes, n, sq = _sums(sizes)
+    if nest:
+        if n == 0:
+            return 0.0
+        return (2 * n + (sq - n) + 2 * (n * n - sq)) / ((n + 1) * n)
+    if n == 0 or (sizes.size > 1 and not largest):
+        return np.nan
+    return 1.0 if sizes.max() > 1 else 0.0
+
+
+@profiling.profiled('metric')
+def modularity(codes, communities):
+    """nx modularity of the clique union for a node labelling `communities`.
+
+    `communities` gives one label per node; unlike networkx the labels do
+    not have to form a partition of every node (unlabelled nodes use None).
+    """
+    codes = np.asarray(codes)
+    sizes = np.bincount(codes) if codes.size else np.zeros(0, dtype=np.int64)
+    m = (sizes * (sizes - 1)).sum() / 2
+    if m == 0:
+        return np.nan
+    degree = sizes[codes] - 1
+    labels = np.asarray(communities, dtype=object)
+    q = 0.0
+    for label in set(labels.tolist()) - {None}:
+        in_c = labels == label
+        n_gc = np.bincount(codes[in_c], minlength=sizes.size)
+        internal = (n_gc * (n_gc - 1)).sum() / 2
+        q += internal / m - (degree[in_c].sum() / (2 * m)) ** 2
+    return q
+
+
+# --------------------
+# Node-level metrics
+# --------------------
+def node_degree(codes):
+    codes = np.asarray(codes)
+    return np.bincount(codes)[codes] - 1 if codes.size else np.zeros(0, dtype=np.int64)
+
+
+def node_clustering(codes):
+    """nx.clustering per node of the clique union (no Nest)."""
+    return (node_degree(codes) >= 2).astype(np.float64)
+
+
+def node_closeness(codes, nest=False):
+    """nx.closeness_centrality per cell; with `nest` the Nest itself has 1.0."""
+    codes = np.asarray(codes)
+    n = codes.size
+    k = node_degree(codes) + 1
+    if nest:
+        return n / (2 * n - k) if n else np.zeros(0)
+    return (k - 1) / (n - 1) if n > 1 else np.zeros(n)
+
+
+def nest_betweenness(sizes):
+    """Normalized betweenness of the Nest; every cell has betweenness 0."""
+    sizes, n, sq = _sums(sizes)
+    return (n * n - sq) / (n * (n - 1)) if n > 1 else 0.0
+
+
+@profiling.profiled('metric')
+def summarize(sizes, nest=False):
+    """All graph-level metrics of the scripts in one dict."""
+    sizes, n, sq = _sums(sizes)
+    nodes = n + 1 if nest else n
+    edges = (sq - n) // 2 + (n if nest else 0)
+    if nest:
+        closeness = (1.0 + (n * sizes / (2 * n - sizes)).sum()) / nodes if n else 0.0
+        betweenness = nest_betweenness(sizes) / nodes
+    else:
+        closeness = (sizes * (sizes - 1)).sum() / (n - 1) / n if n > 1 else 0.0
+        betweenness = 0.0
+    return {
+        'nodes': nodes,
+        'edges': edges,
+        'avg_degree': 2 * edges / nodes if nodes else np.nan,
+        'global_eff': global_efficiency(sizes, nest),
+        'avg_clustering': average_clustering(sizes, nest),
+        'diameter': diameter(sizes, nest),
+        'avg_path_length': average_shortest_path_length(sizes, nest),
+        'lcc_diameter': diameter(sizes, nest, largest=True),
+        'lcc_avg_path_length': average_shortest_path_length(sizes, nest, largest=True),
+        'avg_closeness': closeness if nodes else np.nan,
+        'avg_betweenness': betweenness if nodes else np.nan,
+    }
+
+
+# --------------------
+# networkx entry point
+# --------------------
+@profiling.profiled('metric', items=lambda summary: summary['nodes'])
+def _generic_summary(G):
+    import networkx as nx
+
+    from netbimas import kernels
+
+    nodes = G.number_of_nodes()
+    if nodes == 0:
+        return summarize([])
+    largest = G.subgraph(max(nx.connected_components(G), key=len))
+    connected = largest.number_of_nodes() == nodes
+    A = nx.to_scipy_sparse_array(G, weight=None)
+    return {
+        'nodes': nodes,
+        'edges': G.number_of_edges(),
+        'avg_degree': 2 * G.number_of_edges() / nodes,
+        'global_eff': kernels.global_efficiency(A),
+        'avg_clustering': kernels.average_clustering(A),
+        'diameter': nx.diameter(G) if connected else np.nan,
+        'avg_path_length': nx.average_shortest_path_length(G) if connected else np.nan,
+        'lcc_diameter': nx.diameter(largest),
+        'lcc_avg_path_length': nx.average_shortest_path_length(largest),
+        'avg_closeness': np.mean(list(nx.closeness_centrality(G).values())),
+        'avg_betweenness': np.mean(list(nx.betweenness_centrality(G).values())),
+    }
+
+
+@profiling.profiled('metric')
+def graph_metrics(G, nest=None):
+    """`summarize` for a networkx graph, generic networkx if not clique-structured.
+
+    `nest` names a hub node (e.g. 'Nest') that should be joined to every
+    other node; the closed form is used when removing it leaves a clique
+    union.
+    """
+    import networkx as nx
+
+    others = [node for node in G if node != nest]
+    if not others:
+        return summarize([], nest=nest is not None and nest in G)
+    if nest is not None and nest in G and G.degree(nest) == len(others) \
+            and not G.has_edge(nest, nest):
+        sizes = clique_sizes(nx.to_scipy_sparse_array(G, nodelist=others, weight=None))
+        if sizes is not None:
+            return summarize(sizes, nest=True)
+    elif nest is None or nest not in G:
+        sizes = clique_sizes(nx.to_scipy_sparse_array(G, weight=None))
+        if sizes is not None:
+            return summarize(sizes)
+    return _generic_summary(G)
@@ -0,0 +1,184 @@
+"""Deterministic chunked execution of null-model ensembles.
+
+An ensemble of `n_replicates` is split into fixed-size chunks. Chunk i draws
+from its own `numpy.random.SeedSequence` child (spawned in chunk order from
+the ensemble seed) and returns a reduced statistic rather than raw graphs.
+Results are folded in chunk order, so for a given seed and `chunk_size` the
+outcome is bit-identical whether the chunks run serially or on any number of
+worker processes.
+
+With `checkpoint` set, every finished chunk is written to that directory and
+an interrupted ensemble resumes from the chunks already on disk.
+
+Chunk functions run in worker processes, so they must be importable
+module-level functions, and scripts that call `run_ensemble` with workers
+need an `if __name__ == '__main__':` guard.
+"""
+import json
+import os
+import pickle
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from netbimas import profiling
+
+MANIFEST = 'manifest.json'
+
+
+def chunk_bounds(n_replicates, chunk_size):
+    """(start, stop) replicate ranges of every chunk."""
+    return [(start, min(start + chunk_size, n_replicates))
+            for start in range(0, n_replicates, chunk_size)]
+
+
+def _run_chunk(chunk_fn, size, seed_seq, args):
+    with profiling.stage(chunk_fn.__name__, 'null', items=size):
+        return chunk_fn(size, np.random.default_rng(seed_seq), *args)
+
+
+# --------------------
+# Checkpoints
+# --------------------
+def _chunk_path(checkpoint, i):
+    return os.path.join(checkpoint, f"chunk-{i:06d}.pkl")
+
+
+def _open_checkpoint(checkpoint, manifest):
+    """Create or validate a checkpoint directory; return the stored manifest."""
+    os.makedirs(checkpoint, exist_ok=True)
+    path = os.path.join(checkpoint, MANIFEST)
+    if os.path.exists(path):
+        with open(path) as fh:
+            stored = json.load(fh)
+        if manifest['entropy'] is None:
+            manifest['entropy'] = stored['entropy']
+        stored.setdefault('spawn_key', [])  # written before spawn keys were recorded
+        if stored != manifest:
+            raise ValueError(f"checkpoint {checkpoint} belongs to a different ensemble: {stored}")
+        return stored
+    if manifest['entropy'] is None:
+        manifest['entropy'] = np.random.SeedSequence().entropy
+    with open(path, 'w') as fh:
+        json.dump(manifest, fh)
+    return manifest
+
+
+def _save_chunk(checkpoint, i, result):
+    target = _chunk_path(checkpoint, i)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as fh:
+        pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, target)
+
+
+def _load_chunk(checkpoint, i):
+    with open(_chunk_path(checkpoint, i), 'rb') as fh:
+        return pickle.load(fh)
+
+
+# --------------------
+# Progress
+# --------------------
+def print_progress(done, total, replicates):
+    end = '\n' if done == total else ''
+    print(f"\r[ensemble] {done}/{total} chunks, {replicates} replicates", end=end,
+          file=sys.stderr, flush=True)
+
+
+def _append(acc, result):
+    acc.append(result)
+    return acc
+
+
+def run_ensemble(chunk_fn, n_replicates, args=(), chunk_size=1000, seed=None, workers=1,
+                 reduce=None, initial=None, checkpoint=None, progress=False):
+    """Run `chunk_fn(size, rng, *args)` over all chunks and fold the results.
+
+    `reduce(acc, result)` is applied in chunk order starting from `initial`;
+    by default the chunk results are returned as a list. `workers=None` uses
+    every core, `workers=1` runs in-process. `progress` may be True (print to
+    stderr) or a callable `(done_chunks, n_chunks, done_replicates)`.
+    """
+    bounds = chunk_bounds(n_replicates, chunk_size)
+    if reduce is None:
+        reduce, initial = _append, []
+    if progress is True:
+        progress = print_progress
+
+    # A spawned SeedSequence is only distinct from its root by `spawn_key`,
+    # so both identify the ensemble
+    if isinstance(seed, np.random.SeedSequence):
+        entropy, spawn_key = seed.entropy, tuple(seed.spawn_key)
+    else:
+        entropy, spawn_key = seed, ()
+    done = set()
+    if checkpoint is not None:
+        manifest = _open_checkpoint(checkpoint, {
+            'function': f"{chunk_fn.__module__}.{chunk_fn.__qualname__}",
+            'n_replicates': n_replicates,
+            'chunk_size': chunk_size,
+            'entropy': entropy,
+            'spawn_key': list(spawn_key),
+        })
+        entropy = manifest['entropy']
+        done = {i for i in range(len(bounds)) if os.path.exists(_chunk_path(checkpoint, i))}
+    # Spawn from a fresh copy, so the same seed gives the same chunks however
+    # often it has been spawned from before
+    seeds = np.random.SeedSequence(entropy, spawn_key=spawn_key).spawn(len(bounds))
+
+    pending = {}
+    state = {'acc': initial, 'next': 0, 'replicates': 0}
+
+    def advance():
+        # Fold results strictly in chunk order: computed chunks that finish
+        # early wait in `pending`, checkpointed ones are read back when due
+        while True:
+            i = state['next']
+            if i in pending:
+                result = pending.pop(i)
+            elif i in done:
+                result = _load_chunk(checkpoint, i)
+            else:
+                return
+            state['acc'] = reduce(state['acc'], result)
+            start, stop = bounds[i]
+            state['replicates'] += stop - start
+            state['next'] = i + 1
+            if progress:
+                progress(i + 1, len(bounds), state['replicates'])
+
+    def finish(i, result):
+        if checkpoint is not None:
+            _save_chunk(checkpoint, i, result)
+        pending[i] = result
+        advance()
+
+    advance()
+    todo = [i for i in range(len(bounds)) if i not in done]
+    if workers == 1:
+        for i in todo:
+            start, stop = bounds[i]
+            finish(i, _run_chunk(chunk_fn, stop - start, seeds[i], args))
+    else:
+        workers = workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            queue = iter(todo)
+            running = {}
+            while True:
+                # Keep a bounded window of chunks in flight, counting results
+                # that finished early and wait in `pending` for a slower chunk
+                while len(running) + len(pending) < 2 * workers:
+                    i = next(queue, None)
+                    if i is None:
+                        break
+                    start, stop = bounds[i]
+                    running[pool.submit(profiling.captured(_run_chunk), chunk_fn, stop - start, seeds[i],
+                                        args)] = i
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    finish(running.pop(future), profiling.collect(future.result()))
+    return state['acc']
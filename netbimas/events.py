@@ -0,0 +1,134 @@
+"""Append-only binary format for bacteria path records.
+
+A `.nbev` file is a 16-byte header followed by fixed-width little-endian
+records with the columns of bacteria-path-data.csv: int32 `who` and `tick`,
+float64 coordinates, distances and efficiency (float64 keeps endpoints
+bit-exact, so shared-endpoint grouping is unchanged). `read_events` maps the
+records into a NumPy structured array without copying or parsing, and
+`latest_events` reduces them to one row per `who` like `load_path_data`.
+
+Header: magic b'NBEV', uint16 version, uint16 header size, uint32 record
+size, uint32 reserved. A record cut short by an interrupted write is ignored
+by the reader and overwritten by the next append.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from netbimas.loader import COLUMNS, finalize, latest_per_who, parse_path_data, read_chunks
+
+MAGIC = b'NBEV'
+VERSION = 1
+EVENT_SUFFIX = '.nbev'
+RECORD_DTYPE = np.dtype([
+    ('who', '<i4'),
+    ('tick', '<i4'),
+    ('start-x', '<f8'),
+    ('start-y', '<f8'),
+    ('end-x', '<f8'),
+    ('end-y', '<f8'),
+    ('total-distance', '<f8'),
+    ('straight-line', '<f8'),
+    ('efficiency', '<f8'),
+])
+HEADER_DTYPE = np.dtype([('magic', 'S4'), ('version', '<u2'), ('header_size', '<u2'),
+                         ('record_size', '<u4'), ('reserved', '<u4')])
+HEADER_SIZE = HEADER_DTYPE.itemsize
+
+
+def _header():
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header[0] = (MAGIC, VERSION, HEADER_SIZE, RECORD_DTYPE.itemsize, 0)
+    return header.tobytes()
+
+
+def _check_header(raw, path):
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path}: truncated event file header")
+    header = np.frombuffer(raw[:HEADER_SIZE], dtype=HEADER_DTYPE)[0]
+    if header['magic'] != MAGIC:
+        raise ValueError(f"{path}: not a bacteria event file")
+    if header['version'] != VERSION or header['record_size'] != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path}: unsupported event file version {header['version']}")
+
+
+def to_records(df):
+    """Structured records from a DataFrame with the path-data columns."""
+    records = np.empty(len(df), dtype=RECORD_DTYPE)
+    for name in COLUMNS:
+        records[name] = df[name].to_numpy()
+    return records
+
+
+class EventWriter:
+    """Append records to an event file, creating it with a header if needed."""
+
+    def __init__(self, path):
+        self.path = path
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._fh = open(path, 'r+b' if exists else 'wb')
+        if exists:
+            _check_header(self._fh.read(HEADER_SIZE), path)
+            # Drop a partial record left by an interrupted append
+            size = self._fh.seek(0, os.SEEK_END)
+            whole = HEADER_SIZE + (size - HEADER_SIZE) // RECORD_DTYPE.itemsize * RECORD_DTYPE.itemsize
+            self._fh.truncate(whole)
+            self._fh.seek(whole)
+        else:
+            self._fh.write(_header())
+
+    def append(self, records):
+        """Append a structured array (RECORD_DTYPE) or a path-data DataFrame."""
+        if isinstance(records, pd.DataFrame):
+            records = to_records(records)
+        self._fh.write(np.ascontiguousarray(records, dtype=RECORD_DTYPE).tobytes())
+
+    def flush(self):
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_events(path):
+    """Memory-mapped structured array of every complete record in `path`."""
+    with open(path, 'rb') as fh:
+        _check_header(fh.read(HEADER_SIZE), path)
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+
+
+def latest_events(records):
+    """One row per `who` from event records, as `load_path_data` returns."""
+    df = pd.DataFrame({name: np.asarray(records[name], dtype=np.float64) for name in COLUMNS})
+    df['_row'] = np.arange(len(df), dtype=np.int64)
+    return finalize(latest_per_who(df))
+
+
+def convert_csv(csv_path, out_path=None, latest=True):
+    """Convert a bacteria-path-data CSV to an event file; returns its path.
+
+    With `latest` only the final row of every `who` is kept (what the
+    analyses load); otherwise every row is converted, minus the repeated
+    header lines.
+    """
+    if out_path is None:
+        out_path = os.path.splitext(os.fspath(csv_path))[0] + EVENT_SUFFIX
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    with EventWriter(tmp) as writer:
+        if latest:
+            writer.append(parse_path_data(csv_path))
+        else:
+            for chunk in read_chunks(csv_path):
+                writer.append(chunk)
+    os.replace(tmp, out_path)
+    return out_path
@@ -0,0 +1,147 @@
+"""Shared-endpoint graph construction on integer codes and CSR adjacency.
+
+Bacteria whose rounded `end-x`/`end-y` coincide shared a path, and each such
+group forms a clique. Instead of `iterrows` and a pairwise `add_edge` loop,
+endpoints are grouped with `np.unique` and the clique edges are written
+straight into a symmetric scipy CSR matrix with int32 node ids (row `i` is
+the `i`-th row of the input frame). networkx graphs are only built on request.
+
+`radius_adjacency` is the tolerant alternative: it links endpoints within a
+distance of each other using a `scipy.spatial.cKDTree`, in the same CSR
+layout.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+from netbimas import profiling
+
+
+@profiling.profiled('build', items=len)
+def endpoint_codes(x, y, decimals=3):
+    """Group ids (0..n_groups-1) of the endpoints after rounding to `decimals`."""
+    key = np.round(np.asarray(x, dtype=np.float64), decimals) \
+        + 1j * np.round(np.asarray(y, dtype=np.float64), decimals)
+    _, codes = np.unique(key, return_inverse=True)
+    return codes.reshape(-1).astype(np.int32)
+
+
+@profiling.profiled('build', items=lambda A: A.nnz // 2)
+def clique_adjacency(codes):
+    """Symmetric CSR adjacency joining every pair of nodes with the same code.
+
+    Neighbours of each node are its group members in ascending id order, so
+    the matrix is written directly in canonical CSR form in O(edges).
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    n = codes.size
+    sizes = np.bincount(codes) if n else np.zeros(0, dtype=np.int64)
+    degree = sizes[codes] - 1
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(degree, out=indptr[1:])
+    nnz = int(indptr[-1])
+    index_dtype = np.int32 if max(n, nnz) < np.iinfo(np.int32).max else np.int64
+
+    order = np.argsort(codes, kind='stable').astype(index_dtype)
+    starts = np.zeros(sizes.size, dtype=np.int64)
+    np.cumsum(sizes[:-1], out=starts[1:])
+
+    # For the node at sorted position s, emit all k members t of its group
+    # and drop t == its own position p; entry t lands at indptr + t - (t > p).
+    k = sizes[codes[order]]
+    total = int(k.sum())
+    node = np.repeat(order, k)
+    t = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(k) - k, k)
+    p = np.repeat(np.arange(n, dtype=np.int64) - starts[codes[order]], k)
+    member = order[np.repeat(starts[codes[order]], k) + t]
+    keep = t != p
+    dest = indptr[node[keep]] + t[keep] - (t[keep] > p[keep])
+
+    indices = np.empty(nnz, dtype=index_dtype)
+    indices[dest] = member[keep]
+    data = np.ones(nnz, dtype=np.float64)
+    return sp.csr_array((data, indices, indptr.astype(index_dtype)), shape=(n, n))
+
+
+def shared_endpoint_adjacency(df, decimals=3):
+    """CSR adjacency of the shared-endpoint graph over the rows of `df`."""
+    return clique_adjacency(endpoint_codes(df['end-x'], df['end-y'], decimals))
+
+
+@profiling.profiled('build', items=lambda A: A.nnz // 2)
+def radius_adjacency(x, y, radius, groups=None, weight='inverse', eps=1e-6):
+    """Symmetric CSR adjacency joining points within `radius` of each other.
+
+    Pairs come from `cKDTree.query_pairs`, so the cost grows with the number
+    of linked pairs rather than n**2. With `groups` (e.g. quadrant labels)
+    only points with equal labels are linked. `weight='inverse'` stores
+    1 / (distance + eps) on each edge, `weight=None` stores 1. With
+    `radius=0` on rounded coordinates the structure equals
+    `clique_adjacency(endpoint_codes(...))`.
+    """
+    from scipy.spatial import cKDTree
+
+    points = np.column_stack([np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)])
+    n = len(points)
+    index_dtype = np.int32 if n < np.iinfo(np.int32).max else np.int64
+    pairs = cKDTree(points).query_pairs(radius, output_type='ndarray') if n > 1 \
+        else np.zeros((0, 2), dtype=np.int64)
+    if groups is not None:
+        groups = np.asarray(groups)
+        pairs = pairs[groups[pairs[:, 0]] == groups[pairs[:, 1]]]
+    i, j = pairs[:, 0], pairs[:, 1]
+    if weight == 'inverse':
+        data = 1 / (np.hypot(*(points[i] - points[j]).T) + eps)
+    elif weight is None:
+        data = np.ones(len(pairs))
+    else:
+        raise ValueError(f"unknown weight {weight!r}")
+    rows = np.concatenate([i, j]).astype(index_dtype)
+    cols = np.concatenate([j, i]).astype(index_dtype)
+    A = sp.csr_array((np.concatenate([data, data]), (rows, cols)), shape=(n, n))
+    A.sort_indices()
+    return A
+
+
+def radius_endpoint_adjacency(df, radius, same_quadrant=False, weight='inverse'):
+    """`radius_adjacency` over the endpoints of `df`.
+
+    With `same_quadrant` only cells whose endpoints share a quadrant (Q1:
+    x > 0 and y > 0, Q3: x < 0 and y < 0, anything else one 'Other' group)
+    are linked, as in network_analysis.py's tolerance variant.
+    """
+    x = df['end-x'].to_numpy(dtype=np.float64)
+    y = df['end-y'].to_numpy(dtype=np.float64)
+    groups = np.select([(x > 0) & (y > 0), (x < 0) & (y < 0)], [1, 3], 0) if same_quadrant else None
+    return radius_adjacency(x, y, radius, groups=groups, weight=weight)
+
+
+@profiling.profiled('build', items=lambda G: G.number_of_edges())
+def to_networkx(A, who, graph=None, prefix='Cell-', **node_attrs):
+    """Convert a CSR adjacency to a networkx graph with `Cell-<who>` nodes.
+
+    Edges carry their matrix value as `weight`. Extra keyword arrays aligned
+    with `who` become node attributes. If `graph` is given the nodes and
+    edges are added to it instead of a new Graph.
+    """
+    import networkx as nx
+
+    G = nx.Graph() if graph is None else graph
+    names = [f"{prefix}{w}" for w in np.asarray(who).tolist()]
+    if node_attrs:
+        columns = {key: values.tolist() if hasattr(values, 'tolist') else list(values)
+                   for key, values in node_attrs.items()}
+        G.add_nodes_from((name, {key: col[i] for key, col in columns.items()})
+                         for i, name in enumerate(names))
+    else:
+        G.add_nodes_from(names)
+    upper = sp.triu(A, k=1, format='coo')
+    G.add_weighted_edges_from(zip([names[i] for i in upper.row.tolist()],
+                                  [names[j] for j in upper.col.tolist()],
+                                  upper.data.tolist()))
+    return G
+
+
+def shared_endpoint_graph(df, decimals=3, **node_attrs):
+    """networkx shared-endpoint graph over `df`, named like the scripts did."""
+    return to_networkx(shared_endpoint_adjacency(df, decimals), df['who'], **node_attrs)
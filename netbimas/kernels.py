@@ -0,0 +1,170 @@
+"""Clustering and efficiency kernels on scipy.sparse adjacency matrices.
+
+Triangles come from sparse products, hop distances from breadth-first
+`scipy.sparse.csgraph` searches with unit weights, and the largest connected
+component is selected from the component label array instead of copying a
+subgraph. Results agree with nx.average_clustering and nx.global_efficiency
+to 1e-12 on simple undirected graphs.
+
+`ensemble_metrics` evaluates many small null replicates at once by stacking
+them into one block-diagonal matrix for clustering and component labels;
+distances are then searched within each replicate's largest component only.
+"""
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components, dijkstra
+
+# Upper bound on the dense (sources, nodes) distance block kept in memory
+DISTANCE_BLOCK = 2 ** 22
+
+
+def edges_to_csr(edges, n):
+    """Symmetric 0/1 CSR adjacency from an (m, 2) edge array, loops dropped."""
+    edges = np.asarray(edges).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    A = sp.csr_array((np.ones(rows.size), (rows, cols)), shape=(n, n))
+    A.sum_duplicates()
+    A.data[:] = 1.0
+    return A
+
+
+def _simple(A):
+    """Binary adjacency without self-loops."""
+    A = sp.csr_array(A, dtype=np.float64, copy=True)
+    A.setdiag(0)
+    A.eliminate_zeros()
+    A.data[:] = 1.0
+    return A
+
+
+# --------------------
+# Clustering
+# --------------------
+def triangles(A):
+    """Number of triangles through each node: diag(A^3) / 2."""
+    return ((A @ A) * A).sum(axis=1) / 2
+
+
+def clustering(A):
+    """nx.clustering for every node of a simple undirected graph."""
+    A = _simple(A)
+    degree = np.diff(A.indptr)
+    pairs = degree * (degree - 1)
+    out = np.zeros(A.shape[0])
+    has_pairs = pairs > 0
+    out[has_pairs] = 2 * triangles(A)[has_pairs] / pairs[has_pairs]
+    return out
+
+
+def average_clustering(A):
+    """nx.average_clustering; nan for an empty graph."""
+    return clustering(A).mean() if A.shape[0] else np.nan
+
+
+# --------------------
+# Components and distances
+# --------------------
+def largest_component(A):
+    """Node indices of the largest connected component.
+
+    Ties go to the component containing the lowest node id, matching
+    `max(nx.connected_components(G), key=len)` on integer-labelled graphs.
+    """
+    if A.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64)
+    _, labels = connected_components(A, directed=False)
+    return np.flatnonzero(labels == np.argmax(np.bincount(labels)))
+
+
+def inverse_distance_sums(A, sources):
+    """Sum over reachable targets of 1 / hop distance, per source node."""
+    n = A.shape[0]
+    sources = np.asarray(sources)
+    out = np.zeros(sources.size)
+    step = max(1, DISTANCE_BLOCK // max(n, 1))
+    for start in range(0, sources.size, step):
+        dist = dijkstra(A, directed=False, unweighted=True, indices=sources[start:start + step])
+        with np.errstate(divide='ignore'):
+            inv = 1 / dist
+        inv[~np.isfinite(inv)] = 0.0
+        out[start:start + step] = inv.sum(axis=1)
+    return out
+
+
+def global_efficiency(A, nodes=None):
+    """nx.global_efficiency of `A`, or of the subgraph induced by `nodes`.
+
+    `nodes` must be a union of connected components (such as the output of
+    `largest_component`); distances are then found on `A` itself, so no
+    subgraph is built.
+    """
+    A = _simple(A)
+    sources = np.arange(A.shape[0]) if nodes is None else np.asarray(nodes)
+    n = sources.size
+    if n < 2:
+        return 0.0
+    return inverse_distance_sums(A, sources).sum() / (n * (n - 1))
+
+
+def lcc_global_efficiency(A):
+    """Global efficiency of the largest connected component of `A`."""
+    A = _simple(A)
+    return global_efficiency(A, largest_component(A))
+
+
+# --------------------
+# Null ensembles
+# --------------------
+def ensemble_metrics(edges, offsets, n):
+    """Average clustering and largest-component efficiency per replicate.
+
+    `edges`/`offsets` are the stacked per-replicate edge arrays returned by
+    `netbimas.nulls.chung_lu_edges` on `n` nodes. Replicates are processed
+    in block-diagonal batches; each shortest-path search runs on one
+    replicate's largest component, so no distances are computed across
+    blocks. Returns an array of shape (n_replicates, 2).
+    """
+    n_replicates = len(offsets) - 1
+    out = np.zeros((n_replicates, 2))
+    if n == 0:
+        out[:, 0] = np.nan
+        return out
+    block = max(1, int(np.sqrt(DISTANCE_BLOCK)) // n)
+    for first in range(0, n_replicates, block):
+        last = min(first + block, n_replicates)
+        size = last - first
+        lo, hi = offsets[first], offsets[last]
+        rep = np.repeat(np.arange(size), np.diff(offsets[first:last + 1]))
+        A = edges_to_csr(edges[lo:hi] + (rep * n)[:, None], size * n)
+        out[first:last, 0] = clustering(A).reshape(size, n).mean(axis=1)
+
+        # Largest component of every replicate from one label array
+        _, labels = connected_components(A, directed=False)
+        comp_size = np.bincount(labels)
+        node_rep = np.arange(size * n) // n
+        node_size = comp_size[labels]
+        best = np.zeros(size, dtype=np.int64)
+        np.maximum.at(best, node_rep, node_size)
+        # Lowest label of maximum size within each replicate
+        candidate = np.where(node_size == best[node_rep], labels, comp_size.size)
+        chosen = np.full(size, comp_size.size, dtype=labels.dtype)
+        np.minimum.at(chosen, node_rep, candidate)
+        in_lcc = np.flatnonzero(labels == chosen[node_rep])
+
+        # The largest components form contiguous diagonal blocks of L, so each
+        # replicate's block is cut straight from L's CSR arrays and searched
+        # on its own
+        L = A[in_lcc][:, in_lcc]
+        bounds = np.searchsorted(node_rep[in_lcc], np.arange(size + 1))
+        sums = np.zeros(size)
+        for r in np.flatnonzero(best > 1):
+            b0, b1 = bounds[r], bounds[r + 1]
+            indptr = L.indptr[b0:b1 + 1]
+            sub = sp.csr_array((L.data[indptr[0]:indptr[-1]], L.indices[indptr[0]:indptr[-1]] - b0,
+                                indptr - indptr[0]), shape=(b1 - b0, b1 - b0))
+            sums[r] = inverse_distance_sums(sub, np.arange(b1 - b0)).sum()
+        pairs = best * (best - 1)
+        out[first:last, 1] = np.divide(sums, pairs, out=np.zeros(size), where=pairs > 0)
+    return out
@@ -0,0 +1,140 @@
+"""Load bacteria-path-data CSVs written by `save-cyanobacteria-data`.
+
+The NetLogo model appends a header line on every setup and rewrites every
+finished bacterium on every save, so the raw file holds many rows per `who`.
+`load_path_data` parses the file in chunks with fixed numeric dtypes, drops
+the header lines while parsing and keeps only the latest row per `who`.
+The reduced table is cached in an NPZ sidecar next to the CSV, keyed by the
+file size and mtime, so later runs skip CSV parsing entirely.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from netbimas import profiling
+
+COLUMNS = ['who', 'tick', 'start-x', 'start-y', 'end-x', 'end-y', 'total-distance', 'straight-line', 'efficiency']
+INT_COLUMNS = ['who', 'tick']
+
+CHUNK_ROWS = 500_000
+SIDECAR_SUFFIX = '.latest.npz'
+SIDECAR_VERSION = 1
+
+
+# --------------------
+# CSV parsing
+# --------------------
+def read_chunks(source, chunksize=CHUNK_ROWS, first_row=0):
+    """Yield numeric DataFrames of `chunksize` raw lines from a path-data CSV.
+
+    Every column is parsed as float64; repeated header lines (and the first
+    one) become NaN rows through `na_values` and are dropped, as are partial
+    rows. A `_row` column keeps the position in the file so ties on `tick`
+    can be broken the same way as a stable sort; `first_row` offsets it when
+    `source` is only the tail of a file.
+    """
+    reader = iter(pd.read_csv(source, header=None, names=COLUMNS, dtype=np.float64,
+                              na_values={c: [c] for c in COLUMNS}, chunksize=chunksize))
+    offset = first_row
+    while True:
+        with profiling.stage('read_csv', 'load') as record:
+            chunk = next(reader, None)
+            record.items = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            return
+        with profiling.stage('drop_headers', 'clean') as record:
+            chunk['_row'] = np.arange(offset, offset + len(chunk), dtype=np.int64)
+            offset += len(chunk)
+            chunk = chunk.dropna(subset=COLUMNS)
+            record.items = len(chunk)
+        yield chunk
+
+
+@profiling.profiled('dedup', items=len)
+def latest_per_who(df):
+    """Reduce a numeric path-data frame to the most recent row of each `who`."""
+    return df.sort_values(['who', 'tick', '_row'], kind='mergesort') \
+             .drop_duplicates(subset='who', keep='last')
+
+
+@profiling.profiled('dedup', items=len)
+def finalize(latest):
+    """Order the reduced table like `sort_values('tick')` and fix dtypes."""
+    latest = latest.sort_values(['tick', '_row'], kind='mergesort') \
+                   .drop(columns='_row') \
+                   .reset_index(drop=True)
+    return latest.astype({c: np.int64 for c in INT_COLUMNS})
+
+
+def parse_path_data(source, chunksize=CHUNK_ROWS):
+    """Parse a path-data CSV and reduce it to one row per `who` in one pass."""
+    latest = None
+    for chunk in read_chunks(source, chunksize):
+        if latest is not None:
+            chunk = pd.concat([latest, chunk], ignore_index=True)
+        latest = latest_per_who(chunk)
+    if latest is None:
+        latest = pd.DataFrame({c: np.empty(0) for c in COLUMNS + ['_row']})
+    return finalize(latest)
+
+
+# --------------------
+# Binary sidecar
+# --------------------
+def sidecar_path(path):
+    return os.fspath(path) + SIDECAR_SUFFIX
+
+
+def _sidecar_key(st):
+    return np.array([SIDECAR_VERSION, st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+
+def read_sidecar(path, st=None):
+    """Return the cached table for `path`, or None if missing or stale."""
+    st = st or os.stat(path)
+    try:
+        with np.load(sidecar_path(path)) as data:
+            if not np.array_equal(data['_key'], _sidecar_key(st)):
+                return None
+            return pd.DataFrame({c: data[c] for c in COLUMNS})
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def write_sidecar(path, df, st=None):
+    """Write `df` as the cached table for `path`; failures are not fatal."""
+    st = st or os.stat(path)
+    target = sidecar_path(path)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'wb') as fh:
+            np.savez(fh, _key=_sidecar_key(st), **{c: df[c].to_numpy() for c in COLUMNS})
+        os.replace(tmp, target)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+@profiling.profiled('load', items=len)
+def load_path_data(path, cache=True, chunksize=CHUNK_ROWS):
+    """Load a bacteria-path-data CSV as one row per `who`, latest tick last.
+
+    Equivalent to the read_csv / drop header rows / to_numeric / dropna /
+    sort_values('tick') / drop_duplicates('who', keep='last') block the
+    analysis scripts used to repeat, but without the object-dtype detour.
+    Binary event files (`netbimas.events`, `.nbev`) are read directly.
+    """
+    if os.fspath(path).endswith('.nbev'):
+        from netbimas.events import latest_events, read_events
+
+        return latest_events(read_events(path))
+    st = os.stat(path)
+    if cache:
+        df = read_sidecar(path, st)
+        if df is not None:
+            return df
+    df = parse_path_data(path, chunksize)
+    if cache:
+        write_sidecar(path, df, st)
+    return df
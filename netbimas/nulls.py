@@ -0,0 +1,189 @@
+"""Null-model ensembles for the cyanobacteria networks.
+
+Replicates are drawn in batches from a `numpy.random.Generator` and reduced
+with array operations; no per-replicate graph objects are built. The
+`*_chunk` functions are the units of work for `netbimas.ensemble`.
+"""
+import numpy as np
+
+from netbimas import clique_metrics, kernels
+from netbimas.accumulators import Moments
+from netbimas.ensemble import run_ensemble
+
+ARENA = (-20, 20)
+NULL_VERSION = '1'  # bump when a null model's output for a given seed changes
+
+
+# --------------------
+# Randomized endpoints
+# --------------------
+def _batch_sizes(total, batch_size):
+    for start in range(0, total, batch_size):
+        yield min(batch_size, total - start)
+
+
+def random_endpoints(start_xy, n_replicates, rng, arena=ARENA):
+    """Uniform random endpoints for every cell, shape (n_replicates, n_cells, 2)."""
+    return rng.uniform(arena[0], arena[1], size=(n_replicates, len(start_xy), 2))
+
+
+def straight_lines(start_xy, end_xy):
+    """Straight-line distances from each start to the matching endpoints."""
+    return np.hypot(end_xy[..., 0] - start_xy[:, 0], end_xy[..., 1] - start_xy[:, 1])
+
+
+def star_efficiency(weights):
+    """Weighted global efficiency of Nest stars, one per row of `weights`.
+
+    The shortest path from the Nest to cell i has length w_i and between
+    cells i and j it has length w_i + w_j, so the efficiency is
+    (2 * sum 1/w_i + sum_{i != j} 1/(w_i + w_j)) / (n * (n - 1)) over
+    the n = cells + 1 nodes.
+    """
+    weights = np.atleast_2d(weights)
+    cells = weights.shape[1]
+    if cells == 0:
+        return np.zeros(len(weights))
+    pair = 1 / (weights[:, :, None] + weights[:, None, :])
+    cross = pair.sum(axis=(1, 2)) - (1 / (2 * weights)).sum(axis=1)
+    return (2 * (1 / weights).sum(axis=1) + cross) / ((cells + 1) * cells)
+
+
+def endpoint_null_chunk(size, rng, start_xy, arena=ARENA):
+    """Weighted star efficiencies of `size` randomized-endpoint replicates."""
+    cells = len(start_xy)
+    # Keep the (batch, cells, cells) pair array around 32 MB
+    batch_size = max(1, 2 ** 22 // max(cells * cells, 1))
+    out = np.empty(size)
+    done = 0
+    for batch in _batch_sizes(size, batch_size):
+        weights = straight_lines(start_xy, random_endpoints(start_xy, batch, rng, arena))
+        out[done:done + batch] = star_efficiency(weights)
+        done += batch
+    return out
+
+
+def random_endpoint_null(df, n=1000, seed=None, weighted=False, arena=ARENA, **ensemble):
+    """Global efficiency of `n` Nest stars whose cells get random endpoints.
+
+    Every replicate joins the Nest to each row of `df`, weighted by the
+    straight line from its start to an endpoint drawn uniformly from the
+    arena. With `weighted=False` efficiency counts hops like
+    nx.global_efficiency, which ignores the weights: every replicate is then
+    the same star and the result is constant. With `weighted=True` the
+    straight-line lengths are the path lengths and the replicates run through
+    `run_ensemble` (extra keywords such as `workers` or `checkpoint` are
+    passed on). Returns a NumPy array.
+    """
+    start_xy = df[['start-x', 'start-y']].to_numpy(dtype=np.float64)
+    cells = len(start_xy)
+    if not weighted:
+        return np.full(n, clique_metrics.global_efficiency(np.ones(cells, dtype=np.int64), nest=True))
+    ensemble.setdefault('chunk_size', 10000)
+    chunks = run_ensemble(endpoint_null_chunk, n, args=(start_xy, arena), seed=seed, **ensemble)
+    return np.concatenate(chunks) if chunks else np.zeros(0)
+
+
+# --------------------
+# Chung-Lu expected-degree graphs
+# --------------------
+def chung_lu_edges(degrees, n_replicates, rng, selfloops=False):
+    """Sample `n_replicates` Chung-Lu graphs for an expected degree sequence.
+
+    Uses the same skipping algorithm as nx.expected_degree_graph (Miller &
+    Hagberg): weights are sorted in decreasing order, so along each row u
+    the edge probability min(w_u * w_v / sum(w), 1) never increases and
+    candidates can be reached with geometric skips and thinned. All rows of
+    all replicates advance together, one candidate per round.
+
+    Returns `(edges, offsets)`: an (n_edges, 2) int32 array of node indices
+    into `degrees`, grouped by replicate, and offsets such that replicate r
+    owns edges[offsets[r]:offsets[r + 1]].
+    """
+    w = np.asarray(degrees, dtype=np.float64)
+    n = w.size
+    order = np.argsort(-w, kind='stable')
+    seq = w[order]
+    total = seq.sum()
+    rows = n if selfloops else n - 1
+    if n_replicates <= 0 or rows <= 0 or total <= 0:
+        return np.zeros((0, 2), dtype=np.int32), np.zeros(max(n_replicates, 0) + 1, dtype=np.int64)
+
+    rep = np.repeat(np.arange(n_replicates, dtype=np.int64), rows)
+    u = np.tile(np.arange(rows, dtype=np.int64), n_replicates)
+    v = u if selfloops else u + 1
+    factor = seq[u] / total
+    p = np.minimum(seq[v] * factor, 1.0)
+
+    found = []
+    while rep.size:
+        live = p > 0
+        if not live.all():
+            rep, u, v, factor, p = rep[live], u[live], v[live], factor[live], p[live]
+        # Geometric skip to the next candidate of a Bernoulli(p) sequence
+        skip = np.zeros(p.size)
+        partial = p < 1
+        r = 1.0 - rng.random(int(partial.sum()))
+        skip[partial] = np.floor(np.log(r) / np.log1p(-p[partial]))
+        v = v + np.minimum(skip, n).astype(np.int64)
+        inside = v < n
+        if not inside.all():
+            rep, u, v, factor, p = rep[inside], u[inside], v[inside], factor[inside], p[inside]
+        # Thin the candidate down to its own probability q <= p
+        q = np.minimum(seq[v] * factor, 1.0)
+        accept = rng.random(q.size) < q / p
+        found.append((rep[accept], u[accept], v[accept]))
+        v = v + 1
+        p = q
+        more = v < n
+        rep, u, v, factor, p = rep[more], u[more], v[more], factor[more], p[more]
+
+    rep = np.concatenate([f[0] for f in found]) if found else np.zeros(0, dtype=np.int64)
+    a = np.concatenate([f[1] for f in found]) if found else np.zeros(0, dtype=np.int64)
+    b = np.concatenate([f[2] for f in found]) if found else np.zeros(0, dtype=np.int64)
+    by_rep = np.argsort(rep, kind='stable')
+    edges = np.column_stack([order[a[by_rep]], order[b[by_rep]]]).astype(np.int32)
+    offsets = np.zeros(n_replicates + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rep, minlength=n_replicates), out=offsets[1:])
+    return edges, offsets
+
+
+def edge_degrees(edges, offsets, n):
+    """Degree of every node in every replicate, shape (n_replicates, n).
+
+    A self-loop adds 2 to the degree of its node, as in networkx.
+    """
+    n_replicates = len(offsets) - 1
+    rep = np.repeat(np.arange(n_replicates, dtype=np.int64), np.diff(offsets))
+    ends = np.concatenate([rep * n + edges[:, 0], rep * n + edges[:, 1]])
+    return np.bincount(ends, minlength=n_replicates * n).reshape(n_replicates, n)
+
+
+def degree_counts(degrees, max_degree=None):
+    """Per-replicate degree histogram, shape (n_replicates, max_degree + 1)."""
+    degrees = np.atleast_2d(degrees)
+    if max_degree is None:
+        max_degree = int(degrees.max()) if degrees.size else 0
+    width = max_degree + 1
+    rows = np.arange(len(degrees), dtype=np.int64)[:, None] * width
+    return np.bincount((rows + degrees).ravel(), minlength=len(degrees) * width).reshape(len(degrees), width)
+
+
+def chung_lu_degree_chunk(size, rng, degrees):
+    """Mean and variance of per-degree node counts over `size` Chung-Lu replicates.
+
+    Returns an `accumulators.Moments` indexed by degree 0..n-1.
+    """
+    n = len(degrees)
+    edges, offsets = chung_lu_edges(degrees, size, rng)
+    counts = degree_counts(edge_degrees(edges, offsets, n), max_degree=max(n - 1, 0))
+    return Moments(max(n, 1)).update(counts)
+
+
+def chung_lu_metric_chunk(size, rng, degrees):
+    """Average clustering and largest-component efficiency of Chung-Lu replicates.
+
+    Returns an array of shape (size, 2).
+    """
+    edges, offsets = chung_lu_edges(degrees, size, rng)
+    return kernels.ensemble_metrics(edges, offsets, len(degrees))
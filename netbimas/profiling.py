@@ -0,0 +1,226 @@
+"""Opt-in profiling of pipeline stages.
+
+Set NETBIMAS_PROFILE=<trace.json> (or 1 for netbimas-trace.json) in the
+environment, or pass `--profile` to the `netbimas` command, to record every
+instrumented stage: load, clean, dedup, build, metric, null replicate batch
+and simulation. Each call records its wall time, CPU time, the process's
+peak RSS at the end of the stage and, where known, the number of items
+(rows, cells, replicates) it handled. At exit the events are written as a
+Chrome trace (open in chrome://tracing or Perfetto; worker processes show as
+their own rows) and a per-stage summary table is printed to stderr.
+
+Profiling is decided when a module is imported: with it off, `profiled`
+returns the function itself and `stage` a shared no-op context, so the
+instrumented code runs exactly as before. Work sent to process pools is
+wrapped with `captured` and its result passed through `collect`, which
+brings the workers' events back to the parent.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from functools import wraps
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ENV = 'NETBIMAS_PROFILE'
+DEFAULT_TRACE = 'netbimas-trace.json'
+
+_events = None
+_trace_path = None
+
+
+def enabled():
+    return _events is not None
+
+
+def enable(trace=None):
+    """Start recording; the trace and summary are written at exit.
+
+    Also sets NETBIMAS_PROFILE so that worker processes record too.
+    """
+    global _events, _trace_path
+    if _events is None:
+        _events = []
+        atexit.register(_finish)
+    _trace_path = trace or _trace_path or DEFAULT_TRACE
+    os.environ[ENV] = _trace_path
+
+
+def _peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KiB elsewhere
+
+
+# --------------------
+# Recording
+# --------------------
+class _Stage:
+    __slots__ = ('name', 'category', 'items', 'start', 'wall', 'cpu')
+
+    def __init__(self, name, category, items):
+        self.name = name
+        self.category = category
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.time_ns()
+        self.wall = time.perf_counter_ns()
+        self.cpu = time.process_time_ns()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter_ns() - self.wall
+        cpu = time.process_time_ns() - self.cpu
+        peak = _peak_rss()
+        args = {'cpu_ms': cpu / 1e6}
+        if peak is not None:
+            args['peak_rss_mb'] = peak / 2 ** 20
+        if self.items is not None:
+            args['items'] = int(self.items)
+        _events.append({'name': self.name, 'cat': self.category, 'ph': 'X', 'ts': self.start / 1e3,
+                        'dur': wall / 1e3, 'pid': os.getpid(), 'tid': threading.get_ident() % 2 ** 31,
+                        'args': args})
+
+
+class _NullStage:
+    """Stand-in for `_Stage` while profiling is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name, category='stage', items=None):
+    """Context manager recording one stage; set `.items` on it to count work."""
+    return _Stage(name, category, items) if _events is not None else _NULL_STAGE
+
+
+def profiled(category, name=None, items=None):
+    """Decorator recording every call of a function as a stage.
+
+    `items(result)` gives the item count of a call. While profiling is off
+    the function is returned unchanged.
+    """
+    def decorate(fn):
+        if _events is None:
+            return fn
+        label = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(label, category) as record:
+                result = fn(*args, **kwargs)
+                if items is not None:
+                    record.items = items(result)
+            return result
+        return wrapper
+    return decorate
+
+
+# --------------------
+# Worker processes
+# --------------------
+class _Captured:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __call__(self, *args, **kwargs):
+        global _events
+        outer = _events
+        _events = []
+        try:
+            result = self.fn(*args, **kwargs)
+        finally:
+            events, _events = _events, outer
+        return result, events
+
+
+def captured(fn):
+    """`fn` for a process pool; returns `(result, events)` while profiling."""
+    return _Captured(fn) if _events is not None else fn
+
+
+def collect(returned):
+    """Result of a `captured` call, keeping the events it recorded."""
+    if _events is None:
+        return returned
+    result, events = returned
+    _events.extend(events)
+    return result
+
+
+# --------------------
+# Output
+# --------------------
+def summary(events=None):
+    """Per-stage totals: {(category, name): {calls, wall_s, cpu_s, peak_rss_mb, items}}."""
+    rows = {}
+    for event in _events if events is None else events:
+        row = rows.setdefault((event['cat'], event['name']),
+                              {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_rss_mb': None, 'items': None})
+        row['calls'] += 1
+        row['wall_s'] += event['dur'] / 1e6
+        row['cpu_s'] += event['args']['cpu_ms'] / 1e3
+        if 'peak_rss_mb' in event['args']:
+            row['peak_rss_mb'] = max(row['peak_rss_mb'] or 0.0, event['args']['peak_rss_mb'])
+        if 'items' in event['args']:
+            row['items'] = (row['items'] or 0) + event['args']['items']
+    return dict(sorted(rows.items(), key=lambda kv: -kv[1]['wall_s']))
+
+
+def format_summary(rows):
+    lines = [f"{'category':<10} {'stage':<40} {'calls':>7} {'wall s':>9} {'cpu s':>9} {'rss MB':>8} {'items':>11}"]
+    for (category, name), row in rows.items():
+        rss = '' if row['peak_rss_mb'] is None else f"{row['peak_rss_mb']:.0f}"
+        items = '' if row['items'] is None else str(row['items'])
+        lines.append(f"{category:<10} {name[:40]:<40} {row['calls']:>7} {row['wall_s']:>9.3f} "
+                     f"{row['cpu_s']:>9.3f} {rss:>8} {items:>11}")
+    return '\n'.join(lines)
+
+
+def write_trace(path, events=None):
+    """Write events as a Chrome trace with the summary under 'summary'."""
+    events = _events if events is None else events
+    rows = summary(events)
+    trace = {
+        'traceEvents': events,
+        'displayTimeUnit': 'ms',
+        'summary': [{'category': c, 'stage': n, **row} for (c, n), row in rows.items()],
+    }
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as fh:
+        json.dump(trace, fh)
+    os.replace(tmp, path)
+
+
+def _finish():
+    import multiprocessing
+
+    # Spawned pool workers run atexit too; only the parent writes
+    if not _events or multiprocessing.parent_process() is not None:
+        return
+    write_trace(_trace_path)
+    print(f"\n[profile] {len(_events)} events written to {_trace_path}", file=sys.stderr)
+    print(format_summary(summary()), file=sys.stderr)
+
+
+if os.environ.get(ENV, '') not in ('', '0'):
+    _value = os.environ[ENV]
+    enable(None if _value == '1' else _value)
@@ -0,0 +1,289 @@
+"""Headless figure reports for simulation runs.
+
+The scripts draw their figures with pyplot and block on `plt.show()`. Here
+every figure is drawn on a bare `matplotlib.figure.Figure` and written with
+the Agg canvas, so nothing opens a window and the functions run fine in
+worker processes:
+
+- 'network': the Nest and the Q1/Q3 cells in network_analysis.py's layout;
+- 'degree_distribution': cells per degree of the shared-endpoint graph;
+- 'clustering_by_quadrant': clustering coefficients of Q1 and Q3 cells;
+- 'degree_vs_closeness': per-quadrant degree against closeness;
+- 'null_histograms': Chung-Lu clustering and efficiency against the run;
+- 'chung_lu_degrees': empirical degree counts against the Chung-Lu mean.
+
+`render_run` writes one run's figures into a directory whose `report.json`
+manifest records the input key of every figure: the content digest of the
+run file, the figure's parameters and REPORT_VERSION. A figure whose key is
+unchanged is skipped, along with the computations behind it.
+`render_report` maps `render_run` over runs in a process pool.
+"""
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from netbimas import clique_metrics, profiling
+from netbimas.accumulators import Moments, merge
+from netbimas.cache import file_digest, result_key
+from netbimas.catalog import QUADRANTS, discover_runs, quadrant_labels
+from netbimas.clique_metrics import group_sizes
+from netbimas.ensemble import run_ensemble
+from netbimas.graph import clique_adjacency, endpoint_codes, to_networkx
+from netbimas.loader import load_path_data
+from netbimas.nulls import chung_lu_degree_chunk, chung_lu_metric_chunk
+
+REPORT_VERSION = '1'
+MANIFEST = 'report.json'
+FIGURES = ('network', 'degree_distribution', 'clustering_by_quadrant', 'degree_vs_closeness',
+           'null_histograms', 'chung_lu_degrees')
+NULL_FIGURES = ('null_histograms', 'chung_lu_degrees')
+COLORS = {'Q1': 'red', 'Q3': 'blue'}
+
+
+# --------------------
+# Figures
+# --------------------
+def network_figure(df, decimals=3):
+    """Nest star plus shared-endpoint cliques of the Q1/Q3 cells."""
+    quadrant = quadrant_labels(df['end-x'], df['end-y'])
+    keep = np.isin(quadrant, QUADRANTS)
+    who = df['who'].to_numpy()[keep]
+    quadrant = quadrant[keep]
+    codes = endpoint_codes(df['end-x'].to_numpy()[keep], df['end-y'].to_numpy()[keep], decimals)
+
+    G = nx.Graph()
+    G.add_node('Nest')
+    to_networkx(clique_adjacency(codes), who, graph=G)
+    G.add_edges_from(('Nest', f"Cell-{w}") for w in who)
+    pos = {'Nest': (0, 0)}
+    colors = {'Nest': 'gray'}
+    for q, sign in (('Q1', 1), ('Q3', -1)):
+        for i, w in enumerate(who[quadrant == q]):
+            pos[f"Cell-{w}"] = (sign * (1.5 + i % 5), sign * (1.5 + i // 5))
+            colors[f"Cell-{w}"] = COLORS[q]
+    labels = {node: node.replace('Cell-', '') for node in G.nodes()}
+
+    fig = Figure(figsize=(8, 8))
+    ax = fig.subplots()
+    nx.draw_networkx(G, pos, ax=ax, labels=labels, node_color=[colors[node] for node in G.nodes()],
+                     node_size=250, font_size=8, edgecolors='black')
+    ax.set_axis_off()
+    ax.set_title("Cyanobacteria Movement Network with Shared Endpoints")
+    fig.tight_layout()
+    return fig
+
+
+def degree_distribution_figure(degree_counts):
+    """Bar chart of cells per degree (`degree_counts[d]` cells of degree d)."""
+    degree_counts = np.asarray(degree_counts)
+    degrees = np.flatnonzero(degree_counts)
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    ax.bar(degrees, degree_counts[degrees], color='skyblue', edgecolor='black')
+    ax.set_xticks(degrees)
+    ax.set_xlabel("Degree")
+    ax.set_ylabel("Number of Nodes")
+    ax.set_title("Degree Distribution")
+    fig.tight_layout()
+    return fig
+
+
+def clustering_by_quadrant_figure(codes, quadrant):
+    """Side-by-side counts of rounded clustering coefficients per quadrant."""
+    counts = {q: Counter(np.round(clique_metrics.node_clustering(codes[quadrant == q]), 2).tolist())
+              for q in QUADRANTS}
+    values = sorted(set().union(*counts.values()))
+    x = np.arange(len(values))
+    width = 0.35
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    for offset, q in zip((-width / 2, width / 2), QUADRANTS):
+        ax.bar(x + offset, [counts[q].get(v, 0) for v in values], width, label=q, color=COLORS[q],
+               edgecolor='black')
+    ax.set_xticks(x)
+    ax.set_xticklabels(values)
+    ax.set_xlabel("Clustering Coefficient")
+    ax.set_ylabel("Number of Nodes")
+    ax.set_title("Clustering Coefficient Distribution by Quadrant")
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def degree_vs_closeness_figure(codes, quadrant):
+    """Degree against closeness of the cells in each quadrant."""
+    fig = Figure(figsize=(12, 5))
+    axes = fig.subplots(1, len(QUADRANTS))
+    for ax, q in zip(axes, QUADRANTS):
+        in_q = codes[quadrant == q]
+        ax.scatter(clique_metrics.node_degree(in_q), clique_metrics.node_closeness(in_q), color=COLORS[q])
+        ax.set_title(f"{q}: Degree vs Closeness")
+        ax.set_xlabel("Degree")
+        ax.set_ylabel("Closeness")
+    fig.tight_layout()
+    return fig
+
+
+def null_histograms_figure(null, observed, bins=30):
+    """Chung-Lu clustering and efficiency replicates against the observed values.
+
+    `null` has shape (replicates, 2) as from `chung_lu_metric_chunk`;
+    `observed` is (clustering, efficiency).
+    """
+    fig = Figure(figsize=(12, 5))
+    axes = fig.subplots(1, 2)
+    for i, (ax, name) in enumerate(zip(axes, ("Average Clustering", "Global Efficiency"))):
+        values = null[:, i][np.isfinite(null[:, i])]
+        ax.hist(values, bins=bins, alpha=0.7, label='Chung-Lu Null')
+        ax.axvline(observed[i], color='red', linestyle='--', label='Empirical')
+        ax.set_title(name)
+        ax.set_xlabel(name)
+        ax.set_ylabel("Frequency")
+        ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def chung_lu_degrees_figure(degree_counts, null_counts):
+    """Empirical cells per degree against the Chung-Lu mean +- SD (`Moments`)."""
+    degrees = np.flatnonzero(null_counts.mean)
+    empirical = np.pad(np.asarray(degree_counts), (0, len(null_counts.mean)))[degrees]
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    ax.errorbar(degrees, null_counts.mean[degrees], yerr=null_counts.std()[degrees], fmt='o',
+                label='Chung–Lu Null (mean ± SD)', color='gray', capsize=4)
+    ax.plot(degrees, empirical, 'o-', label='Empirical', color='red')
+    ax.set_xlabel('Degree')
+    ax.set_ylabel('Number of Nodes')
+    ax.set_title('Degree Distribution: Empirical vs. Chung–Lu Null')
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+# --------------------
+# One run
+# --------------------
+class _RunData:
+    """Inputs of one run's figures, computed on first use."""
+
+    def __init__(self, path, decimals, n_nulls, seed):
+        self.path = path
+        self.decimals = decimals
+        self.n_nulls = n_nulls
+        self.seed = seed
+
+    @cached_property
+    def df(self):
+        return load_path_data(self.path)
+
+    @cached_property
+    def codes(self):
+        return endpoint_codes(self.df['end-x'], self.df['end-y'], self.decimals)
+
+    @cached_property
+    def quadrant(self):
+        return quadrant_labels(self.df['end-x'], self.df['end-y'])
+
+    @cached_property
+    def degree(self):
+        return clique_metrics.node_degree(self.codes)
+
+    @cached_property
+    def degree_counts(self):
+        return np.bincount(self.degree) if self.degree.size else np.zeros(0, dtype=np.int64)
+
+    def figure(self, name):
+        if name == 'network':
+            return network_figure(self.df, self.decimals)
+        if name == 'degree_distribution':
+            return degree_distribution_figure(self.degree_counts)
+        if name == 'clustering_by_quadrant':
+            return clustering_by_quadrant_figure(self.codes, self.quadrant)
+        if name == 'degree_vs_closeness':
+            return degree_vs_closeness_figure(self.codes, self.quadrant)
+        if name == 'null_histograms':
+            chunks = run_ensemble(chung_lu_metric_chunk, self.n_nulls, args=(self.degree,), chunk_size=250,
+                                  seed=self.seed)
+            sizes = group_sizes(self.codes)
+            observed = (clique_metrics.average_clustering(sizes), clique_metrics.global_efficiency(sizes))
+            return null_histograms_figure(np.concatenate(chunks), observed)
+        if name == 'chung_lu_degrees':
+            null_counts = run_ensemble(chung_lu_degree_chunk, self.n_nulls, args=(self.degree,),
+                                       seed=self.seed, reduce=merge, initial=Moments(max(len(self.degree), 1)))
+            return chung_lu_degrees_figure(self.degree_counts, null_counts)
+        raise ValueError(f"unknown figure {name!r}")
+
+
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(out_dir, manifest):
+    target = os.path.join(out_dir, MANIFEST)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    os.replace(tmp, target)
+
+
+def render_run(path, out_dir, figures=FIGURES, n_nulls=1000, seed=0, decimals=3, dpi=150, force=False):
+    """Write the PNG figures of one run CSV to `out_dir`.
+
+    Figures whose input key matches the manifest and whose file exists are
+    skipped unless `force`. The Chung-Lu figures use `n_nulls` replicates
+    from `seed`. Returns {figure: 'rendered' or 'skipped'}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _read_manifest(out_dir)
+    digest = file_digest(path)
+    data = _RunData(path, decimals, n_nulls, seed)
+    status = {}
+    for name in figures:
+        params = {'decimals': decimals, 'dpi': dpi}
+        if name in NULL_FIGURES:
+            params.update(n_nulls=n_nulls, seed=seed)
+        key = result_key(f'figure:{name}', [digest], params, REPORT_VERSION)
+        target = os.path.join(out_dir, f"{name}.png")
+        if not force and manifest.get(name) == key and os.path.exists(target):
+            status[name] = 'skipped'
+            continue
+        tmp = f"{target}.{os.getpid()}.tmp"
+        data.figure(name).savefig(tmp, dpi=dpi, format='png')
+        os.replace(tmp, target)
+        manifest[name] = key
+        _write_manifest(out_dir, manifest)
+        status[name] = 'rendered'
+    return status
+
+
+def render_report(runs, out_dir, workers=None, **options):
+    """`render_run` for every run into `out_dir/run-<run>/`.
+
+    `runs` is {run: path} or a run directory. Runs go to a process pool of
+    `workers` (None for every core, 1 to stay in-process); `options` are
+    passed to `render_run`. Returns a DataFrame of figure status per run.
+    """
+    if isinstance(runs, (str, os.PathLike)):
+        runs = discover_runs(runs)
+    dirs = [os.path.join(out_dir, f"run-{run}") for run in runs]
+    paths = list(runs.values())
+    if workers == 1 or len(paths) <= 1:
+        results = [render_run(path, d, **options) for path, d in zip(paths, dirs)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(profiling.captured(render_run), path, d, **options)
+                       for path, d in zip(paths, dirs)]
+            results = [profiling.collect(future.result()) for future in futures]
+    return pd.DataFrame(results, index=pd.Index(list(runs), name='run'))
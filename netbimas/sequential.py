@@ -0,0 +1,121 @@
+"""Sequential Monte Carlo significance tests against null-model ensembles.
+
+Instead of a fixed replicate count, `sequential_test` draws null replicates
+in growing batches through `netbimas.ensemble.run_ensemble` and after each
+batch updates, per statistic:
+
+- the empirical p-value (b + 1) / (n + 1), where b counts replicates at
+  least as extreme as the observed value, with a Clopper-Pearson interval;
+- the z-score (observed - null mean) / null SD, with a normal-theory
+  interval from the streaming null moments.
+
+It stops as soon as every statistic is decided, meaning the p-value
+interval lies entirely on one side of `alpha`, or the interval is narrower
+than `precision`, or `max_replicates` is reached. Batch b uses the b-th
+child of the seed, so a seeded test is reproducible for any worker count.
+"""
+import numpy as np
+from scipy.stats import beta, norm
+
+from netbimas.accumulators import Moments
+from netbimas.ensemble import run_ensemble
+
+ALTERNATIVES = ('two-sided', 'greater', 'less')
+
+
+def p_value_interval(extreme, n, confidence=0.99):
+    """Clopper-Pearson interval for a tail probability seen `extreme` times in `n`."""
+    extreme = np.asarray(extreme, dtype=np.float64)
+    tail = (1 - confidence) / 2
+    with np.errstate(invalid='ignore'):
+        lo = np.where(extreme > 0, beta.ppf(tail, extreme, n - extreme + 1), 0.0)
+        hi = np.where(extreme < n, beta.ppf(1 - tail, extreme + 1, n - extreme), 1.0)
+    return lo, hi
+
+
+def _tails(extreme_hi, extreme_lo, n, alternative, confidence):
+    """Point estimate and interval of the p-value from the tail counts."""
+    if alternative == 'greater':
+        counts, scale = extreme_hi, 1
+    elif alternative == 'less':
+        counts, scale = extreme_lo, 1
+    else:
+        counts, scale = np.minimum(extreme_hi, extreme_lo), 2
+    p = np.minimum(scale * (counts + 1) / (n + 1), 1.0)
+    lo, hi = p_value_interval(counts, n, confidence)
+    return p, np.minimum(scale * lo, 1.0), np.minimum(scale * hi, 1.0)
+
+
+def sequential_test(chunk_fn, observed, args=(), alternative='two-sided', alpha=0.05,
+                    confidence=0.99, precision=0.005, min_replicates=100, max_replicates=10000,
+                    growth=2.0, seed=None, on_batch=None, **ensemble):
+    """Test `observed` against null replicates drawn by `chunk_fn`.
+
+    `chunk_fn(size, rng, *args)` must return an array with one row per
+    replicate and one column per statistic in `observed` (a 1-D array for a
+    single statistic). Batches start at `min_replicates` and grow by
+    `growth` up to `max_replicates` in total; `on_batch(values)` sees every
+    batch, e.g. to update histograms. Extra keywords (`workers`,
+    `chunk_size`, `progress`) go to `run_ensemble`.
+
+    Returns a dict of arrays (scalars for a single statistic): p_value,
+    p_low, p_high, z, z_low, z_high, null_mean, null_std, plus n (the
+    replicates used), batches and stopped ('decided', 'precision' or
+    'max_replicates').
+    """
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f"alternative must be one of {ALTERNATIVES}")
+    scalar = np.ndim(observed) == 0
+    observed = np.atleast_1d(np.asarray(observed, dtype=np.float64))
+    k = observed.size
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+    moments = Moments(k)
+    extreme_hi = np.zeros(k)
+    extreme_lo = np.zeros(k)
+    n = 0
+    batches = 0
+    batch = max(1, min(min_replicates, max_replicates))
+    while True:
+        chunks = run_ensemble(chunk_fn, batch, args=args, seed=root.spawn(1)[0], **ensemble)
+        values = np.concatenate(chunks).reshape(-1, k)
+        if on_batch is not None:
+            on_batch(values[:, 0] if scalar else values)
+        moments.update(values)
+        extreme_hi += (values >= observed).sum(axis=0)
+        extreme_lo += (values <= observed).sum(axis=0)
+        n += len(values)
+        batches += 1
+
+        p, p_lo, p_hi = _tails(extreme_hi, extreme_lo, n, alternative, confidence)
+        decided = (p_hi < alpha) | (p_lo > alpha)
+        precise = p_hi - p_lo <= precision
+        if (decided | precise).all():
+            stopped = 'decided' if decided.all() else 'precision'
+            break
+        if n >= max_replicates:
+            stopped = 'max_replicates'
+            break
+        batch = max(1, min(int(n * (growth - 1)), max_replicates - n))
+
+    std = moments.std(ddof=1) if n > 1 else np.full(k, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (observed - moments.mean) / std
+    # Standard error of a z-score with estimated mean and SD
+    crit = norm.ppf(0.5 + confidence / 2)
+    z_se = np.sqrt((1 + z ** 2 / 2) / n)
+    result = {
+        'observed': observed,
+        'p_value': p,
+        'p_low': p_lo,
+        'p_high': p_hi,
+        'z': z,
+        'z_low': z - crit * z_se,
+        'z_high': z + crit * z_se,
+        'null_mean': moments.mean,
+        'null_std': std,
+    }
+    if scalar:
+        result = {key: float(value[0]) for key, value in result.items()}
+    result.update(n=n, batches=batches, stopped=stopped)
+    return result
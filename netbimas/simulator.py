@@ -0,0 +1,366 @@
+"""Headless NumPy port of the cyano_final NetLogo model.
+
+Agents are stored as a structure of arrays (position, heading, cell length,
+parent, lineage root, active/finished flags, start/end points, distance)
+and every procedure of `go` is applied to all agents at once. One tick runs
+these phases in order:
+
+1. every cell lays 0.1 trail on its patch;
+2. cells on a patch brighter than `threshold` stop, record their endpoint
+   (`save-cyanobacteria-data`) and grow (`light-growth`) while the
+   population is below `max_population`;
+3. lineage roots on darker patches run `move-thru-field`, then one
+   `check-collision-and-move` pass over the whole population;
+4. daughters on darker patches follow their parent, one generation at a
+   time, while their root is active;
+5. the nest spawns every `spawn_interval` ticks and the trail fades.
+
+NetLogo runs `ask cyanobacteria` one agent at a time in random order, so a
+cell may see neighbours that already moved this tick; here each phase reads
+the state left by the previous one. The collision pass runs once per tick
+rather than once per moving root, using a spatial hash over patches.
+Random choices (headings, collision partners, the order of growth under
+the population cap and of endpoint saves) are drawn from a
+`numpy.random.Generator`.
+
+`who` numbers follow the model: the nest is 0, the initial cells 1..10 and
+the light sources come next. Endpoint saves are kept in memory; `path_data`
+returns the latest record per cell in the same form as
+`netbimas.loader.load_path_data`.
+"""
+import numpy as np
+import pandas as pd
+
+from netbimas import collision, profiling
+from netbimas.light import LightField
+from netbimas.loader import COLUMNS
+
+WORLD = 16  # patches -16..16 on both axes, no wrapping
+LIGHTS = ((15, 15, 5), (-15, -15, 5))  # (x, y, intensity)
+THRESHOLD = 250
+MAX_POPULATION = 250
+INITIAL_CELLS = 10
+SPAWN_INTERVAL = 25
+TRAIL_DEPOSIT = 0.1
+TRAIL_DECAY = 0.95
+GROWTH = 0.1
+SPLIT_LENGTH = 4
+
+AGENT_FIELDS = {
+    'who': np.int64,
+    'x': np.float64,
+    'y': np.float64,
+    'heading': np.float64,
+    'length': np.float64,
+    'parent': np.int64,      # index of the parent cell (itself for roots)
+    'initial': np.int64,     # index of the lineage root
+    'generation': np.int64,  # 0 for roots
+    'active': bool,
+    'finished': bool,
+    'start_x': np.float64,
+    'start_y': np.float64,
+    'end_x': np.float64,
+    'end_y': np.float64,
+    'distance': np.float64,
+    'saved_tick': np.int64,      # tick of the latest save including the cell, -1 if none
+    'saved_distance': np.float64,
+}
+
+
+# --------------------
+# World geometry
+# --------------------
+def inside(x, y, world=WORLD):
+    """Whether points lie in the non-wrapping world of patches -world..world."""
+    return (x >= -world - 0.5) & (x < world + 0.5) & (y >= -world - 0.5) & (y < world + 0.5)
+
+
+def patch_index(x, y, world=WORLD):
+    """Flat (row = pycor, column = pxcor) index of the patch under each point."""
+    side = 2 * world + 1
+    px = np.floor(np.asarray(x) + 0.5).astype(np.int64) + world
+    py = np.floor(np.asarray(y) + 0.5).astype(np.int64) + world
+    return py * side + px
+
+
+def forward(x, y, heading, distance, world=WORLD):
+    """NetLogo `fd` in a non-wrapping world.
+
+    The move is made in jumps of at most one patch, and a jump that would
+    leave the world is skipped. Negative distances move backwards (`bk`).
+    """
+    x = np.array(x, dtype=np.float64)
+    y = np.array(y, dtype=np.float64)
+    rad = np.radians(heading)
+    sign = np.sign(distance)
+    dx = sign * np.sin(rad)
+    dy = sign * np.cos(rad)
+    remaining = np.abs(np.broadcast_to(distance, x.shape)).astype(np.float64)
+    while (remaining > 0).any():
+        step = np.minimum(remaining, 1.0)
+        nx = x + step * dx
+        ny = y + step * dy
+        ok = (step > 0) & inside(nx, ny, world)
+        x = np.where(ok, nx, x)
+        y = np.where(ok, ny, y)
+        remaining = remaining - step
+    return x, y
+
+
+# --------------------
+# Simulation
+# --------------------
+class Simulation:
+    """State of one run of the model; `run(ticks)` advances it."""
+
+    def __init__(self, seed=None, lights=LIGHTS, world=WORLD, threshold=THRESHOLD,
+                 max_population=MAX_POPULATION, initial_cells=INITIAL_CELLS,
+                 spawn_interval=SPAWN_INTERVAL, log=False):
+        self.rng = np.random.default_rng(seed)
+        self.world = world
+        self.field = LightField(lights, world)
+        self.threshold = threshold
+        self.max_population = max_population
+        self.spawn_interval = spawn_interval
+        self.trail = np.zeros_like(self.field.values)
+        self.ticks = 0
+        self.last_spawn = 0
+        self.events = [] if log else None
+
+        for name, dtype in AGENT_FIELDS.items():
+            setattr(self, name, np.zeros(0, dtype=dtype))
+        # who 0 is the nest, then the cells, then the light sources
+        self.nest_heading = float(self.rng.integers(360))
+        self.next_who = 1
+        headings = self.rng.integers(360, size=initial_cells).astype(np.float64)
+        self._add_roots(np.zeros(initial_cells), np.zeros(initial_cells), headings)
+        self.next_who += len(self.field.sources)
+
+    @property
+    def n(self):
+        return self.who.size
+
+    def _append(self, **fields):
+        for name, dtype in AGENT_FIELDS.items():
+            setattr(self, name, np.concatenate([getattr(self, name), np.asarray(fields[name], dtype=dtype)]))
+
+    def _add_roots(self, x, y, headings):
+        count = len(headings)
+        index = np.arange(self.n, self.n + count)
+        self._append(
+            who=np.arange(self.next_who, self.next_who + count),
+            x=x, y=y, heading=headings, length=np.full(count, 0.1),
+            parent=index, initial=index, generation=np.zeros(count),
+            active=np.ones(count, dtype=bool), finished=np.zeros(count, dtype=bool),
+            start_x=x, start_y=y, end_x=np.zeros(count), end_y=np.zeros(count),
+            distance=np.zeros(count), saved_tick=np.full(count, -1), saved_distance=np.zeros(count),
+        )
+        self.next_who += count
+
+    @property
+    def light(self):
+        """`light-level` of every patch (rows pycor, columns pxcor)."""
+        return self.field.values
+
+    def add_light(self, x, y, intensity=5):
+        """Place a light source like `place-light-source`; returns its id."""
+        return self.field.add(x, y, intensity)
+
+    def remove_light(self, source):
+        self.field.remove(source)
+
+    # --------------------
+    # Procedures
+    # --------------------
+    def _save(self, newly):
+        """`save-cyanobacteria-data` once per newly finished cell, in order."""
+        before = np.flatnonzero(self.finished)
+        before = before[~np.isin(before, newly)]
+        saved = np.concatenate([before, newly])
+        self.saved_tick[saved] = self.ticks
+        self.saved_distance[saved] = self.distance[saved]
+        if self.events is not None:
+            # The k-th save writes every cell finished before it
+            self.events.append((self.ticks, saved, self.distance[saved].copy(),
+                                before.size + np.arange(1, newly.size + 1)))
+
+    def _light_growth(self, cells):
+        """`light-growth` for `cells` in random order under the population cap."""
+        order = self.rng.permutation(cells)
+        length = self.length[order]
+        grown = np.where(length <= SPLIT_LENGTH, length + GROWTH, length)
+        divides = grown >= SPLIT_LENGTH
+        births_before = np.cumsum(divides) - divides
+        allowed = self.n + births_before < self.max_population
+        order, grown, divides = order[allowed], grown[allowed], divides[allowed]
+        self.length[order] = np.where(divides, grown / 2, grown)
+
+        parents = order[divides]
+        if not parents.size:
+            return
+        count = parents.size
+        fields = {name: getattr(self, name)[parents] for name in AGENT_FIELDS}
+        fields['who'] = np.arange(self.next_who, self.next_who + count)
+        fields['parent'] = parents
+        fields['generation'] = fields['generation'] + 1
+        fields['x'], fields['y'] = forward(fields['x'], fields['y'], fields['heading'],
+                                           -fields['length'] * 1.2, self.world)
+        fields['saved_tick'] = np.full(count, -1)
+        fields['saved_distance'] = np.zeros(count)
+        self._append(**fields)
+        self.next_who += count
+
+    def _move_thru_field(self, roots):
+        """`move-thru-field`: step towards the brightest of 12 probes 0.1 ahead."""
+        x, y, heading = self.x[roots], self.y[roots], self.heading[roots]
+        best_light = self.field.at_patch(x, y)
+        best_heading = heading.copy()
+        found = np.zeros(roots.size, dtype=bool)
+        for k in range(1, 13):
+            probe = (heading + 30 * k) % 360
+            rad = np.radians(probe)
+            light = self.field.at_patch(x + 0.1 * np.sin(rad), y + 0.1 * np.cos(rad))
+            better = light > best_light
+            best_light = np.where(better, light, best_light)
+            best_heading = np.where(better, probe, best_heading)
+            found |= better
+
+        turn = self.rng.integers(180, size=roots.size)
+        heading = np.where(found, best_heading, (heading + turn) % 360)
+        x, y = forward(x, y, heading, 1.0, self.world)
+        steps = found.astype(np.float64)
+        distance = self.distance[roots] + steps
+
+        # Turn away from a wall that blocks the next step
+        rad = np.radians(heading)
+        stuck = ~inside(x + np.sin(rad), y + np.cos(rad), self.world)
+        heading = np.where(stuck, (heading + 150) % 360, heading)
+        nx, ny = forward(x[stuck], y[stuck], heading[stuck], 0.5, self.world)
+        x[stuck], y[stuck] = nx, ny
+        distance[stuck] += steps[stuck]
+
+        self.x[roots], self.y[roots], self.heading[roots] = x, y, heading
+        self.distance[roots] = distance
+
+    def _collide(self):
+        """One `check-collision-and-move` pass over all cells (see `netbimas.collision`)."""
+        partner = collision.random_partners(patch_index(self.x, self.y, self.world), self.rng)
+        self.heading, step = collision.resolve(partner, self.heading, self.length, self.initial)
+        moving = np.flatnonzero(step > 0)
+        self.x[moving], self.y[moving] = forward(self.x[moving], self.y[moving], self.heading[moving],
+                                                 step[moving], self.world)
+
+    def _follow(self, daughters):
+        """Daughters take their parent's heading and sit one cell length behind."""
+        daughters = daughters[self.active[self.initial[daughters]]]
+        for generation in np.unique(self.generation[daughters]):
+            cells = daughters[self.generation[daughters] == generation]
+            parents = self.parent[cells]
+            self.heading[cells] = self.heading[parents]
+            self.x[cells], self.y[cells] = forward(self.x[parents], self.y[parents], self.heading[parents],
+                                                   -self.length[cells], self.world)
+
+    def step(self, recorder=None, tracker=None):
+        """Advance the model by one tick of `go`.
+
+        `recorder` (e.g. a `netbimas.trails.TrailRecorder`) receives the
+        faded trail grid where `save-trail-data` would run, `tracker` (e.g. a
+        `netbimas.trajectories.TrajectoryRecorder`) the position of every cell
+        at the end of the tick.
+        """
+        n = self.n
+        patch = patch_index(self.x, self.y, self.world)
+        self.trail.ravel()[:] += TRAIL_DEPOSIT * np.bincount(patch, minlength=self.trail.size)
+        light = self.field.values.ravel()[patch]
+        lit = light > self.threshold
+        dark = light < self.threshold
+
+        # Cells in the light stop, save their endpoint and grow
+        self.active[lit] = False
+        newly = self.rng.permutation(np.flatnonzero(lit & ~self.finished))
+        if newly.size:
+            self.end_x[newly] = self.x[newly]
+            self.end_y[newly] = self.y[newly]
+            self.finished[newly] = True
+            self._save(newly)
+        if n < self.max_population:
+            self._light_growth(np.flatnonzero(lit))
+
+        # Roots in the dark climb the light field, then everybody collides
+        is_root = self.initial[:n] == np.arange(n)
+        roots = np.flatnonzero(dark & is_root)
+        if roots.size:
+            self._move_thru_field(roots)
+            self._collide()
+            self.active[roots] = True
+        self._follow(np.flatnonzero(dark & ~is_root))
+
+        if self.ticks - self.last_spawn >= self.spawn_interval:
+            self._add_roots(np.zeros(1), np.zeros(1), np.array([self.nest_heading]))
+            self.last_spawn = self.ticks
+        self.trail *= TRAIL_DECAY
+        if recorder is not None:
+            recorder.record(self.ticks, self.trail)
+        if tracker is not None:
+            tracker.record_positions(self.ticks, self.who, self.x, self.y)
+        self.ticks += 1
+
+    @profiling.profiled('simulate', items=lambda sim: sim.n)
+    def run(self, ticks, recorder=None, tracker=None):
+        for _ in range(ticks):
+            self.step(recorder, tracker)
+        return self
+
+    # --------------------
+    # Output
+    # --------------------
+    def _rows(self, cells, ticks, distance):
+        straight = np.hypot(self.start_x[cells] - self.end_x[cells], self.start_y[cells] - self.end_y[cells])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            efficiency = np.where(distance > 0, straight / distance, 0.0)
+        return pd.DataFrame({
+            'who': self.who[cells],
+            'tick': np.asarray(ticks, dtype=np.int64),
+            'start-x': self.start_x[cells],
+            'start-y': self.start_y[cells],
+            'end-x': self.end_x[cells],
+            'end-y': self.end_y[cells],
+            'total-distance': distance,
+            'straight-line': straight,
+            'efficiency': efficiency,
+        }, columns=COLUMNS)
+
+    def path_data(self):
+        """Latest saved record of every finished cell, like `load_path_data`."""
+        cells = np.flatnonzero(self.saved_tick >= 0)
+        df = self._rows(cells, self.saved_tick[cells], self.saved_distance[cells])
+        return df.sort_values(['tick', 'who'], kind='mergesort').reset_index(drop=True)
+
+    def records(self):
+        """Every row `save-cyanobacteria-data` would have written (needs `log=True`)."""
+        if self.events is None:
+            raise ValueError("Simulation was created without log=True")
+        frames = []
+        for tick, saved, distance, sizes in self.events:
+            take = np.concatenate([np.arange(size) for size in sizes])
+            frames.append(self._rows(saved[take], np.full(take.size, tick), distance[take]))
+        if not frames:
+            return self._rows(np.zeros(0, dtype=np.int64), [], np.zeros(0))
+        return pd.concat(frames, ignore_index=True)
+
+    def to_csv(self, path):
+        """Write a bacteria-path-data CSV: the full log if kept, else the latest rows."""
+        df = self.records() if self.events is not None else self.path_data()
+        df.to_csv(path, index=False)
+
+    def write_events(self, path):
+        """Append the same rows as `to_csv` to a binary event file."""
+        from netbimas.events import EventWriter
+
+        with EventWriter(path) as writer:
+            writer.append(self.records() if self.events is not None else self.path_data())
+
+
+def simulate(ticks, seed=None, **params):
+    """Run a fresh `Simulation(seed, **params)` for `ticks` ticks."""
+    return Simulation(seed=seed, **params).run(ticks)
@@ -0,0 +1,135 @@
+"""Parameter sweeps from simulation to network metrics.
+
+`run_sweep` expands a grid of simulator parameters into points, runs each
+point with `netbimas.simulator` in a process pool and passes the latest
+path records straight to `netbimas.catalog.analyze_path_data`. Every
+finished point is written as a one-row Parquet part file named after a
+hash of its parameters, so the output directory is a columnar dataset that
+`load_results` (or `pd.read_parquet`) reads in one call. An interrupted
+sweep resumes by skipping points whose part file already exists.
+
+Parquet output needs pyarrow.
+"""
+import hashlib
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from netbimas import profiling
+from netbimas.catalog import analyze_path_data
+from netbimas.simulator import Simulation
+
+PARAMETERS = ('lights', 'spawn_interval', 'threshold', 'max_population', 'initial_cells', 'seed')
+TICKS = 750
+
+
+def expand_grid(grid):
+    """Every combination of the value lists in `grid`, in a fixed order.
+
+    Keys are `Simulation` parameters; `lights` values are sequences of
+    (x, y, intensity) sources.
+    """
+    unknown = set(grid) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"unknown sweep parameters: {sorted(unknown)}")
+    names = [name for name in PARAMETERS if name in grid]
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def _canonical(params):
+    out = dict(params)
+    if 'lights' in out:
+        out['lights'] = [[float(v) for v in light] for light in out['lights']]
+    return out
+
+
+def point_id(params, ticks=TICKS):
+    """Stable identifier of a parameter point."""
+    spec = json.dumps([_canonical(params), ticks], sort_keys=True)
+    return hashlib.sha1(spec.encode()).hexdigest()[:16]
+
+
+def _part_path(out_dir, point):
+    return os.path.join(out_dir, f"part-{point}.parquet")
+
+
+# --------------------
+# One point
+# --------------------
+@profiling.profiled('sweep')
+def run_point(params, ticks=TICKS, decimals=3):
+    """Simulate one parameter point and return its row of metrics."""
+    sim = Simulation(**params).run(ticks)
+    df = sim.path_data()
+    metrics, degree_counts = analyze_path_data(df, decimals)
+    edges = int((np.arange(len(degree_counts)) * degree_counts).sum() // 2)
+    row = {'point': point_id(params, ticks), 'ticks': ticks}
+    for name, value in _canonical(params).items():
+        row[name] = json.dumps(value) if name == 'lights' else value
+    row.update(
+        population=sim.n,
+        finished=len(df),
+        edges=edges,
+        avg_degree=2 * edges / len(df) if len(df) else np.nan,
+        mean_distance=df['total-distance'].mean(),
+        mean_efficiency=df['efficiency'].mean(),
+    )
+    row.update(metrics)
+    return row
+
+
+def _write_part(out_dir, row):
+    target = _part_path(out_dir, row['point'])
+    tmp = f"{target}.{os.getpid()}.tmp"
+    pd.DataFrame([row]).to_parquet(tmp, index=False)
+    os.replace(tmp, target)
+
+
+# --------------------
+# Sweeps
+# --------------------
+def load_results(out_dir):
+    """All finished points of a sweep, one row per point, indexed by point id."""
+    parts = sorted(name for name in os.listdir(out_dir) if name.startswith('part-') and name.endswith('.parquet'))
+    if not parts:
+        return pd.DataFrame()
+    df = pd.concat([pd.read_parquet(os.path.join(out_dir, name)) for name in parts], ignore_index=True)
+    return df.set_index('point')
+
+
+def run_sweep(grid, out_dir, ticks=TICKS, workers=None, decimals=3, progress=False):
+    """Run every point of `grid` that is not yet in `out_dir`.
+
+    `grid` is a dict for `expand_grid` or a list of parameter dicts.
+    `workers=None` uses every core, `workers=1` runs in-process. Returns
+    `load_results(out_dir)`.
+    """
+    points = expand_grid(grid) if isinstance(grid, dict) else list(grid)
+    os.makedirs(out_dir, exist_ok=True)
+    todo = [p for p in points if not os.path.exists(_part_path(out_dir, point_id(p, ticks)))]
+    done = len(points) - len(todo)
+
+    def report():
+        if progress:
+            end = '\n' if done == len(points) else ''
+            print(f"\r[sweep] {done}/{len(points)} points", end=end, file=sys.stderr, flush=True)
+
+    report()
+    if workers == 1:
+        for params in todo:
+            _write_part(out_dir, run_point(params, ticks, decimals))
+            done += 1
+            report()
+    elif todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(profiling.captured(run_point), params, ticks, decimals) for params in todo]
+            for future in as_completed(futures):
+                _write_part(out_dir, profiling.collect(future.result()))
+                done += 1
+                report()
+    return load_results(out_dir)
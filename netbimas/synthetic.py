@@ -0,0 +1,83 @@
+"""Synthetic bacteria-path-data CSVs for scaling tests.
+
+`synthetic_path_data` draws agents that leave the nest at (0, 0) and end in
+clusters of identical endpoints around the light sources, like the runs of
+cyano_final: `cluster_size` is the mean number of cells sharing an endpoint
+(1 gives no shared endpoints), `duplication` the mean number of rows written
+per cell (`save-cyanobacteria-data` rewrites finished cells on every save,
+and only the last row counts). `write_path_csv` writes the rows in tick
+order with the column header repeated `headers` times, as a file built over
+several setups is.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from netbimas.loader import COLUMNS
+
+LIGHTS = ((15, 15), (-15, -15))
+ARENA = 16
+TICKS = 750
+
+
+def synthetic_path_data(n_agents, duplication=4.0, cluster_size=2.0, spread=0.7, lights=LIGHTS,
+                        ticks=TICKS, seed=None):
+    """Raw path-data rows (several per `who`) for `n_agents` cells, in tick order."""
+    rng = np.random.default_rng(seed)
+    # Endpoint clusters: geometric sizes with mean `cluster_size`, centred
+    # near a random light
+    sizes = rng.geometric(1 / max(cluster_size, 1), size=n_agents)
+    sizes = sizes[:np.searchsorted(np.cumsum(sizes), n_agents) + 1]
+    if sizes.size:  # none for n_agents=0, which gives an empty frame
+        sizes[-1] -= sizes.sum() - n_agents
+    lights = np.asarray(lights, dtype=np.float64)
+    centre = lights[rng.integers(len(lights), size=sizes.size)] + rng.normal(0, spread, (sizes.size, 2))
+    centre = np.clip(centre, -ARENA, ARENA)
+    end = np.repeat(centre, sizes, axis=0)[rng.permutation(n_agents)]
+
+    straight = np.hypot(end[:, 0], end[:, 1])
+    total = np.ceil(straight / rng.uniform(0.1, 0.8, n_agents))
+    final_tick = rng.integers(ticks // 10, ticks, n_agents)
+
+    # Every cell is rewritten at 1 + Poisson(duplication - 1) saves up to
+    # its final tick
+    copies = 1 + rng.poisson(max(duplication - 1, 0), n_agents)
+    row_agent = np.repeat(np.arange(n_agents), copies)
+    last = np.cumsum(copies) - 1
+    row_tick = np.floor(rng.random(row_agent.size) * (final_tick[row_agent] + 1)).astype(np.int64)
+    row_tick[last] = final_tick
+    order = np.lexsort((row_agent, row_tick))
+    row_agent = row_agent[order]
+    return pd.DataFrame({
+        'who': row_agent + 1,
+        'tick': row_tick[order],
+        'start-x': 0,
+        'start-y': 0,
+        'end-x': end[row_agent, 0],
+        'end-y': end[row_agent, 1],
+        'total-distance': total[row_agent].astype(np.int64),
+        'straight-line': straight[row_agent],
+        'efficiency': straight[row_agent] / total[row_agent],
+    }, columns=COLUMNS)
+
+
+def write_path_csv(path, rows, headers=10, chunk_rows=500_000):
+    """Write `rows` as a path-data CSV with `headers` evenly spaced header lines."""
+    breaks = set(np.linspace(0, len(rows), max(headers, 1), endpoint=False).astype(np.int64).tolist())
+    bounds = sorted(breaks | set(range(0, len(rows), chunk_rows)) | {len(rows)})
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', newline='') as fh:
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            if start in breaks:
+                fh.write(','.join(COLUMNS) + '\n')
+            rows.iloc[start:stop].to_csv(fh, header=False, index=False)
+        if not len(rows):
+            fh.write(','.join(COLUMNS) + '\n')
+    os.replace(tmp, path)
+    return path
+
+
+def write_synthetic_csv(path, n_agents, headers=10, **options):
+    """`synthetic_path_data` written with `write_path_csv`; returns `path`."""
+    return write_path_csv(path, synthetic_path_data(n_agents, **options), headers)
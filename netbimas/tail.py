@@ -0,0 +1,162 @@
+"""Follow a bacteria-path-data CSV while NetLogo is still appending to it.
+
+`save-cyanobacteria-data` rewrites every finished bacterium on each event, so
+rescanning the file after each save costs O(file size). `PathTail` remembers
+its byte offset, parses only the complete lines appended since the last poll
+and updates a latest-per-`who` table and the shared-endpoint graph in place.
+
+    python -m netbimas.tail bacteria-path-data.csv --interval 2
+"""
+import argparse
+import io
+import os
+import time
+
+import networkx as nx
+import pandas as pd
+
+from netbimas.loader import COLUMNS, finalize, latest_per_who, read_chunks
+
+
+class PathTail:
+    """Incremental reader and shared-endpoint graph for one path-data file."""
+
+    def __init__(self, path, decimals=3):
+        self.path = path
+        self.decimals = decimals
+        self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.rows = 0
+        self.latest = latest_per_who(pd.DataFrame({c: [] for c in COLUMNS + ['_row']}, dtype=float))
+        self.graph = nx.Graph()
+        self.path_groups = {}   # rounded end-coords -> set of nodes
+        self.node_coords = {}   # node -> rounded end-coords
+        # Running sums over the shared-endpoint cliques
+        self.ordered_pairs = 0  # sum of k * (k - 1)
+        self.clustered = 0      # nodes in cliques of size >= 3
+
+    # --------------------
+    # Reading
+    # --------------------
+    def read_new(self):
+        """Return the complete lines appended since the last call as bytes."""
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            # File was truncated or replaced: start over
+            self.reset()
+        if size == self.offset:
+            return b''
+        with open(self.path, 'rb') as fh:
+            fh.seek(self.offset)
+            data = fh.read(size - self.offset)
+        end = data.rfind(b'\n') + 1
+        self.offset += end
+        return data[:end]
+
+    def poll(self):
+        """Consume newly appended rows; return the number of rows read."""
+        data = self.read_new()
+        if not data:
+            return 0
+        first_row = self.rows
+        self.rows += data.count(b'\n')
+        for chunk in read_chunks(io.BytesIO(data), first_row=first_row):
+            if chunk.empty:
+                continue
+            batch = latest_per_who(chunk)
+            merged = latest_per_who(pd.concat([self.latest, batch], ignore_index=True))
+            changed = merged.merge(self.latest[['who', '_row']], on=['who', '_row'], how='left', indicator=True)
+            self.latest = merged
+            for row in changed.loc[changed['_merge'] == 'left_only'].itertuples(index=False):
+                self.update_node(int(row[0]), (round(row[4], self.decimals), round(row[5], self.decimals)))
+        return self.rows - first_row
+
+    # --------------------
+    # Graph maintenance
+    # --------------------
+    def _leave(self, node, coords):
+        group = self.path_groups[coords]
+        k = len(group)
+        group.discard(node)
+        self.graph.remove_edges_from((node, other) for other in group)
+        self.ordered_pairs -= 2 * (k - 1)
+        self.clustered -= 3 if k == 3 else (1 if k > 3 else 0)
+        if not group:
+            del self.path_groups[coords]
+
+    def _join(self, node, coords):
+        group = self.path_groups.setdefault(coords, set())
+        k = len(group) + 1
+        self.graph.add_edges_from(((node, other) for other in group), weight=1.0)
+        group.add(node)
+        self.ordered_pairs += 2 * (k - 1)
+        self.clustered += 3 if k == 3 else (1 if k > 3 else 0)
+
+    def update_node(self, who, coords):
+        node = f"Cell-{who}"
+        old = self.node_coords.get(node)
+        if old == coords:
+            return
+        if old is None:
+            self.graph.add_node(node)
+        else:
+            self._leave(node, old)
+        self.node_coords[node] = coords
+        self._join(node, coords)
+
+    # --------------------
+    # Metrics
+    # --------------------
+    def metrics(self):
+        """Global efficiency, average degree and clustering of the current graph.
+
+        The graph is a disjoint union of cliques, so these follow from the
+        running clique sums and agree with nx.global_efficiency,
+        the mean degree and nx.average_clustering.
+        """
+        n = self.graph.number_of_nodes()
+        return {
+            'tick': int(self.latest['tick'].max()) if n else 0,
+            'nodes': n,
+            'global_eff': self.ordered_pairs / (n * (n - 1)) if n > 1 else 0.0,
+            'avg_degree': self.ordered_pairs / n if n else 0.0,
+            'clustering': self.clustered / n if n else 0.0,
+        }
+
+    def table(self):
+        """The latest-per-`who` table, ordered like `load_path_data`."""
+        return finalize(self.latest)
+
+
+def watch(path, interval=1.0, decimals=3, callback=None):
+    """Poll `path` forever, calling `callback(metrics)` after every batch."""
+    tail = PathTail(path, decimals=decimals)
+    while True:
+        if os.path.exists(path) and tail.poll():
+            metrics = tail.metrics()
+            if callback is None:
+                print(f"tick {metrics['tick']}: {metrics['nodes']} cells, "
+                      f"Global Efficiency: {metrics['global_eff']:.4f}, "
+                      f"Average Degree: {metrics['avg_degree']:.2f}, "
+                      f"Average Clustering: {metrics['clustering']:.4f}", flush=True)
+            else:
+                callback(metrics)
+        time.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help="bacteria-path-data CSV being written by NetLogo")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between polls")
+    parser.add_argument('--decimals', type=int, default=3, help="rounding of end-coords")
+    args = parser.parse_args(argv)
+    try:
+        watch(args.path, args.interval, args.decimals)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Streaming analytics of recorded trail frames.
+
+Frames come from `netbimas.trails.read_trails`: a (frames, height, width)
+array, usually memory-mapped, with rows pycor and columns pxcor. Every
+function here walks the stack in blocks of `chunk_frames`, so only one
+block is ever in memory.
+
+`trail_summary` gives, per run, mean and max heatmaps, the per-frame trail
+mass per quadrant, when each patch first reaches `saturation` (1.0, where
+the model's `scale-color red trail 0 1` saturates) and how the trail maps
+correlate with the light field. `summarize_runs` does the same for several
+recordings and returns one row of scalars per run, as
+`netbimas.catalog.compare_runs` does for the network metrics, plus the
+cross-run heatmaps.
+"""
+import numpy as np
+import pandas as pd
+from scipy.stats import spearmanr
+
+from netbimas.light import light_field
+from netbimas.trails import read_trails
+
+CHUNK_FRAMES = 256
+SATURATION = 1.0
+QUADRANTS = ('Q1', 'Q2', 'Q3', 'Q4')
+
+
+def quadrant_masks(shape):
+    """Patch masks of the four quadrants for a centred (height, width) grid.
+
+    Patches on the axes belong to no quadrant, as in the endpoint analyses.
+    """
+    py = np.arange(shape[0])[:, None] - shape[0] // 2
+    px = np.arange(shape[1])[None, :] - shape[1] // 2
+    return {
+        'Q1': (px > 0) & (py > 0),
+        'Q2': (px < 0) & (py > 0),
+        'Q3': (px < 0) & (py < 0),
+        'Q4': (px > 0) & (py < 0),
+    }
+
+
+def _pearson_rows(block, reference):
+    """Pearson correlation of every row of `block` with `reference`."""
+    centred = block - block.mean(axis=1, keepdims=True)
+    ref = reference - reference.mean()
+    denom = np.sqrt((centred ** 2).sum(axis=1) * (ref ** 2).sum())
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denom > 0, centred @ ref / denom, np.nan)
+
+
+def trail_summary(frames, ticks=None, light=None, lights=None, saturation=SATURATION,
+                  chunk_frames=CHUNK_FRAMES):
+    """Aggregate one run's trail frames in chunked passes.
+
+    `light` is the patch light field (or give `lights` as (x, y, intensity)
+    sources). Returns a dict with 'mean' and 'max' heatmaps,
+    'first_saturation' (tick each patch first reaches `saturation`, nan if
+    never), 'series' (a DataFrame indexed by tick with total and per-quadrant
+    mass and the per-frame correlation with log10 light) and the scalars
+    'frames', 'saturation_tick' and 'light_correlation' (Spearman, mean map
+    vs light).
+    """
+    n_frames, height, width = frames.shape
+    ticks = np.arange(n_frames) if ticks is None else np.asarray(ticks)
+    if light is None and lights is not None:
+        light = light_field(lights, height // 2)
+    masks = quadrant_masks((height, width))
+    flat_masks = np.stack([masks[q].ravel() for q in QUADRANTS], axis=1).astype(np.float64)
+    log_light = np.log10(light.ravel()) if light is not None else None
+
+    total = np.zeros(height * width)
+    peak = np.full(height * width, -np.inf)
+    first = np.full(height * width, np.nan)
+    mass = np.zeros((n_frames, len(QUADRANTS)))
+    totals = np.zeros(n_frames)
+    corr = np.full(n_frames, np.nan)
+    for start in range(0, n_frames, chunk_frames):
+        stop = min(start + chunk_frames, n_frames)
+        block = np.asarray(frames[start:stop], dtype=np.float64).reshape(stop - start, -1)
+        total += block.sum(axis=0)
+        np.maximum(peak, block.max(axis=0), out=peak)
+        hit = block >= saturation
+        new = np.isnan(first) & hit.any(axis=0)
+        first[new] = ticks[start + hit[:, new].argmax(axis=0)]
+        mass[start:stop] = block @ flat_masks
+        totals[start:stop] = block.sum(axis=1)
+        if log_light is not None:
+            corr[start:stop] = _pearson_rows(block, log_light)
+
+    mean = (total / n_frames if n_frames else total).reshape(height, width)
+    series = pd.DataFrame(mass, columns=[f'{q.lower()}_mass' for q in QUADRANTS],
+                          index=pd.Index(ticks, name='tick'))
+    series.insert(0, 'total_mass', totals)
+    if log_light is not None:
+        series['light_corr'] = corr
+        light_corr = spearmanr(mean.ravel(), light.ravel())[0] if n_frames else np.nan
+    else:
+        light_corr = np.nan
+    return {
+        'frames': n_frames,
+        'mean': mean,
+        'max': peak.reshape(height, width) if n_frames else np.zeros((height, width)),
+        'first_saturation': first.reshape(height, width),
+        'saturation_tick': np.nanmin(first) if np.isfinite(first).any() else np.nan,
+        'series': series,
+        'light_correlation': light_corr,
+    }
+
+
+def run_scalars(summary):
+    """Flat per-run scalars of a `trail_summary`, for report tables."""
+    series = summary['series']
+    mass = series[[f'{q.lower()}_mass' for q in QUADRANTS]].sum()
+    share = mass / mass.sum() if mass.sum() > 0 else mass * np.nan
+    out = {
+        'trail_frames': summary['frames'],
+        'trail_mean_mass': series['total_mass'].mean(),
+        'trail_peak': float(summary['max'].max()),
+        'trail_saturation_tick': summary['saturation_tick'],
+        'trail_saturated_patches': int(np.isfinite(summary['first_saturation']).sum()),
+        'trail_light_correlation': summary['light_correlation'],
+    }
+    for q in QUADRANTS:
+        out[f'trail_{q.lower()}_share'] = share[f'{q.lower()}_mass']
+    return out
+
+
+def summarize_runs(recordings, lights=None, saturation=SATURATION, chunk_frames=CHUNK_FRAMES):
+    """`trail_summary` for {run: recording path}.
+
+    Returns `(table, heatmaps)`: one row of `run_scalars` per run, and the
+    cross-run 'mean' (weighted by frames) and 'max' heatmaps.
+    """
+    rows = {}
+    total = None
+    peak = None
+    n_frames = 0
+    for run, path in recordings.items():
+        frames, ticks = read_trails(path)
+        summary = trail_summary(frames, ticks, lights=lights, saturation=saturation,
+                                chunk_frames=chunk_frames)
+        rows[run] = run_scalars(summary)
+        weighted = summary['mean'] * summary['frames']
+        total = weighted if total is None else total + weighted
+        peak = summary['max'] if peak is None else np.maximum(peak, summary['max'])
+        n_frames += summary['frames']
+    table = pd.DataFrame.from_dict(rows, orient='index')
+    table.index.name = 'run'
+    heatmaps = {'mean': total / n_frames if n_frames else total, 'max': peak}
+    return table, heatmaps
@@ -0,0 +1,181 @@
+"""Frame-based recording of the simulator's trail grid.
+
+`save-trail-data` writes one CSV line per patch per tick. `TrailRecorder`
+writes the whole `trail` grid as one float32 frame instead, optionally only
+every `every` ticks. With `compress=True` each frame is XOR-ed bitwise with
+the previous one and the resulting words are zero-run encoded, so patches
+whose trail did not change (most of an empty arena) cost almost nothing.
+
+`read_trails` returns the recording as a memory-mapped (frames, height,
+width) float32 array plus the tick of every frame. Compressed recordings are
+decoded once into a `.npy` file next to them, which is reused until the
+recording changes.
+
+File layout: a 32-byte header (magic b'NBTR', uint16 version, uint16 flags,
+uint32 height and width, int64 first tick, uint32 tick step, uint32 spare),
+then raw float32 frames, or per frame a uint32 word count followed by the
+encoded words.
+"""
+import os
+
+import numpy as np
+
+MAGIC = b'NBTR'
+VERSION = 1
+COMPRESSED = 1
+HEADER_DTYPE = np.dtype([('magic', 'S4'), ('version', '<u2'), ('flags', '<u2'),
+                         ('height', '<u4'), ('width', '<u4'), ('first_tick', '<i8'),
+                         ('every', '<u4'), ('reserved', '<u4')])
+HEADER_SIZE = HEADER_DTYPE.itemsize
+DECODED_SUFFIX = '.npy'
+
+
+# --------------------
+# Zero-run coding
+# --------------------
+def encode_zero_runs(words):
+    """Encode uint32 words as (zeros, count, count literal words) groups.
+
+    The stream always ends with a (trailing zeros, 0) group.
+    """
+    words = np.asarray(words, dtype=np.uint32)
+    nz = np.concatenate([[False], words != 0, [False]])
+    edges = np.flatnonzero(nz[1:] != nz[:-1])
+    starts, ends = edges[0::2], edges[1::2]
+    counts = ends - starts
+    zeros = starts - np.concatenate([[0], ends[:-1]])
+    tail = words.size - (ends[-1] if ends.size else 0)
+
+    out = np.empty(2 * (starts.size + 1) + counts.sum(), dtype=np.uint32)
+    group = 2 * np.arange(starts.size) + np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+    out[group] = zeros
+    out[group + 1] = counts
+    literal = np.repeat(group + 2 - starts, counts) + np.flatnonzero(words)
+    out[literal] = words[words != 0]
+    out[-2:] = (tail, 0)
+    return out
+
+
+def decode_zero_runs(stream, size):
+    """Inverse of `encode_zero_runs` for a frame of `size` words."""
+    words = np.zeros(size, dtype=np.uint32)
+    pos = 0
+    at = 0
+    while True:
+        zeros, count = int(stream[at]), int(stream[at + 1])
+        pos += zeros
+        if count == 0:
+            break
+        words[pos:pos + count] = stream[at + 2:at + 2 + count]
+        pos += count
+        at += 2 + count
+    return words
+
+
+# --------------------
+# Recording
+# --------------------
+class TrailRecorder:
+    """Write trail frames for ticks first_tick, first_tick + every, ..."""
+
+    def __init__(self, path, shape, every=1, first_tick=0, compress=False):
+        self.path = path
+        self.shape = tuple(shape)
+        self.every = every
+        self.first_tick = first_tick
+        self.compress = compress
+        self.frames = 0
+        self._previous = np.zeros(int(np.prod(self.shape)), dtype=np.uint32)
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header[0] = (MAGIC, VERSION, COMPRESSED if compress else 0, self.shape[0], self.shape[1],
+                     first_tick, every, 0)
+        self._fh = open(path, 'wb')
+        self._fh.write(header.tobytes())
+
+    def record(self, tick, trail):
+        """Write `trail` if `tick` is on the recording schedule."""
+        if tick < self.first_tick or (tick - self.first_tick) % self.every:
+            return False
+        frame = np.ascontiguousarray(trail, dtype=np.float32).reshape(-1)
+        if frame.size != self._previous.size:
+            raise ValueError(f"trail frame has {frame.size} patches, expected {self._previous.size}")
+        if self.compress:
+            words = frame.view(np.uint32)
+            stream = encode_zero_runs(words ^ self._previous)
+            self._previous = words.copy()
+            self._fh.write(np.uint32(stream.size).tobytes())
+            self._fh.write(stream.tobytes())
+        else:
+            self._fh.write(frame.tobytes())
+        self.frames += 1
+        return True
+
+    def close(self):
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --------------------
+# Reading
+# --------------------
+def read_header(path):
+    with open(path, 'rb') as fh:
+        raw = fh.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE or raw[:4] != MAGIC:
+        raise ValueError(f"{path}: not a trail recording")
+    header = np.frombuffer(raw, dtype=HEADER_DTYPE)[0]
+    if header['version'] != VERSION:
+        raise ValueError(f"{path}: unsupported trail recording version {header['version']}")
+    return header
+
+
+def _decode(path, header, target):
+    shape = (int(header['height']), int(header['width']))
+    size = shape[0] * shape[1]
+    words = (os.path.getsize(path) - HEADER_SIZE) // 4
+    stream = (np.memmap(path, dtype=np.uint32, mode='r', offset=HEADER_SIZE, shape=(words,))
+              if words else np.zeros(0, dtype=np.uint32))
+    # Find the frame boundaries first; a frame cut short by an interrupted
+    # write is dropped
+    bounds = []
+    at = 0
+    while at < stream.size:
+        end = at + 1 + int(stream[at])
+        if end > stream.size:
+            break
+        bounds.append((at + 1, end))
+        at = end
+
+    tmp = f"{target}.{os.getpid()}.tmp.npy"
+    out = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32, shape=(len(bounds),) + shape)
+    previous = np.zeros(size, dtype=np.uint32)
+    for i, (start, end) in enumerate(bounds):
+        previous = previous ^ decode_zero_runs(stream[start:end], size)
+        out[i] = previous.view(np.float32).reshape(shape)
+    out.flush()
+    del out, stream
+    os.replace(tmp, target)
+
+
+def read_trails(path):
+    """Memory-mapped (frames, height, width) trail array and the tick of each frame."""
+    header = read_header(path)
+    shape = (int(header['height']), int(header['width']))
+    if header['flags'] & COMPRESSED:
+        target = os.fspath(path) + DECODED_SUFFIX
+        if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(path):
+            _decode(path, header, target)
+        frames = np.load(target, mmap_mode='r')
+    else:
+        count = (os.path.getsize(path) - HEADER_SIZE) // (4 * shape[0] * shape[1])
+        if count:
+            frames = np.memmap(path, dtype=np.float32, mode='r', offset=HEADER_SIZE, shape=(count,) + shape)
+        else:
+            frames = np.zeros((0,) + shape, dtype=np.float32)
+    ticks = int(header['first_tick']) + int(header['every']) * np.arange(len(frames))
+    return frames, ticks
@@ -0,0 +1,172 @@
+"""Per-tick trajectories and the shared-path network.
+
+The path records keep only where each cell ended up. `TrajectoryRecorder`
+captures the position of every cell at every tick of a
+`netbimas.simulator.Simulation` (pass it as `tracker=` to `step`/`run`).
+`patch_visits` collapses consecutive ticks on the same patch into one
+visit, and `VisitIndex` is the inverted index from patch to the
+(agent, first tick, last tick) visits made there.
+
+`shared_path_adjacency` links cells whose paths overlap. With B the binary
+agent x patch incidence matrix, B @ B.T counts for every pair of agents the
+patches both have visited, in one sparse product instead of a comparison of
+every pair of paths. The result has the CSR layout of `netbimas.graph`, so
+`netbimas.graph.to_networkx` turns it into a graph.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from netbimas.simulator import WORLD, patch_index
+
+POSITION_COLUMNS = ('who', 'tick', 'x', 'y')
+
+
+# --------------------
+# Capture
+# --------------------
+class TrajectoryRecorder:
+    """Collect cell positions for ticks first_tick, first_tick + every, ..."""
+
+    def __init__(self, every=1, first_tick=0):
+        self.every = every
+        self.first_tick = first_tick
+        self.samples = 0
+        self._blocks = []
+
+    def record_positions(self, tick, who, x, y):
+        """Store the positions of all cells if `tick` is on the schedule."""
+        if tick < self.first_tick or (tick - self.first_tick) % self.every:
+            return False
+        self._blocks.append((np.full(len(who), tick, dtype=np.int32), np.asarray(who, dtype=np.int32),
+                             np.asarray(x, dtype=np.float32), np.asarray(y, dtype=np.float32)))
+        self.samples += len(who)
+        return True
+
+    def arrays(self):
+        """Dict of the captured `who`, `tick`, `x` and `y` columns."""
+        if not self._blocks:
+            return {'who': np.zeros(0, np.int32), 'tick': np.zeros(0, np.int32),
+                    'x': np.zeros(0, np.float32), 'y': np.zeros(0, np.float32)}
+        tick, who, x, y = (np.concatenate(column) for column in zip(*self._blocks))
+        self._blocks = [(tick, who, x, y)]
+        return {'who': who, 'tick': tick, 'x': x, 'y': y}
+
+    def positions(self):
+        """Captured positions as a DataFrame, one row per cell per tick."""
+        return pd.DataFrame(self.arrays(), columns=list(POSITION_COLUMNS))
+
+    def save(self, path):
+        """Write the captured positions to an `.npz` file."""
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, **self.arrays())
+        os.replace(tmp, path)
+
+
+def load_positions(path):
+    """Positions saved by `TrajectoryRecorder.save`, as a DataFrame."""
+    with np.load(path) as data:
+        return pd.DataFrame({name: data[name] for name in POSITION_COLUMNS})
+
+
+# --------------------
+# Inverted index
+# --------------------
+def patch_visits(positions, world=WORLD):
+    """Collapse per-tick positions into patch visits.
+
+    Consecutive samples of one cell on the same patch form a visit. Returns
+    a DataFrame with `who`, `patch` (flat index, row = pycor), `first_tick`,
+    `last_tick` and `samples`, sorted by cell and time.
+    """
+    who = np.asarray(positions['who'], dtype=np.int64)
+    tick = np.asarray(positions['tick'], dtype=np.int64)
+    patch = patch_index(positions['x'], positions['y'], world)
+    order = np.lexsort((tick, who))
+    who, tick, patch = who[order], tick[order], patch[order]
+    starts = np.flatnonzero(np.concatenate([[True], (who[1:] != who[:-1]) | (patch[1:] != patch[:-1])])) \
+        if who.size else np.zeros(0, dtype=np.int64)
+    ends = np.append(starts[1:], who.size) - 1
+    return pd.DataFrame({
+        'who': who[starts],
+        'patch': patch[starts],
+        'first_tick': tick[starts],
+        'last_tick': tick[ends],
+        'samples': ends - starts + 1,
+    })
+
+
+class VisitIndex:
+    """Patch -> visits lookup over the output of `patch_visits`."""
+
+    def __init__(self, visits, world=WORLD):
+        self.world = world
+        self.n_patches = (2 * world + 1) ** 2
+        patch = visits['patch'].to_numpy()
+        order = np.argsort(patch, kind='stable')
+        self.visits = visits.iloc[order].reset_index(drop=True)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(patch, minlength=self.n_patches))])
+
+    def at(self, patch):
+        """Every visit to the flat patch index `patch`."""
+        return self.visits.iloc[self.offsets[patch]:self.offsets[patch + 1]]
+
+    def agents_at(self, patch, tick=None):
+        """`who` of the cells that visited `patch`, at `tick` if given."""
+        visits = self.at(patch)
+        if tick is not None:
+            visits = visits[(visits['first_tick'] <= tick) & (visits['last_tick'] >= tick)]
+        return np.unique(visits['who'].to_numpy())
+
+    def incidence(self, who=None):
+        """Binary CSR (agent x patch) matrix; rows follow `who` (default: sorted)."""
+        return _incidence(self.visits, self.n_patches, who)
+
+
+def _incidence(visits, n_patches, who=None):
+    visit_who = visits['who'].to_numpy()
+    if who is None:
+        who = np.unique(visit_who)
+    who = np.asarray(who)
+    order = np.argsort(who, kind='stable')
+    pos = np.searchsorted(who[order], visit_who)
+    known = pos < who.size
+    known[known] = who[order][pos[known]] == visit_who[known]
+    rows = order[pos[known]]
+    cols = visits['patch'].to_numpy()[known]
+    B = sp.csr_array((np.ones(rows.size, dtype=np.int32), (rows, cols)), shape=(who.size, n_patches))
+    B.data[:] = 1  # repeated visits to a patch count once
+    return B
+
+
+# --------------------
+# Shared-path network
+# --------------------
+def shared_path_adjacency(visits, who=None, min_shared=1, world=WORLD):
+    """Symmetric CSR adjacency weighted by the number of co-visited patches.
+
+    `visits` is a `patch_visits` frame. Rows and columns follow `who` (e.g.
+    `path_data()['who']`, so the result lines up with the endpoint
+    networks); by default the sorted cells that appear in `visits`. Pairs
+    sharing fewer than `min_shared` patches are dropped.
+    """
+    B = _incidence(visits, (2 * world + 1) ** 2, who)
+    A = (B @ B.T).tocsr()
+    A.setdiag(0)
+    if min_shared > 1:
+        A.data[A.data < min_shared] = 0
+    A.eliminate_zeros()
+    A.sort_indices()
+    return A
+
+
+def shared_path_network(sim, positions, min_shared=1):
+    """Shared-path adjacency over the finished cells of `sim`.
+
+    Returns `(A, who)` with the rows ordered like `sim.path_data()`.
+    """
+    who = sim.path_data()['who'].to_numpy()
+    visits = patch_visits(positions, sim.world)
+    return shared_path_adjacency(visits, who, min_shared, sim.world), who
@@ -1,31 +1,20 @@
-import pandas as pd
 import networkx as nx
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy.spatial.distance import euclidean
-
-# --------------------
-# Load and clean the data
-# --------------------
-df = pd.read_csv("/Users/loganbarrios/NetBIMAS/Simulation_Runs_2lights/1-bacteria-path-data.csv")
-
-# Remove any repeated header rows
-df = df[df['who'] != 'who']
+from collections import Counter
 
-# Convert all relevant columns to numeric
-numeric_cols = ['who', 'tick', 'start-x', 'start-y', 'end-x', 'end-y', 'total-distance', 'straight-line', 'efficiency']
-df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors='coerce')
+from netbimas import clique_metrics
+from netbimas.cache import ResultCache
+from netbimas.clique_metrics import group_sizes
+from netbimas.graph import clique_adjacency, endpoint_codes, to_networkx
+from netbimas.loader import load_path_data
+from netbimas.nulls import NULL_VERSION, random_endpoint_null
 
-# Drop any rows with NaNs after conversion
-# Drop any rows with NaNs after conversion
-df = df.dropna(subset=numeric_cols)
+PATH = "/Users/loganbarrios/NetBIMAS/Simulation_Runs_2lights/1-bacteria-path-data.csv"
+QUADRANTS = ['Q1', 'Q3']
+METRICS_VERSION = '1'  # bump when network_metrics changes
 
-# Keep only most recent data per bacterium
-df = df.sort_values(by='tick') \
-       .drop_duplicates(subset='who', keep='last') \
-       .reset_index(drop=True)
 
-# Assign quadrant based on final location
 def assign_quadrant(x, y):
     if x > 0 and y > 0:
         return 'Q1'
@@ -38,286 +27,270 @@ def assign_quadrant(x, y):
     else:
         return 'Other'
 
-df['quadrant'] = df.apply(lambda row: assign_quadrant(row['end-x'], row['end-y']), axis=1)
-# Assign a rounded endpoint coordinate to group identical paths
-df['end-coords'] = list(zip(df['end-x'].round(3), df['end-y'].round(3)))
-
-
-# --------------------
-# Build Network: Nest and Cyanobacteria Nodes
-# --------------------
-G = nx.Graph()
-G.add_node('Nest')
-
-# Add bacterium nodes and connect to Nest
-for _, row in df[df['quadrant'].isin(['Q1', 'Q3'])].iterrows():
-    target = f"Cell-{row['who']}"
-    G.add_node(target, pos=(row['end-x'], row['end-y']))
-    G.add_edge('Nest', target, weight=row['total-distance'])  # could use 'straight-line'
-
-# --------------------
-# Add edges between bacteria with similar endpoints
-# --------------------
-# --------------------
-# Add edges between bacteria with similar endpoints
-# --------------------
-# --------------------
-# Add edges only between bacteria in the same quadrant
-# --------------------
-#threshold = 1.0  # spatial distance threshold
-#df = df.reset_index(drop=True)
-
-#for q in ['Q1', 'Q3']:
-#    df_q = df[df['quadrant'] == q].reset_index(drop=True)
-#    for i, row1 in df_q.iterrows():
-#        for j in range(i + 1, len(df_q)):
-#            row2 = df_q.iloc[j]
-#            node1 = f"Cell-{row1['who']}"
-#            node2 = f"Cell-{row2['who']}"
-#
-#            if node1 == node2:
-#                continue
-#
-#            dist = euclidean((row1['end-x'], row1['end-y']), (row2['end-x'], row2['end-y']))
-#            if dist <= threshold and not G.has_edge(node1, node2):
-#                G.add_edge(node1, node2, weight=1 / (dist + 1e-6))  # safe inverse distance
-from collections import defaultdict
-
-# Group nodes by identical end-coords (shared path)
-path_groups = defaultdict(list)
-
-for _, row in df[df['quadrant'].isin(['Q1', 'Q3'])].iterrows():
-    node = f"Cell-{row['who']}"
-    path_groups[row['end-coords']].append(node)
-
-# Connect all nodes that share the exact path
-for group in path_groups.values():
-    for i in range(len(group)):
-        for j in range(i + 1, len(group)):
-            node1, node2 = group[i], group[j]
-            if not G.has_edge(node1, node2):
-                G.add_edge(node1, node2, weight=1.0)
-
-# --------------------
-# Efficiency & Degree
-# --------------------
-efficiency = nx.global_efficiency(G)
-print(f"Global Network Efficiency: {efficiency:.4f}")
-
-avg_degree = sum(dict(G.degree()).values()) / G.number_of_nodes()
-print(f"Average Degree: {avg_degree:.2f}")
-
-# --------------------
-# Plot Network
-# --------------------
-# --------------------
-# Custom cluster layout by quadrant
-# --------------------
-
-# Start with Nest in the middle
-# --------------------
-# Tighter cluster layout by quadrant
-# --------------------
-
-# Place the Nest in the center
-# Nest in center
-pos = {'Nest': (0, 0)}
-
-# Q1: upper right, tight grid
-for i, row in enumerate(df[df['quadrant'] == 'Q1'].itertuples()):
-    pos[f"Cell-{row.who}"] = (1.5 + (i % 5), 1.5 + (i // 5))
-
-# Q3: lower left, tight grid
-for i, row in enumerate(df[df['quadrant'] == 'Q3'].itertuples()):
-    pos[f"Cell-{row.who}"] = (-1.5 - (i % 5), -1.5 - (i // 5))
-
-
-#pos = nx.spring_layout(G, k=2, seed=42)  # Larger k spreads out nodes
-#nx.draw(G, pos, with_labels=True, node_size=300, font_size=8)
-#nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'))
-# --------------------
-# Color nodes by quadrant category
-# --------------------
-color_map = []
-for node in G.nodes():
-    if node == 'Nest':
-        color_map.append('gray')  # or 'white'
-    else:
-        # Extract agent ID from node label
-        agent_id = int(node.replace('Cell-', ''))
-        quadrant = df[df['who'] == agent_id]['quadrant'].values[0]
-        if quadrant == 'Q1':
-            color_map.append('red')
-        elif quadrant == 'Q3':
-            color_map.append('blue')
+
+def network_metrics(codes, quadrant_masks):
+    """Closed-form metrics of the Q1/Q3 cells, with and without the Nest."""
+    sizes = group_sizes(codes)
+    metrics = {
+        'global_eff_nest': clique_metrics.global_efficiency(sizes, nest=True),
+        # A union of cliques is connected exactly when it is one clique, so
+        # this matches nx.is_connected on the Nest-free graph
+        'connected': sizes.size == 1,
+        'diameter': clique_metrics.diameter(sizes, largest=True),
+        'avg_path_length': clique_metrics.average_shortest_path_length(sizes, largest=True),
+        'global_eff': clique_metrics.global_efficiency(sizes),
+    }
+    for q, mask in quadrant_masks.items():
+        metrics[f'{q}_clustering'] = clique_metrics.node_clustering(codes[mask])
+        metrics[f'{q}_degree'] = clique_metrics.node_degree(codes[mask])
+        metrics[f'{q}_closeness'] = clique_metrics.node_closeness(codes[mask])
+        metrics[f'{q}_eff'] = clique_metrics.global_efficiency(group_sizes(codes, mask))
+    return metrics
+
+
+def main(force=False):
+    # --------------------
+    # Load and clean the data
+    # --------------------
+    # Repeated headers are dropped and only the most recent row per bacterium
+    # is kept while parsing
+    df = load_path_data(PATH)
+
+    # Metrics and null ensembles come from the result cache while the CSV is
+    # unchanged (force=True, --force or NETBIMAS_FORCE=1 recomputes them)
+    cache = ResultCache(force=force or None)
+
+    # Assign quadrant based on final location
+    df['quadrant'] = df.apply(lambda row: assign_quadrant(row['end-x'], row['end-y']), axis=1)
+
+
+    # --------------------
+    # Build Network: Nest and Cyanobacteria Nodes
+    # --------------------
+    G = nx.Graph()
+    G.add_node('Nest')
+
+    # Add bacterium nodes and connect to Nest
+    df_q13 = df[df['quadrant'].isin(QUADRANTS)]
+    G.add_nodes_from((f"Cell-{who}", {'pos': (x, y)})
+                     for who, x, y in zip(df_q13['who'], df_q13['end-x'], df_q13['end-y']))
+    G.add_weighted_edges_from(('Nest', f"Cell-{who}", dist)  # could use 'straight-line'
+                              for who, dist in zip(df_q13['who'], df_q13['total-distance']))
+
+    # --------------------
+    # Add edges between bacteria with similar endpoints
+    # --------------------
+    # Tolerance variant: link cells in the same quadrant whose endpoints lie
+    # within `threshold` of each other, weighted 1 / (dist + 1e-6)
+    #from netbimas.graph import radius_endpoint_adjacency
+    #threshold = 1.0  # spatial distance threshold
+    #to_networkx(radius_endpoint_adjacency(df_q13, threshold, same_quadrant=True), df_q13['who'], graph=G)
+
+    # Connect all nodes that share the exact path (identical end-coords
+    # rounded to 3 decimals). The cells form a disjoint union of cliques, one
+    # per group code, so the metrics below follow from the group sizes.
+    codes = endpoint_codes(df_q13['end-x'], df_q13['end-y'])
+    to_networkx(clique_adjacency(codes), df_q13['who'], graph=G)
+    quadrant_masks = {q: (df_q13['quadrant'] == q).to_numpy() for q in QUADRANTS}
+    metrics = cache.cached('network_analysis', lambda: network_metrics(codes, quadrant_masks), [PATH],
+                           {'decimals': 3, 'quadrants': QUADRANTS}, METRICS_VERSION)
+
+    # --------------------
+    # Efficiency & Degree
+    # --------------------
+    efficiency = metrics['global_eff_nest']
+    print(f"Global Network Efficiency: {efficiency:.4f}")
+
+    avg_degree = sum(dict(G.degree()).values()) / G.number_of_nodes()
+    print(f"Average Degree: {avg_degree:.2f}")
+
+    # --------------------
+    # Plot Network
+    # --------------------
+    # --------------------
+    # Custom cluster layout by quadrant
+    # --------------------
+
+    # Start with Nest in the middle
+    # --------------------
+    # Tighter cluster layout by quadrant
+    # --------------------
+
+    # Place the Nest in the center
+    # Nest in center
+    pos = {'Nest': (0, 0)}
+
+    # Q1: upper right, tight grid
+    for i, row in enumerate(df[df['quadrant'] == 'Q1'].itertuples()):
+        pos[f"Cell-{row.who}"] = (1.5 + (i % 5), 1.5 + (i // 5))
+
+    # Q3: lower left, tight grid
+    for i, row in enumerate(df[df['quadrant'] == 'Q3'].itertuples()):
+        pos[f"Cell-{row.who}"] = (-1.5 - (i % 5), -1.5 - (i // 5))
+
+
+    #pos = nx.spring_layout(G, k=2, seed=42)  # Larger k spreads out nodes
+    #nx.draw(G, pos, with_labels=True, node_size=300, font_size=8)
+    #nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'))
+    # --------------------
+    # Color nodes by quadrant category
+    # --------------------
+    color_map = []
+    for node in G.nodes():
+        if node == 'Nest':
+            color_map.append('gray')  # or 'white'
+        else:
+            # Extract agent ID from node label
+            agent_id = int(node.replace('Cell-', ''))
+            quadrant = df[df['who'] == agent_id]['quadrant'].values[0]
+            if quadrant == 'Q1':
+                color_map.append('red')
+            elif quadrant == 'Q3':
+                color_map.append('blue')
+            else:
+                color_map.append('black')  # fallback, shouldn't happen if filtered correctly
+    # Simplified labels: just numbers
+    labels = {}
+    for node in G.nodes():
+        if node == 'Nest':
+            labels[node] = 'Nest'
         else:
-            color_map.append('black')  # fallback, shouldn't happen if filtered correctly
-# Simplified labels: just numbers
-labels = {}
-for node in G.nodes():
-    if node == 'Nest':
-        labels[node] = 'Nest'
+            labels[node] = node.replace('Cell-', '')
+
+    # Draw the network
+    nx.draw(G, pos, labels=labels, node_color=color_map, node_size=250, font_size=8,
+            edgecolors='black')
+    #nx.draw(G, pos, with_labels=True, node_color=color_map, node_size=300, font_size=8)
+    plt.axis('off')
+    plt.tight_layout()
+    plt.title("Cyanobacteria Movement Network with Shared Endpoints")
+    plt.show()
+
+    # Get degree of all nodes (excluding Nest if you prefer)
+    degrees = [deg for node, deg in G.degree() if node != 'Nest']
+
+    # Count how many nodes have each degree
+    degree_counts = Counter(degrees)
+
+    # Sort by degree
+    degree_distribution = sorted(degree_counts.items())  # list of (degree, count)
+    print("Degree distribution (degree: count):")
+    for degree, count in degree_distribution:
+        print(f"  {degree}: {count}")
+    degrees, counts = zip(*degree_distribution)
+    plt.bar(degrees, counts, color='skyblue', edgecolor='black')
+    plt.xlabel("Degree")
+    plt.ylabel("Number of Nodes")
+    plt.title("Degree Distribution of Cyanobacteria Network")
+    plt.xticks(degrees)
+    plt.show()
+
+    # -----------------------------
+    # Improved Categorical Histogram: Clustering Coefficients by Quadrant
+    # -----------------------------
+    # Get clustering values per node in each quadrant
+    clustering_data = {}
+    unique_vals = set()
+
+    for q in QUADRANTS:
+        clustering_vals = metrics[f'{q}_clustering'].tolist()
+
+        # Round for categorical binning (e.g., 0.0, 0.33, 0.5, 1.0)
+        clustering_rounded = [round(v, 2) for v in clustering_vals]
+        counts = Counter(clustering_rounded)
+        clustering_data[q] = counts
+        unique_vals.update(counts.keys())
+
+    # Sort unique clustering coefficient bins
+    sorted_vals = sorted(unique_vals)
+
+    # Prepare bar heights
+    q1_counts = [clustering_data['Q1'].get(v, 0) for v in sorted_vals]
+    q3_counts = [clustering_data['Q3'].get(v, 0) for v in sorted_vals]
+
+    x = np.arange(len(sorted_vals))
+    width = 0.35
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.bar(x - width/2, q1_counts, width, label='Q1', color='red', edgecolor='black')
+    ax.bar(x + width/2, q3_counts, width, label='Q3', color='blue', edgecolor='black')
+
+    # Labeling
+    ax.set_xticks(x)
+    ax.set_xticklabels(sorted_vals)
+    ax.set_xlabel("Clustering Coefficient")
+    ax.set_ylabel("Number of Nodes")
+    ax.set_title("Clustering Coefficient Distribution by Quadrant")
+    ax.legend()
+    plt.tight_layout()
+    plt.savefig("clustering_categorical_by_quadrant.png", dpi=300)
+    plt.show()
+
+
+
+    # Without the Nest the cells are connected only if they all share one path
+    if metrics['connected']:
+        print(f"Diameter: {metrics['diameter']}")
+        print(f"Average Path Length: {metrics['avg_path_length']:.4f}")
     else:
-        labels[node] = node.replace('Cell-', '')
-
-# Draw the network
-nx.draw(G, pos, labels=labels, node_color=color_map, node_size=250, font_size=8,
-        edgecolors='black')
-#nx.draw(G, pos, with_labels=True, node_color=color_map, node_size=300, font_size=8)
-plt.axis('off')
-plt.tight_layout()
-plt.title("Cyanobacteria Movement Network with Shared Endpoints")
-plt.show()
-
-G_no_nest = G.copy()
-G_no_nest.remove_node('Nest')
-
-from collections import Counter
-
-# Get degree of all nodes (excluding Nest if you prefer)
-degrees = [deg for node, deg in G.degree() if node != 'Nest']
-
-# Count how many nodes have each degree
-degree_counts = Counter(degrees)
-
-# Sort by degree
-degree_distribution = sorted(degree_counts.items())  # list of (degree, count)
-print("Degree distribution (degree: count):")
-for degree, count in degree_distribution:
-    print(f"  {degree}: {count}")
-degrees, counts = zip(*degree_distribution)
-plt.bar(degrees, counts, color='skyblue', edgecolor='black')
-plt.xlabel("Degree")
-plt.ylabel("Number of Nodes")
-plt.title("Degree Distribution of Cyanobacteria Network")
-plt.xticks(degrees)
-plt.show()
-
-# -----------------------------
-# Improved Categorical Histogram: Clustering Coefficients by Quadrant
-# -----------------------------
-import matplotlib.pyplot as plt
-import numpy as np
-from collections import Counter
-
-# Get clustering values per node in each quadrant
-clustering_data = {}
-unique_vals = set()
-
-for q in ['Q1', 'Q3']:
-    q_nodes = [f"Cell-{row['who']}" for _, row in df[df['quadrant'] == q].iterrows()]
-    subG = G.subgraph(q_nodes)
-    clustering_vals = list(nx.clustering(subG).values())
-    
-    # Round for categorical binning (e.g., 0.0, 0.33, 0.5, 1.0)
-    clustering_rounded = [round(v, 2) for v in clustering_vals]
-    counts = Counter(clustering_rounded)
-    clustering_data[q] = counts
-    unique_vals.update(counts.keys())
-
-# Sort unique clustering coefficient bins
-sorted_vals = sorted(unique_vals)
-
-# Prepare bar heights
-q1_counts = [clustering_data['Q1'].get(v, 0) for v in sorted_vals]
-q3_counts = [clustering_data['Q3'].get(v, 0) for v in sorted_vals]
-
-x = np.arange(len(sorted_vals))
-width = 0.35
-
-fig, ax = plt.subplots(figsize=(10, 5))
-ax.bar(x - width/2, q1_counts, width, label='Q1', color='red', edgecolor='black')
-ax.bar(x + width/2, q3_counts, width, label='Q3', color='blue', edgecolor='black')
-
-# Labeling
-ax.set_xticks(x)
-ax.set_xticklabels(sorted_vals)
-ax.set_xlabel("Clustering Coefficient")
-ax.set_ylabel("Number of Nodes")
-ax.set_title("Clustering Coefficient Distribution by Quadrant")
-ax.legend()
-plt.tight_layout()
-plt.savefig("clustering_categorical_by_quadrant.png", dpi=300)
-plt.show()
-
-
-
-if nx.is_connected(G):
-    print(f"Diameter: {nx.diameter(G_no_nest)}")
-    print(f"Average Path Length: {nx.average_shortest_path_length(G_no_nest):.4f}")
-else:
-    print("Graph is not connected; computing diameter on largest component...")
-    largest_cc = G_no_nest.subgraph(max(nx.connected_components(G_no_nest), key=len))
-    print(f"Diameter (Largest Component): {nx.diameter(largest_cc)}")
-    print(f"Avg Path Length (Largest Component): {nx.average_shortest_path_length(largest_cc):.4f}")
-
-eff = nx.global_efficiency(G_no_nest)
-print(f"Global Efficiency: {eff:.4f}")
-
-
-# --------------------
-# Null Model: Randomized Endpoints
-# --------------------
-def random_endpoint_null(df, n=1000):
-    efficiencies = []
-    for _ in range(n):
-        G_null = nx.Graph()
-        G_null.add_node('Nest')
-        for _, row in df.iterrows():
-            target = f"Null-{row['who']}"
-            G_null.add_node(target)
-            rand_end = np.random.uniform(-20, 20, size=2)
-            straight_line = np.sqrt((row['start-x'] - rand_end[0])**2 + (row['start-y'] - rand_end[1])**2)
-            G_null.add_edge('Nest', target, weight=straight_line)
-        eff = nx.global_efficiency(G_null)
-        efficiencies.append(eff)
-    return efficiencies
-
-# --------------------
-# Plot Null Distribution
-# --------------------
-null_eff = random_endpoint_null(df)
-plt.hist(null_eff, bins=30, alpha=0.7)
-plt.axvline(efficiency, color='red', linestyle='--', label='Observed Efficiency')
-plt.legend()
-plt.title("Global Efficiency vs Null Model")
-plt.xlabel("Efficiency")
-plt.ylabel("Frequency")
-plt.show()
-
-closeness = nx.closeness_centrality(G_no_nest)
-degree = dict(G_no_nest.degree())
-
-for q in ['Q1', 'Q3']:
-    nodes = [f"Cell-{row['who']}" for _, row in df[df['quadrant'] == q].iterrows()]
-    subG = G.subgraph(nodes)
-
-    closeness = nx.closeness_centrality(subG)
-    degree = dict(subG.degree())
-
-    print(f"\n{q} Centrality Metrics:")
-    for node in sorted(subG.nodes()):
-        print(f"  {node.replace('Cell-', '')}: Degree={degree[node]}, Closeness={closeness[node]:.3f}")
-
-fig, ax = plt.subplots(1, 2, figsize=(12, 5))
-
-for i, q in enumerate(['Q1', 'Q3']):
-    nodes = [f"Cell-{row['who']}" for _, row in df[df['quadrant'] == q].iterrows()]
-    subG = G.subgraph(nodes)
-
-    degree = dict(subG.degree())
-    closeness = nx.closeness_centrality(subG)
-
-    ax[i].scatter(list(degree.values()), list(closeness.values()), color='red' if q=='Q1' else 'blue')
-    ax[i].set_title(f"{q}: Degree vs Closeness")
-    ax[i].set_xlabel("Degree")
-    ax[i].set_ylabel("Closeness")
-
-plt.tight_layout()
-plt.show()
-
-for q in ['Q1', 'Q3']:
-    q_nodes = [f"Cell-{row['who']}" for _, row in df[df['quadrant'] == q].iterrows()]
-    subG = G.subgraph(q_nodes)
-    eff_q = nx.global_efficiency(subG)
-    print(f"Efficiency in {q}: {eff_q:.4f}")
+        print("Graph is not connected; computing diameter on largest component...")
+        print(f"Diameter (Largest Component): {metrics['diameter']}")
+        print(f"Avg Path Length (Largest Component): {metrics['avg_path_length']:.4f}")
+
+    eff = metrics['global_eff']
+    print(f"Global Efficiency: {eff:.4f}")
+
+
+    # --------------------
+    # Null Model: Randomized Endpoints
+    # --------------------
+    # Hop-count efficiency like nx.global_efficiency, so every replicate is the
+    # same Nest star; pass weighted=True to use the straight-line lengths
+    null_eff = cache.cached('random_endpoint_null', lambda: random_endpoint_null(df, n=1000, seed=0), [PATH],
+                            {'n_nulls': 1000, 'seed': 0, 'weighted': False}, NULL_VERSION)
+
+    # --------------------
+    # Plot Null Distribution
+    # --------------------
+    plt.hist(null_eff, bins=30, alpha=0.7)
+    plt.axvline(efficiency, color='red', linestyle='--', label='Observed Efficiency')
+    plt.legend()
+    plt.title("Global Efficiency vs Null Model")
+    plt.xlabel("Efficiency")
+    plt.ylabel("Frequency")
+    plt.show()
+
+    for q in QUADRANTS:
+        who_q = df_q13['who'].to_numpy()[quadrant_masks[q]]
+        degree = metrics[f'{q}_degree']
+        closeness = metrics[f'{q}_closeness']
+
+        print(f"\n{q} Centrality Metrics:")
+        for j in sorted(range(len(who_q)), key=lambda j: f"Cell-{who_q[j]}"):
+            print(f"  {who_q[j]}: Degree={degree[j]}, Closeness={closeness[j]:.3f}")
+
+    fig, ax = plt.subplots(1, 2, figsize=(12, 5))
+
+    for i, q in enumerate(QUADRANTS):
+        degree = metrics[f'{q}_degree']
+        closeness = metrics[f'{q}_closeness']
+
+        ax[i].scatter(degree, closeness, color='red' if q=='Q1' else 'blue')
+        ax[i].set_title(f"{q}: Degree vs Closeness")
+        ax[i].set_xlabel("Degree")
+        ax[i].set_ylabel("Closeness")
+
+    plt.tight_layout()
+    plt.show()
+
+    for q in QUADRANTS:
+        eff_q = metrics[f'{q}_eff']
+        print(f"Efficiency in {q}: {eff_q:.4f}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shared-endpoint network of one run")
+    parser.add_argument('--force', action='store_true', help="recompute every cached result")
+    main(parser.parse_args().force)
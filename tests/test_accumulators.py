@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from netbimas.accumulators import Histogram, Moments, QuantileSketch, merge
+
+
+def test_moments_merge_matches_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.normal(3, 2, size=(1000, 4))
+    parts = [Moments(4).update(chunk) for chunk in np.array_split(values, [1, 10, 400, 999])]
+    total = parts[0]
+    for part in parts[1:]:
+        merge(total, part)
+    assert total.count == 1000
+    np.testing.assert_allclose(total.mean, values.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(total.variance(ddof=1), values.var(axis=0, ddof=1), rtol=1e-10)
+    assert Moments().update([]).count == 0
+    assert np.isnan(Moments().std())
+
+
+def test_histogram_matches_numpy_and_counts_outliers():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.uniform(-0.5, 1.5, 500), [np.nan, 1.0, 0.0]])
+    hist = Histogram(0, 1, bins=20)
+    for chunk in np.array_split(values, 7):
+        merge(hist, Histogram(0, 1, bins=20).update(chunk))
+    finite = values[~np.isnan(values)]
+    np.testing.assert_array_equal(hist.counts, np.histogram(finite, bins=20, range=(0, 1))[0])
+    assert hist.underflow == (finite < 0).sum()
+    assert hist.overflow == (finite > 1).sum()
+    assert hist.missing == 1
+    assert hist.count == values.size
+    with pytest.raises(ValueError):
+        hist.merge(Histogram(0, 1, bins=10))
+
+
+def test_quantile_sketch_rank_error():
+    rng = np.random.default_rng(2)
+    values = rng.lognormal(size=100_000)
+    sketch = QuantileSketch(k=200)
+    for chunk in np.array_split(values, 50):
+        sketch.merge(QuantileSketch(k=200).update(chunk))
+    assert sketch.count == values.size
+    assert sum(level.size for level in sketch.levels) < 2000
+    ordered = np.sort(values)
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        rank = np.searchsorted(ordered, sketch.quantile(q)) / values.size
+        assert abs(rank - q) < 0.02
+        assert sketch.rank(np.quantile(values, q)) == pytest.approx(q, abs=0.02)
+
+
+def test_quantile_sketch_is_deterministic():
+    values = np.random.default_rng(3).normal(size=20_000)
+    sketches = [QuantileSketch(k=50).update(values) for _ in range(2)]
+    np.testing.assert_array_equal(sketches[0].quantile([0.25, 0.75]), sketches[1].quantile([0.25, 0.75]))
+    empty = QuantileSketch()
+    assert np.isnan(empty.quantile(0.5)) and np.isnan(empty.rank(0.0))
+    with pytest.raises(ValueError):
+        empty.merge(QuantileSketch(k=10))
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from netbimas.cache import ResultCache, file_digest, result_key
+from netbimas.catalog import compare_runs
+
+
+def write_run(path, ends):
+    ends = np.asarray(ends, dtype=float)
+    pd.DataFrame({'who': range(len(ends)), 'tick': 1, 'start-x': 0.0, 'start-y': 0.0,
+                  'end-x': ends[:, 0], 'end-y': ends[:, 1], 'total-distance': 1.0,
+                  'straight-line': 1.0, 'efficiency': 1.0}).to_csv(path, index=False)
+
+
+def test_keys_follow_content_and_parameters(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'))
+    data = tmp_path / 'a.csv'
+    data.write_text('who\n1\n')
+    key = cache.key('metric', [str(data)], {'decimals': 3})
+    # Touching or renaming keeps the key, editing changes it
+    os.utime(data, ns=(1, 1))
+    os.rename(data, tmp_path / 'b.csv')
+    assert cache.key('metric', [str(tmp_path / 'b.csv')], {'decimals': 3}) == key
+    assert result_key('metric', [file_digest(str(tmp_path / 'b.csv'))], {'decimals': 3}) == key
+    (tmp_path / 'b.csv').write_text('who\n2\n')
+    assert cache.key('metric', [str(tmp_path / 'b.csv')], {'decimals': 3}) != key
+    assert len({result_key('metric', [], {'decimals': 3}), result_key('metric', [], {'decimals': 2}),
+                result_key('metric', [], {'decimals': 3}, version='2'), result_key('other', [])}) == 4
+
+
+def test_cached_and_force(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'value': len(calls)}
+
+    assert ResultCache(path).cached('metric', compute) == {'value': 1}
+    assert ResultCache(path).cached('metric', compute) == {'value': 1}
+    assert ResultCache(path, force=True).cached('metric', compute) == {'value': 2}
+    assert ResultCache(path).cached('metric', compute) == {'value': 2}
+    assert len(calls) == 2
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'))
+    blob = np.random.default_rng(0).bytes(4000)
+    for key in 'abc':
+        cache.put(key, blob)
+    cache.get('a')
+    cache.max_bytes = 9000
+    cache.put('d', blob)
+    assert [key in cache for key in 'abcd'] == [True, False, False, True]
+
+
+def test_compare_runs_keys_on_null_parameters(tmp_path):
+    run_dir = tmp_path / 'runs'
+    run_dir.mkdir()
+    write_run(run_dir / '1-bacteria-path-data.csv', [[1, 1], [1, 1], [1, 1], [2, 2], [2, 2], [-1, -1]])
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'))
+    plain, _ = compare_runs(str(run_dir), workers=1, cache=cache)
+    nulls, _ = compare_runs(str(run_dir), workers=1, cache=cache, n_nulls=10, seed=1)
+    other_seed, _ = compare_runs(str(run_dir), workers=1, cache=cache, n_nulls=10, seed=2)
+    quadrants, _ = compare_runs(str(run_dir), workers=1, cache=cache, quadrants=['Q1'])
+    assert 'clustering_null_mean' not in plain and 'clustering_null_mean' in nulls
+    assert not nulls.equals(other_seed)
+    assert 'q3_eff' in plain and 'q3_eff' not in quadrants
+    assert cache._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 4
+    # A hit returns the stored result unchanged
+    pd.testing.assert_frame_equal(compare_runs(str(run_dir), workers=1, cache=cache, n_nulls=10, seed=1)[0],
+                                  nulls)
@@ -0,0 +1,81 @@
+import itertools
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from netbimas.catalog import analyze_path_data, compare_runs, discover_runs, quadrant_labels
+from netbimas.loader import COLUMNS
+
+
+def path_records(rng, n, spots=12):
+    spots = np.round(rng.uniform(-20, 20, size=(spots, 2)), 3)
+    end = spots[rng.integers(0, len(spots), n)]
+    end[: n // 5] = rng.uniform(-20, 20, size=(n // 5, 2))
+    return pd.DataFrame({'who': np.arange(n), 'tick': np.arange(n), 'start-x': 0.0, 'start-y': 0.0,
+                         'end-x': end[:, 0], 'end-y': end[:, 1], 'total-distance': 10.0,
+                         'straight-line': 5.0, 'efficiency': 0.5}, columns=COLUMNS)
+
+
+def write_runs(tmp_path, count=3):
+    rng = np.random.default_rng(0)
+    for run in range(1, count + 1):
+        path_records(rng, 40 + 10 * run).to_csv(tmp_path / f'{run}-bacteria-path-data.csv', index=False)
+    (tmp_path / 'notes.csv').write_text('who\n')
+    return str(tmp_path)
+
+
+def shared_endpoint_graph(df, keep):
+    G = nx.Graph()
+    G.add_nodes_from(np.flatnonzero(keep).tolist())
+    groups = df[keep].groupby(['end-x', 'end-y']).groups
+    for members in groups.values():
+        G.add_edges_from(itertools.combinations(members.tolist(), 2))
+    return G
+
+
+def test_discover_runs_sorts_by_run_number(tmp_path):
+    for name in ('10-bacteria-path-data.csv', '2-bacteria-path-data.csv', 'summary.csv'):
+        (tmp_path / name).write_text('')
+    assert list(discover_runs(str(tmp_path))) == [2, 10]
+
+
+def test_quadrant_labels():
+    labels = quadrant_labels([1, -1, -1, 1, 0], [1, 1, -1, -1, 3])
+    assert labels.tolist() == ['Q1', 'Q2', 'Q3', 'Q4', 'Other']
+
+
+def test_analyze_path_data_matches_networkx():
+    df = path_records(np.random.default_rng(1), 120)
+    metrics, degree_counts = analyze_path_data(df)
+    quadrant = quadrant_labels(df['end-x'], df['end-y'])
+    full = shared_endpoint_graph(df, np.ones(len(df), dtype=bool))
+    np.testing.assert_array_equal(degree_counts, nx.degree_histogram(full))
+
+    degree = np.array([full.degree(i) for i in range(len(df))])
+    G = shared_endpoint_graph(df, np.isin(quadrant, ['Q1', 'Q3']) | (degree > 0))
+    assert metrics['global_eff'] == pytest.approx(nx.global_efficiency(G), abs=1e-12)
+    assert metrics['clustering'] == pytest.approx(nx.average_clustering(G), abs=1e-12)
+    for q in ('Q1', 'Q3'):
+        sub = shared_endpoint_graph(df, quadrant == q)
+        assert metrics[f'{q.lower()}_community_nodes'] == sub.number_of_nodes()
+        assert metrics[f'{q.lower()}_community_eff'] == pytest.approx(nx.global_efficiency(sub), abs=1e-12)
+
+
+def test_compare_runs_is_the_same_with_workers(tmp_path):
+    run_dir = write_runs(tmp_path)
+    serial = compare_runs(run_dir, workers=1)
+    parallel = compare_runs(run_dir, workers=2)
+    assert serial[0].index.tolist() == [1, 2, 3]
+    pd.testing.assert_frame_equal(serial[0], parallel[0])
+    pd.testing.assert_frame_equal(serial[1], parallel[1])
+    assert (serial[1].sum(axis=1) == [50, 60, 70]).all()
+
+
+def test_compare_runs_with_nulls(tmp_path):
+    run_dir = write_runs(tmp_path, count=2)
+    metrics, _ = compare_runs(run_dir, workers=1, n_nulls=20, seed=3, quadrants=['Q1', 'Q2', 'Q3', 'Q4'])
+    again, _ = compare_runs(run_dir, workers=2, n_nulls=20, seed=3, quadrants=['Q1', 'Q2', 'Q3', 'Q4'])
+    assert {'clustering_null_mean', 'global_eff_null_std', 'q4_community_eff'} <= set(metrics)
+    pd.testing.assert_frame_equal(metrics, again)
@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from netbimas import clique_metrics
+from netbimas.cli import build_parser, main
+from netbimas.graph import endpoint_codes
+from netbimas.loader import load_path_data
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_run(path, seed=0, n=80):
+    rng = np.random.default_rng(seed)
+    spots = np.round(rng.uniform(-20, 20, size=(10, 2)), 3)
+    end = spots[rng.integers(0, 10, n)]
+    pd.DataFrame({'who': np.arange(n), 'tick': np.arange(n), 'start-x': 0.0, 'start-y': 0.0,
+                  'end-x': end[:, 0], 'end-y': end[:, 1], 'total-distance': 30.0,
+                  'straight-line': 20.0, 'efficiency': 0.6}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_metrics(tmp_path, capsys):
+    csv = write_run(tmp_path / 'run.csv')
+    df = load_path_data(csv)
+    expected = clique_metrics.summarize(clique_metrics.group_sizes(endpoint_codes(df['end-x'], df['end-y'])),
+                                        nest=True)
+    main(['metrics', csv, '--nest', '--json'])
+    out = json.loads(capsys.readouterr().out)
+    assert out == pytest.approx(expected)
+    main(['metrics', csv, '--nest', '--metric', 'global_eff'])
+    assert float(capsys.readouterr().out) == pytest.approx(expected['global_eff'])
+    with pytest.raises(SystemExit, match='unknown metric'):
+        main(['metrics', csv, '--metric', 'diameter_squared'])
+
+
+def test_metrics_does_not_import_heavy_modules(tmp_path):
+    csv = write_run(tmp_path / 'run.csv')
+    code = ("import sys; from netbimas.cli import main; main(['metrics', sys.argv[1]]); "
+            "print(sorted(m for m in ('networkx', 'matplotlib', 'netbimas.nulls', 'netbimas.ensemble') "
+            "if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', code, csv], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.splitlines()[-1] == '[]'
+
+
+def test_simulate_ingest_and_compare(tmp_path, capsys, monkeypatch):
+    monkeypatch.setenv('NETBIMAS_CACHE', str(tmp_path / 'cache.sqlite'))
+    events = str(tmp_path / 'run.nbev')
+    main(['simulate', '--ticks', '200', '--seed', '1', '--out', events])
+    assert 'finished cells' in capsys.readouterr().out
+    main(['metrics', events, '--json'])
+    assert 'global_eff' in json.loads(capsys.readouterr().out)
+
+    csv = write_run(tmp_path / '1-bacteria-path-data.csv')
+    main(['ingest', csv])
+    assert capsys.readouterr().out.strip() == f"{csv[:-4]}.nbev: 80 records"
+
+    write_run(tmp_path / '2-bacteria-path-data.csv', seed=1)
+    table = str(tmp_path / 'compare.csv')
+    main(['compare', str(tmp_path), '--workers', '1', '--out', table, '--columns', 'global_eff'])
+    assert pd.read_csv(table, index_col='run').index.tolist() == [1, 2]
+    assert os.path.exists(tmp_path / 'cache.sqlite')
+
+
+def test_every_subcommand_parses():
+    parser = build_parser()
+    for argv in (['ingest', 'a.csv'], ['metrics', 'a.csv'], ['nulls', 'a.csv'], ['compare', 'runs', '--force'],
+                 ['report', 'runs', 'out'], ['simulate'], ['synth', 'a.csv'], ['bench']):
+        assert callable(parser.parse_args(argv).func)
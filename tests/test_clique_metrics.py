@@ -0,0 +1,91 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from netbimas import clique_metrics
+from netbimas.clique_metrics import group_sizes
+
+
+def clique_union(codes, nest=False):
+    G = nx.Graph()
+    G.add_nodes_from(range(len(codes)))
+    for code in np.unique(codes):
+        members = np.flatnonzero(codes == code).tolist()
+        G.add_edges_from((u, v) for i, u in enumerate(members) for v in members[i + 1:])
+    if nest:
+        G.add_edges_from(('Nest', u) for u in range(len(codes)))
+    return G
+
+
+def random_codes(rng):
+    n = int(rng.integers(2, 40))
+    return rng.integers(0, int(rng.integers(1, n + 1)), n)
+
+
+@pytest.mark.parametrize('nest', [False, True])
+def test_graph_metrics_match_networkx(nest):
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        codes = random_codes(rng)
+        sizes = group_sizes(codes)
+        G = clique_union(codes, nest)
+        assert clique_metrics.global_efficiency(sizes, nest) == pytest.approx(nx.global_efficiency(G), abs=1e-12)
+        assert clique_metrics.average_clustering(sizes, nest) == pytest.approx(nx.average_clustering(G),
+                                                                                abs=1e-12)
+        largest = G.subgraph(max(nx.connected_components(G), key=len))
+        assert clique_metrics.diameter(sizes, nest, largest=True) == nx.diameter(largest)
+        assert clique_metrics.average_shortest_path_length(sizes, nest, largest=True) == pytest.approx(
+            nx.average_shortest_path_length(largest), abs=1e-12)
+        if nx.is_connected(G):
+            assert clique_metrics.diameter(sizes, nest) == nx.diameter(G)
+        else:
+            assert np.isnan(clique_metrics.diameter(sizes, nest))
+
+        closeness = nx.closeness_centrality(G)
+        expected = [closeness[u] for u in range(len(codes))]
+        np.testing.assert_allclose(clique_metrics.node_closeness(codes, nest), expected, atol=1e-12)
+        summary = clique_metrics.summarize(sizes, nest)
+        assert summary['avg_closeness'] == pytest.approx(np.mean(list(closeness.values())), abs=1e-12)
+        assert summary['avg_betweenness'] == pytest.approx(
+            np.mean(list(nx.betweenness_centrality(G).values())), abs=1e-12)
+        if nest:
+            assert clique_metrics.nest_betweenness(sizes) == pytest.approx(
+                nx.betweenness_centrality(G)['Nest'], abs=1e-12)
+
+
+def test_node_metrics_and_modularity_match_networkx():
+    rng = np.random.default_rng(2)
+    for _ in range(50):
+        codes = random_codes(rng)
+        G = clique_union(codes)
+        np.testing.assert_array_equal(clique_metrics.node_degree(codes), [G.degree(u) for u in range(len(codes))])
+        clustering = nx.clustering(G)
+        np.testing.assert_allclose(clique_metrics.node_clustering(codes),
+                                   [clustering[u] for u in range(len(codes))], atol=1e-12)
+        if G.number_of_edges():
+            labels = rng.integers(0, 3, len(codes))
+            communities = [set(np.flatnonzero(labels == c).tolist()) for c in np.unique(labels)]
+            assert clique_metrics.modularity(codes, labels) == pytest.approx(
+                nx.community.modularity(G, communities), abs=1e-12)
+
+
+def test_single_clique_test_matches_is_connected():
+    # network_analysis.py reports the Nest-free graph as connected when it is
+    # one clique
+    rng = np.random.default_rng(3)
+    for _ in range(100):
+        codes = random_codes(rng)
+        assert (group_sizes(codes).size == 1) == nx.is_connected(clique_union(codes))
+
+
+def test_graph_metrics_uses_closed_form_or_falls_back():
+    rng = np.random.default_rng(4)
+    codes = random_codes(rng)
+    G = nx.relabel_nodes(clique_union(codes, nest=True), {u: f"Cell-{u}" for u in range(len(codes))})
+    assert clique_metrics.graph_metrics(G, nest='Nest') == pytest.approx(
+        clique_metrics.summarize(group_sizes(codes), nest=True), nan_ok=True)
+
+    path = nx.path_graph(5)
+    metrics = clique_metrics.graph_metrics(path)
+    assert metrics['diameter'] == 4
+    assert metrics['global_eff'] == pytest.approx(nx.global_efficiency(path), abs=1e-12)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from netbimas.collision import cell_list, circular_mean, random_partners, resolve
+
+
+def test_cell_list_matches_brute_force():
+    keys = np.random.default_rng(0).integers(0, 30, 500)
+    order, start, count = cell_list(keys)
+    assert sorted(order.tolist()) == list(range(keys.size))
+    for i, key in enumerate(keys):
+        bucket = order[start[i]:start[i] + count[i]]
+        assert sorted(bucket.tolist()) == np.flatnonzero(keys == key).tolist()
+
+
+def test_random_partners_share_a_patch():
+    rng = np.random.default_rng(1)
+    keys = rng.integers(0, 200, 400)
+    partner = random_partners(keys, rng)
+    alone = np.bincount(keys)[keys] == 1
+    assert (partner[alone] == -1).all()
+    paired = np.flatnonzero(~alone)
+    assert (partner[paired] != paired).all()
+    assert (keys[partner[paired]] == keys[paired]).all()
+    assert random_partners([5], rng).tolist() == [-1]
+
+
+def test_random_partners_are_uniform():
+    rng = np.random.default_rng(2)
+    keys = np.array([7, 3, 7, 7, 7])
+    draws = np.array([random_partners(keys, rng) for _ in range(4000)])
+    assert (draws[:, 1] == -1).all()
+    # Cell 0 meets each of the other three cells on patch 7 equally often
+    counts = np.bincount(draws[:, 0], minlength=5)
+    assert counts[[0, 1]].sum() == 0
+    np.testing.assert_allclose(counts[2:] / 4000, 1 / 3, atol=0.03)
+
+
+def test_resolve():
+    assert circular_mean(350, 20) == pytest.approx(5)
+    assert circular_mean(0, 90) == pytest.approx(45)
+    heading = np.array([0.0, 90.0, 180.0, 270.0, 30.0])
+    length = np.array([1.0, 2.0, 1.0, 1.0, 1.0])
+    initial = np.array([0, 1, 0, 3, 4])
+    # 0 and 1 are different lineages, 2 meets its root 0, 3 and 4 are alone
+    partner = np.array([1, 0, 0, -1, -1])
+    new_heading, step = resolve(partner, heading, length, initial)
+    np.testing.assert_allclose(new_heading, [45, 45, 0, 270, 30])
+    np.testing.assert_allclose(step, [0.2, 0.2, 1.5, 0, 0])
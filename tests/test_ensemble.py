@@ -0,0 +1,81 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from netbimas.accumulators import Moments, merge
+from netbimas.ensemble import _chunk_path, chunk_bounds, run_ensemble
+from netbimas.nulls import chung_lu_degree_chunk, endpoint_null_chunk
+
+START_XY = np.random.default_rng(0).uniform(-20, 20, size=(15, 2))
+
+
+def test_chunk_bounds_cover_every_replicate():
+    assert chunk_bounds(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert chunk_bounds(0, 4) == []
+
+
+def test_serial_and_parallel_runs_are_identical():
+    serial = run_ensemble(endpoint_null_chunk, 230, args=(START_XY,), chunk_size=25, seed=3)
+    parallel = run_ensemble(endpoint_null_chunk, 230, args=(START_XY,), chunk_size=25, seed=3, workers=3)
+    assert [len(chunk) for chunk in serial] == [25] * 9 + [5]
+    np.testing.assert_array_equal(np.concatenate(serial), np.concatenate(parallel))
+
+    degrees = np.array([4, 3, 3, 2, 2, 1, 1, 0])
+    folded = [run_ensemble(chung_lu_degree_chunk, 120, args=(degrees,), chunk_size=10, seed=4, workers=w,
+                           reduce=merge, initial=Moments(len(degrees)))
+              for w in (1, 2)]
+    assert folded[0].count == folded[1].count == 120
+    np.testing.assert_array_equal(folded[0].mean, folded[1].mean)
+    np.testing.assert_array_equal(folded[0].m2, folded[1].m2)
+
+
+def test_spawned_seeds_give_distinct_reproducible_ensembles():
+    children = np.random.SeedSequence(9).spawn(2)
+    runs = [np.concatenate(run_ensemble(endpoint_null_chunk, 40, args=(START_XY,), chunk_size=10, seed=s))
+            for s in children + children]
+    np.testing.assert_array_equal(runs[0], runs[2])
+    np.testing.assert_array_equal(runs[1], runs[3])
+    assert not np.array_equal(runs[0], runs[1])
+
+
+def test_checkpoint_resumes_from_finished_chunks(tmp_path):
+    checkpoint = str(tmp_path / 'ckpt')
+    full = run_ensemble(endpoint_null_chunk, 100, args=(START_XY,), chunk_size=20, seed=5,
+                        checkpoint=checkpoint)
+    # Drop two chunks and mark a kept one, so the resume must recompute the
+    # missing chunks and read the others back from disk
+    os.remove(_chunk_path(checkpoint, 1))
+    os.remove(_chunk_path(checkpoint, 4))
+    with open(_chunk_path(checkpoint, 2), 'wb') as fh:
+        pickle.dump(np.full(20, -1.0), fh)
+    resumed = run_ensemble(endpoint_null_chunk, 100, args=(START_XY,), chunk_size=20, seed=5,
+                           checkpoint=checkpoint, workers=2)
+    for i, chunk in enumerate(resumed):
+        np.testing.assert_array_equal(chunk, np.full(20, -1.0) if i == 2 else full[i])
+
+
+def test_checkpoint_keeps_the_seed_and_spawn_key(tmp_path):
+    checkpoint = str(tmp_path / 'ckpt')
+    first = run_ensemble(endpoint_null_chunk, 30, args=(START_XY,), chunk_size=10, checkpoint=checkpoint)
+    os.remove(_chunk_path(checkpoint, 0))
+    # Without a seed the stored entropy is reused
+    again = run_ensemble(endpoint_null_chunk, 30, args=(START_XY,), chunk_size=10, checkpoint=checkpoint)
+    np.testing.assert_array_equal(np.concatenate(first), np.concatenate(again))
+
+    child = np.random.SeedSequence(11).spawn(2)[1]
+    keyed = str(tmp_path / 'keyed')
+    run_ensemble(endpoint_null_chunk, 30, args=(START_XY,), chunk_size=10, seed=child, checkpoint=keyed)
+    with pytest.raises(ValueError, match='different ensemble'):
+        run_ensemble(endpoint_null_chunk, 30, args=(START_XY,), chunk_size=10,
+                     seed=np.random.SeedSequence(11).spawn(2)[0], checkpoint=keyed)
+    with pytest.raises(ValueError, match='different ensemble'):
+        run_ensemble(endpoint_null_chunk, 40, args=(START_XY,), chunk_size=10, seed=child, checkpoint=keyed)
+
+
+def test_progress_reports_chunks_in_order():
+    calls = []
+    run_ensemble(endpoint_null_chunk, 25, args=(START_XY,), chunk_size=10, seed=1,
+                 progress=lambda *state: calls.append(state))
+    assert calls == [(1, 3, 10), (2, 3, 20), (3, 3, 25)]
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from netbimas.events import (HEADER_SIZE, RECORD_DTYPE, EventWriter, convert_csv, latest_events, read_events,
+                             to_records)
+from netbimas.loader import COLUMNS, load_path_data
+
+
+def path_rows(rng, n, ticks=5):
+    who = rng.integers(1, n // 2, n)
+    tick = np.sort(rng.integers(0, ticks * 10, n))
+    return pd.DataFrame({'who': who, 'tick': tick, 'start-x': 0.0, 'start-y': 0.0,
+                         'end-x': rng.uniform(-20, 20, n), 'end-y': rng.uniform(-20, 20, n),
+                         'total-distance': rng.integers(1, 80, n).astype(float),
+                         'straight-line': rng.uniform(0, 30, n), 'efficiency': rng.uniform(0, 1, n)},
+                        columns=COLUMNS)
+
+
+def test_roundtrip_is_bit_exact(tmp_path):
+    rows = path_rows(np.random.default_rng(0), 400)
+    path = str(tmp_path / 'run.nbev')
+    with EventWriter(path) as writer:
+        writer.append(rows.iloc[:150])
+    with EventWriter(path) as writer:
+        writer.append(to_records(rows.iloc[150:]))
+    records = read_events(path)
+    assert isinstance(records, np.memmap) and records.dtype == RECORD_DTYPE
+    assert os.path.getsize(path) == HEADER_SIZE + len(rows) * RECORD_DTYPE.itemsize
+    for name in COLUMNS:
+        np.testing.assert_array_equal(records[name], rows[name].to_numpy())
+
+
+def test_partial_record_is_ignored_and_overwritten(tmp_path):
+    rows = path_rows(np.random.default_rng(1), 20)
+    path = str(tmp_path / 'run.nbev')
+    with EventWriter(path) as writer:
+        writer.append(rows.iloc[:10])
+    with open(path, 'ab') as fh:
+        fh.write(b'\x01' * (RECORD_DTYPE.itemsize // 2))
+    assert len(read_events(path)) == 10
+    with EventWriter(path) as writer:
+        writer.append(rows.iloc[10:])
+    np.testing.assert_array_equal(read_events(path)['end-x'], rows['end-x'].to_numpy())
+
+
+def test_bad_headers_are_rejected(tmp_path):
+    path = tmp_path / 'bad.nbev'
+    path.write_bytes(b'NBEV')
+    with pytest.raises(ValueError, match='truncated'):
+        read_events(str(path))
+    path.write_bytes(b'\0' * HEADER_SIZE)
+    with pytest.raises(ValueError, match='not a bacteria event file'):
+        read_events(str(path))
+    empty = str(tmp_path / 'empty.nbev')
+    EventWriter(empty).close()
+    assert len(read_events(empty)) == 0 and latest_events(read_events(empty)).empty
+
+
+def test_converted_csv_loads_like_the_csv(tmp_path):
+    rows = path_rows(np.random.default_rng(2), 300)
+    csv = str(tmp_path / '1-bacteria-path-data.csv')
+    with open(csv, 'w') as fh:
+        rows.iloc[:100].to_csv(fh, index=False)
+        rows.iloc[100:].to_csv(fh, index=False)
+    expected = load_path_data(csv, cache=False)
+    latest = convert_csv(csv)
+    assert latest.endswith('1-bacteria-path-data.nbev')
+    pd.testing.assert_frame_equal(load_path_data(latest), expected)
+    full = convert_csv(csv, str(tmp_path / 'full.nbev'), latest=False)
+    assert len(read_events(full)) == len(rows)
+    pd.testing.assert_frame_equal(load_path_data(full), expected)
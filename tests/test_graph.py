@@ -0,0 +1,66 @@
+import itertools
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from netbimas.graph import (clique_adjacency, endpoint_codes, shared_endpoint_adjacency,
+                            shared_endpoint_graph, to_networkx)
+
+
+def pairwise_graph(df, decimals=3):
+    # The scripts' original build: one clique per rounded endpoint
+    G = nx.Graph()
+    groups = {}
+    for _, row in df.iterrows():
+        name = f"Cell-{int(row['who'])}"
+        G.add_node(name)
+        groups.setdefault((round(row['end-x'], decimals), round(row['end-y'], decimals)), []).append(name)
+    for members in groups.values():
+        G.add_edges_from(itertools.combinations(members, 2), weight=1.0)
+    return G
+
+
+def random_endpoints(rng, n, spots=10):
+    spots = rng.uniform(-20, 20, size=(spots, 2))
+    chosen = spots[rng.integers(0, len(spots), n)] + rng.uniform(-4e-4, 4e-4, size=(n, 2))
+    return pd.DataFrame({'who': np.arange(n), 'end-x': chosen[:, 0], 'end-y': chosen[:, 1]})
+
+
+def test_endpoint_codes_group_rounded_endpoints():
+    codes = endpoint_codes([0.0001, 0.0004, 1.0, 0.0], [2.0, 2.0, 2.0, 2.0])
+    assert codes.dtype == np.int32
+    assert codes[0] == codes[1] == codes[3] != codes[2]
+
+
+def test_clique_adjacency_is_canonical_csr():
+    rng = np.random.default_rng(0)
+    for n in (0, 1, 2, 10, 200):
+        codes = rng.integers(0, max(n // 3, 1), n)
+        A = clique_adjacency(codes)
+        assert A.shape == (n, n)
+        assert A.has_canonical_format
+        assert (A != A.T).nnz == 0
+        dense = (codes[:, None] == codes[None, :]) & ~np.eye(n, dtype=bool)
+        np.testing.assert_array_equal(A.toarray(), dense.astype(float))
+
+
+def test_shared_endpoint_graph_matches_pairwise_build():
+    rng = np.random.default_rng(1)
+    for n in (1, 5, 60, 300):
+        df = random_endpoints(rng, n)
+        expected = pairwise_graph(df)
+        G = shared_endpoint_graph(df)
+        assert set(G.nodes) == set(expected.nodes)
+        assert {frozenset(e) for e in G.edges} == {frozenset(e) for e in expected.edges}
+        A = shared_endpoint_adjacency(df)
+        assert A.nnz == 2 * expected.number_of_edges()
+
+
+def test_to_networkx_names_and_attributes():
+    A = sp.csr_array(np.array([[0, 1, 0], [1, 0, 0], [0, 0, 0]], dtype=float))
+    G = to_networkx(A, [7, 8, 9], quadrant=np.array(['Q1', 'Q1', 'Q3']))
+    assert list(G.nodes) == ['Cell-7', 'Cell-8', 'Cell-9']
+    assert G.nodes['Cell-9']['quadrant'] == 'Q3'
+    assert list(G.edges(data='weight')) == [('Cell-7', 'Cell-8', 1.0)]
@@ -0,0 +1,50 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from netbimas import kernels
+from netbimas.nulls import chung_lu_edges
+
+
+def random_graph(rng, n):
+    return nx.gnm_random_graph(n, int(rng.integers(0, 2 * n + 1)), seed=int(rng.integers(2 ** 31)))
+
+
+def test_kernels_match_networkx():
+    rng = np.random.default_rng(0)
+    for n in (1, 2, 5, 30, 80):
+        for _ in range(5):
+            G = random_graph(rng, n)
+            A = nx.to_scipy_sparse_array(G, nodelist=range(n), weight=None)
+            if n:
+                assert kernels.average_clustering(A) == pytest.approx(nx.average_clustering(G), abs=1e-12)
+                clustering = nx.clustering(G)
+                np.testing.assert_allclose(kernels.clustering(A), [clustering[u] for u in range(n)], atol=1e-12)
+            assert kernels.global_efficiency(A) == pytest.approx(nx.global_efficiency(G), abs=1e-12)
+            if n:
+                largest = max(nx.connected_components(G), key=len)
+                assert set(kernels.largest_component(A).tolist()) == largest
+                assert kernels.lcc_global_efficiency(A) == pytest.approx(
+                    nx.global_efficiency(G.subgraph(largest)), abs=1e-12)
+
+
+@pytest.mark.parametrize('n, replicates', [(1, 60), (7, 60), (40, 60), (300, 8)])
+def test_ensemble_metrics_match_networkx(n, replicates):
+    rng = np.random.default_rng(n)
+    degrees = rng.integers(0, 6, n)
+    edges, offsets = chung_lu_edges(degrees, replicates, rng)
+    out = kernels.ensemble_metrics(edges, offsets, n)
+    assert out.shape == (replicates, 2)
+    for r in range(replicates):
+        G = nx.Graph()
+        G.add_nodes_from(range(n))
+        G.add_edges_from((u, v) for u, v in edges[offsets[r]:offsets[r + 1]].tolist() if u != v)
+        largest = G.subgraph(max(nx.connected_components(G), key=len))
+        assert out[r, 0] == pytest.approx(nx.average_clustering(G), abs=1e-12)
+        assert out[r, 1] == pytest.approx(nx.global_efficiency(largest), abs=1e-12)
+
+
+def test_ensemble_metrics_without_nodes():
+    out = kernels.ensemble_metrics(np.zeros((0, 2), dtype=np.int64), np.zeros(4, dtype=np.int64), 0)
+    assert out.shape == (3, 2)
+    assert np.isnan(out[:, 0]).all()
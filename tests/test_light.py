@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from netbimas.light import LightField, contribution, light_field
+
+
+def generate_field(lights, world=16):
+    # generate-field: every patch against every source
+    field = np.zeros((2 * world + 1, 2 * world + 1))
+    for row, py in enumerate(range(-world, world + 1)):
+        for col, px in enumerate(range(-world, world + 1)):
+            for x, y, intensity in lights:
+                d2 = (px - x) ** 2 + (py - y) ** 2
+                field[row, col] += intensity * 500 if d2 == 0 else intensity / d2
+    return field
+
+
+def test_field_matches_the_patch_loop():
+    lights = [(15, 15, 5), (-15, -15, 5), (2.5, -3, 8)]
+    np.testing.assert_allclose(light_field(lights), generate_field(lights), rtol=1e-12)
+    with pytest.raises(ValueError):
+        contribution(0, 0, 1)[0, 0] = 1.0
+
+
+def test_incremental_updates_match_a_full_recompute():
+    rng = np.random.default_rng(0)
+    field = LightField([(15, 15, 5)])
+    for _ in range(200):
+        if field.sources and rng.random() < 0.4:
+            field.remove(rng.choice(list(field.sources)))
+        else:
+            field.add(int(rng.integers(-16, 17)), int(rng.integers(-16, 17)), int(rng.integers(1, 10)))
+        np.testing.assert_allclose(field.values, light_field(field.lights), rtol=1e-9, atol=1e-9)
+    for source in list(field.sources):
+        field.remove(source)
+    assert not field.values.any()
+
+
+def test_lookups():
+    field = LightField([(3, -2, 5)], world=4)
+    assert field.at_patch(3.4, -2.4) == 2500
+    assert field.at_patch(4.6, 0.0) == -np.inf
+    np.testing.assert_allclose(field.at_patch([-4, 0], [4, 0]), [field.values[8, 0], field.values[4, 4]])
+    assert field.bilinear(3.0, -2.0) == pytest.approx(2500)
+    assert field.bilinear(3.5, -2.0) == pytest.approx((field.values[2, 7] + field.values[2, 8]) / 2)
+    assert field.bilinear(99.0, 0.0) == pytest.approx(field.values[4, 8])
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from netbimas.loader import COLUMNS, load_path_data, read_sidecar, sidecar_path
+from netbimas.synthetic import synthetic_path_data, write_path_csv
+
+
+def reference_load(path):
+    # The read_csv / drop headers / to_numeric / dropna / sort / dedup block
+    # the scripts used before the shared loader
+    df = pd.read_csv(path)
+    df = df[df['who'] != 'who']
+    df[COLUMNS] = df[COLUMNS].apply(pd.to_numeric, errors='coerce')
+    df = df.dropna(subset=COLUMNS)
+    return df.sort_values(by='tick').drop_duplicates(subset='who', keep='last').reset_index(drop=True)
+
+
+def write_csv(tmp_path, n, seed, name='path.csv'):
+    return write_path_csv(str(tmp_path / name), synthetic_path_data(n, seed=seed), headers=4)
+
+
+def test_load_matches_the_pandas_pipeline(tmp_path):
+    path = write_csv(tmp_path, 400, seed=0)
+    df = load_path_data(path, cache=False, chunksize=333)
+    expected = reference_load(path)
+    assert list(df.columns) == COLUMNS
+    assert df['who'].dtype == np.int64 and df['tick'].dtype == np.int64
+    np.testing.assert_array_equal(df['who'].to_numpy(), expected['who'].to_numpy())
+    np.testing.assert_allclose(df[COLUMNS].to_numpy(dtype=float), expected[COLUMNS].to_numpy(dtype=float))
+
+
+def test_sidecar_is_reused_while_the_file_is_unchanged(tmp_path):
+    path = write_csv(tmp_path, 200, seed=1)
+    first = load_path_data(path)
+    assert os.path.exists(sidecar_path(path))
+    cached = read_sidecar(path)
+    pd.testing.assert_frame_equal(cached, first)
+    pd.testing.assert_frame_equal(load_path_data(path), first)
+
+
+def test_sidecar_is_invalidated_by_size_and_mtime(tmp_path):
+    path = write_csv(tmp_path, 200, seed=2)
+    load_path_data(path)
+
+    # Same size, new mtime
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert read_sidecar(path) is None
+    load_path_data(path)
+    assert read_sidecar(path) is not None
+
+    # Appended rows change the size and the result
+    extra = synthetic_path_data(5, seed=3)
+    extra['who'] += 10_000
+    with open(path, 'a') as fh:
+        extra.to_csv(fh, header=False, index=False)
+    assert read_sidecar(path) is None
+    df = load_path_data(path)
+    assert len(df) == 205
+    pd.testing.assert_frame_equal(df, load_path_data(path, cache=False))
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'empty.csv'
+    path.write_text(','.join(COLUMNS) + '\n')
+    df = load_path_data(str(path))
+    assert df.empty and list(df.columns) == COLUMNS
@@ -0,0 +1,81 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from netbimas.nulls import (chung_lu_degree_chunk, chung_lu_edges, degree_counts, edge_degrees,
+                            endpoint_null_chunk, random_endpoint_null, star_efficiency)
+
+
+def starts(rng, n):
+    return pd.DataFrame({'start-x': rng.uniform(-20, 20, n), 'start-y': rng.uniform(-20, 20, n)})
+
+
+def weighted_star(weights):
+    G = nx.Graph()
+    G.add_weighted_edges_from(('Nest', i, w) for i, w in enumerate(weights))
+    n = G.number_of_nodes()
+    lengths = dict(nx.all_pairs_dijkstra_path_length(G))
+    return sum(1 / d for u in G for v, d in lengths[u].items() if u != v) / (n * (n - 1))
+
+
+def test_star_efficiency_matches_dijkstra():
+    rng = np.random.default_rng(0)
+    weights = rng.uniform(0.5, 30, size=(4, 9))
+    for row, value in zip(weights, star_efficiency(weights)):
+        assert value == pytest.approx(weighted_star(row), rel=1e-12)
+
+
+def test_endpoint_null_chunk_matches_a_replicate_loop():
+    rng = np.random.default_rng(1)
+    start_xy = starts(rng, 12).to_numpy()
+    out = endpoint_null_chunk(5, np.random.default_rng(7), start_xy)
+    replay = np.random.default_rng(7)
+    for value in out:
+        end_xy = replay.uniform(-20, 20, size=(1, 12, 2))[0]
+        assert value == pytest.approx(weighted_star(np.hypot(*(end_xy - start_xy).T)), rel=1e-12)
+
+
+def test_unweighted_endpoint_null_is_the_plain_star():
+    df = starts(np.random.default_rng(2), 8)
+    G = nx.star_graph(8)
+    np.testing.assert_allclose(random_endpoint_null(df, n=4), nx.global_efficiency(G))
+
+
+def test_weighted_endpoint_null_is_reproducible():
+    df = starts(np.random.default_rng(3), 10)
+    a = random_endpoint_null(df, n=50, seed=5, weighted=True, chunk_size=20)
+    b = random_endpoint_null(df, n=50, seed=5, weighted=True, chunk_size=20)
+    assert a.shape == (50,)
+    np.testing.assert_array_equal(a, b)
+
+
+def test_chung_lu_edges_are_simple_and_grouped():
+    rng = np.random.default_rng(4)
+    degrees = rng.integers(0, 8, 40)
+    edges, offsets = chung_lu_edges(degrees, 30, rng)
+    assert edges.dtype == np.int32 and offsets[0] == 0 and offsets[-1] == len(edges)
+    for r in range(30):
+        block = edges[offsets[r]:offsets[r + 1]]
+        assert (block[:, 0] != block[:, 1]).all()
+        assert len({frozenset(e) for e in block.tolist()}) == len(block)
+    assert chung_lu_edges(np.zeros(5), 3, rng)[0].shape == (0, 2)
+
+
+def test_chung_lu_degrees_follow_the_expected_sequence():
+    degrees = np.array([12, 9, 6, 6, 4, 3, 2, 2, 1, 1] + [0] * 10 + [3] * 30)
+    edges, offsets = chung_lu_edges(degrees, 2000, np.random.default_rng(5))
+    realized = edge_degrees(edges, offsets, len(degrees)).mean(axis=0)
+    # Weights are below sqrt(sum(w)), so every probability is under 1 and the
+    # expected degree of u is w_u * (1 - w_u / sum(w))
+    expected = degrees * (1 - degrees / degrees.sum())
+    np.testing.assert_allclose(realized, expected, atol=0.15)
+
+
+def test_degree_chunk_counts_every_node():
+    degrees = np.array([3, 3, 2, 2, 1, 1])
+    moments = chung_lu_degree_chunk(200, np.random.default_rng(6), degrees)
+    assert moments.count == 200
+    assert moments.mean.sum() == pytest.approx(len(degrees))
+    counts = degree_counts(np.array([[0, 2, 2, 1]]))
+    np.testing.assert_array_equal(counts, [[1, 1, 2]])
@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from netbimas import profiling
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def square(x):
+    with profiling.stage('square', 'test', items=1):
+        return x * x
+
+
+def test_disabled_profiling_leaves_functions_alone():
+    if profiling.enabled():
+        pytest.skip("NETBIMAS_PROFILE is set")
+    fn = profiling.profiled('test')(square)
+    assert fn is square
+    assert profiling.captured(square) is square
+    assert profiling.collect(4) == 4
+    with profiling.stage('noop') as record:
+        record.items = 3
+
+
+def test_captured_events_are_collected(monkeypatch):
+    monkeypatch.setattr(profiling, '_events', [])
+    fn = profiling.profiled('outer', name='call', items=lambda result: result)(square)
+    assert fn(3) == 9
+    result, events = profiling.captured(square)(5)
+    assert result == 25 and [e['name'] for e in events] == ['square']
+    assert [e['name'] for e in profiling._events] == ['square', 'call']
+    assert profiling.collect((result, events)) == 25
+    rows = profiling.summary()
+    assert rows[('test', 'square')]['calls'] == 2 and rows[('test', 'square')]['items'] == 2
+    assert rows[('outer', 'call')]['items'] == 9
+    assert len(profiling.format_summary(rows).splitlines()) == 3
+
+
+def test_summary_totals():
+    events = [{'name': 'a', 'cat': 'load', 'dur': 2e6, 'args': {'cpu_ms': 1000.0, 'items': 10}},
+              {'name': 'a', 'cat': 'load', 'dur': 1e6, 'args': {'cpu_ms': 500.0, 'peak_rss_mb': 80.0}},
+              {'name': 'b', 'cat': 'metric', 'dur': 5e6, 'args': {'cpu_ms': 4000.0, 'peak_rss_mb': 50.0}}]
+    rows = profiling.summary(events)
+    assert list(rows) == [('metric', 'b'), ('load', 'a')]
+    assert rows[('load', 'a')] == {'calls': 2, 'wall_s': 3.0, 'cpu_s': 1.5, 'peak_rss_mb': 80.0, 'items': 10}
+    assert rows[('metric', 'b')]['items'] is None
+
+
+def test_profiled_run_writes_a_trace_with_worker_events(tmp_path):
+    rng = np.random.default_rng(0)
+    for run in (1, 2, 3):
+        end = np.round(rng.uniform(-20, 20, size=(50, 2)), 0)
+        pd.DataFrame({'who': range(50), 'tick': 1, 'start-x': 0.0, 'start-y': 0.0, 'end-x': end[:, 0],
+                      'end-y': end[:, 1], 'total-distance': 1.0, 'straight-line': 1.0, 'efficiency': 1.0}
+                     ).to_csv(tmp_path / f'{run}-bacteria-path-data.csv', index=False)
+    trace = tmp_path / 'trace.json'
+    code = ("import sys; from netbimas.catalog import compare_runs; "
+            "compare_runs(sys.argv[1], workers=2, n_nulls=10)")
+    env = dict(os.environ, NETBIMAS_PROFILE=str(trace))
+    out = subprocess.run([sys.executable, '-c', code, str(tmp_path)], cwd=ROOT, env=env, capture_output=True,
+                         text=True, check=True)
+    assert 'events written to' in out.stderr
+    data = json.loads(trace.read_text())
+    events = data['traceEvents']
+    assert {'build', 'metric', 'null'} <= {e['cat'] for e in events}
+    assert len({e['pid'] for e in events}) >= 2
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in events)
+    metric = [row for row in data['summary'] if row['category'] == 'metric']
+    assert metric[0]['calls'] == 3
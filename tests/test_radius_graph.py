@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from netbimas.graph import clique_adjacency, endpoint_codes, radius_adjacency, radius_endpoint_adjacency
+
+
+def brute_force(x, y, radius, groups=None):
+    d = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :])
+    linked = (d <= radius) & ~np.eye(x.size, dtype=bool)
+    if groups is not None:
+        linked &= groups[:, None] == groups[None, :]
+    return linked, d
+
+
+def test_radius_adjacency_matches_brute_force():
+    rng = np.random.default_rng(0)
+    for n in (0, 1, 2, 50, 400):
+        x, y = rng.uniform(-20, 20, (2, n))
+        groups = rng.integers(0, 3, n)
+        for radius in (0.5, 3.0):
+            A = radius_adjacency(x, y, radius)
+            linked, d = brute_force(x, y, radius)
+            assert A.has_canonical_format
+            np.testing.assert_array_equal(A.toarray() > 0, linked)
+            np.testing.assert_allclose(A.toarray()[linked], 1 / (d[linked] + 1e-6))
+            B = radius_adjacency(x, y, radius, groups=groups, weight=None)
+            np.testing.assert_array_equal(B.toarray(), brute_force(x, y, radius, groups)[0].astype(float))
+    with pytest.raises(ValueError, match='unknown weight'):
+        radius_adjacency([0, 1], [0, 0], 2, weight='distance')
+
+
+def test_zero_radius_on_rounded_endpoints_is_the_clique_graph():
+    rng = np.random.default_rng(1)
+    spots = np.round(rng.uniform(-20, 20, size=(15, 2)), 3)
+    end = spots[rng.integers(0, 15, 300)]
+    A = radius_adjacency(end[:, 0], end[:, 1], 0, weight=None)
+    C = clique_adjacency(endpoint_codes(end[:, 0], end[:, 1]))
+    assert (A != C).nnz == 0
+
+
+def test_same_quadrant_links():
+    df = pd.DataFrame({'end-x': [1.0, 1.5, -1.0, -1.5, 0.0, 0.2], 'end-y': [1.0, 1.0, -1.0, -1.0, 0.8, -0.3]})
+    A = radius_endpoint_adjacency(df, 1.2, weight=None).toarray()
+    Q = radius_endpoint_adjacency(df, 1.2, same_quadrant=True, weight=None).toarray()
+    # Cells 4 and 5 sit on no quadrant, so they only link to each other
+    assert A[0, 4] == 1 and Q[0, 4] == 0
+    assert Q[0, 1] == Q[2, 3] == Q[4, 5] == 1
+    assert A.sum() == 8 and Q.sum() == 6
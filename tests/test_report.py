@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from netbimas.report import FIGURES, NULL_FIGURES, render_report, render_run
+
+
+def write_run(path, seed=0, n=60):
+    rng = np.random.default_rng(seed)
+    spots = np.round(rng.uniform(-20, 20, size=(8, 2)), 3)
+    end = spots[rng.integers(0, 8, n)]
+    pd.DataFrame({'who': np.arange(n), 'tick': np.arange(n), 'start-x': 0.0, 'start-y': 0.0,
+                  'end-x': end[:, 0], 'end-y': end[:, 1], 'total-distance': 30.0,
+                  'straight-line': 20.0, 'efficiency': 0.6}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_render_run_skips_unchanged_figures(tmp_path):
+    csv = write_run(tmp_path / '1-bacteria-path-data.csv')
+    out = str(tmp_path / 'report')
+    options = {'n_nulls': 20, 'dpi': 30}
+    assert set(render_run(csv, out, **options).values()) == {'rendered'}
+    assert sorted(os.listdir(out)) == sorted([f'{name}.png' for name in FIGURES] + ['report.json'])
+    assert set(render_run(csv, out, **options).values()) == {'skipped'}
+
+    # Only the null figures depend on the replicate count
+    status = render_run(csv, out, n_nulls=30, dpi=30)
+    assert {name for name, s in status.items() if s == 'rendered'} == set(NULL_FIGURES)
+
+    os.remove(os.path.join(out, 'network.png'))
+    assert render_run(csv, out, n_nulls=30, dpi=30)['network'] == 'rendered'
+    assert set(render_run(csv, out, n_nulls=30, dpi=30, force=True).values()) == {'rendered'}
+
+    write_run(csv, seed=1)
+    assert set(render_run(csv, out, n_nulls=30, dpi=30, figures=['degree_distribution']).values()) == \
+        {'rendered'}
+    with pytest.raises(ValueError, match='unknown figure'):
+        render_run(csv, out, figures=['pie_chart'])
+
+
+def test_render_report_over_runs(tmp_path):
+    runs = {run: write_run(tmp_path / f'{run}-bacteria-path-data.csv', seed=run) for run in (1, 2)}
+    options = {'figures': ['network', 'degree_distribution'], 'dpi': 30}
+    status = render_report(runs, str(tmp_path / 'report'), workers=2, **options)
+    assert status.index.tolist() == [1, 2]
+    assert (status == 'rendered').all().all()
+    assert os.path.exists(tmp_path / 'report' / 'run-2' / 'network.png')
+    again = render_report(str(tmp_path), str(tmp_path / 'report'), workers=1, **options)
+    assert (again == 'skipped').all().all()
@@ -0,0 +1,30 @@
+import numpy as np
+
+from netbimas.sequential import sequential_test
+
+
+def uniform_chunk(size, rng):
+    return rng.random(size)
+
+
+def _batches(seed):
+    seen = []
+    # p stays near alpha, so the test runs to max_replicates
+    test = sequential_test(uniform_chunk, 0.5, alternative='greater', alpha=0.5, precision=0,
+                           min_replicates=100, max_replicates=400, seed=seed, on_batch=seen.append,
+                           chunk_size=30)
+    return test, seen
+
+
+def test_batches_draw_new_replicates():
+    for seed in (0, None):
+        test, seen = _batches(seed)
+        assert [len(values) for values in seen] == [100, 100, 200]
+        assert not np.isin(seen[1], seen[0]).any()
+        assert not np.isin(seen[2], np.concatenate(seen[:2])).any()
+        assert test['n'] == len(np.unique(np.concatenate(seen))) == 400
+
+
+def test_seeded_test_is_reproducible():
+    (_, first), (_, second) = _batches(7), _batches(7)
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
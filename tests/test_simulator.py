@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from netbimas.loader import load_path_data
+from netbimas.simulator import THRESHOLD, Simulation, forward, inside, patch_index, simulate
+
+
+def by_who(df):
+    return df.sort_values('who').reset_index(drop=True)
+
+
+def test_forward_moves_in_unit_jumps_and_stops_at_walls():
+    x, y = forward([0.0, 0.0, 15.0], [0.0, 0.0, 0.0], [90.0, 0.0, 90.0], [2.5, -1.0, 3.0])
+    np.testing.assert_allclose(x, [2.5, 0.0, 16.0])
+    np.testing.assert_allclose(y, [0.0, -1.0, 0.0], atol=1e-12)
+    assert inside(x, y).all()
+    assert not inside(16.5, 0.0)
+
+
+def test_patch_index_rounds_to_the_nearest_patch():
+    assert patch_index(-16.0, -16.0) == 0
+    assert patch_index(16.4, -15.6) == 32
+    assert patch_index(0.0, 0.0) == 16 * 33 + 16
+
+
+def test_runs_are_reproducible():
+    a, b = simulate(150, seed=3), simulate(150, seed=3)
+    pd.testing.assert_frame_equal(a.path_data(), b.path_data())
+    np.testing.assert_array_equal(a.trail, b.trail)
+    assert not simulate(150, seed=4).path_data().equals(a.path_data())
+
+
+def test_saved_cells_end_in_the_light():
+    sim = simulate(300, seed=1, log=True)
+    df = sim.path_data()
+    assert len(df) == sim.finished.sum() > 0
+    assert (sim.light.ravel()[patch_index(df['end-x'], df['end-y'])] > THRESHOLD).all()
+    assert df['who'].is_unique and (df['who'] >= 1).all()
+    np.testing.assert_allclose(df['straight-line'], np.hypot(df['end-x'] - df['start-x'],
+                                                             df['end-y'] - df['start-y']))
+
+
+def test_log_matches_the_latest_rows(tmp_path):
+    sim = simulate(300, seed=2, log=True)
+    path = str(tmp_path / '1-bacteria-path-data.csv')
+    sim.to_csv(path)
+    records = pd.read_csv(path)
+    assert len(records) > len(sim.path_data())
+    pd.testing.assert_frame_equal(by_who(load_path_data(path, cache=False)), by_who(sim.path_data()),
+                                  check_dtype=False)
+
+
+def test_population_cap_and_spawning():
+    sim = Simulation(seed=5, max_population=30, spawn_interval=10).run(400)
+    assert sim.n <= 30 + 400 // 10
+    grown = sim.generation > 0
+    assert grown.any()
+    assert (sim.initial[grown] != np.flatnonzero(grown)).all()
+    assert Simulation(seed=0, initial_cells=0).run(5).n == 0
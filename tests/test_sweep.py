@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+import pytest
+
+from netbimas.catalog import analyze_path_data
+from netbimas.simulator import simulate
+from netbimas.sweep import _part_path, expand_grid, point_id, run_point, run_sweep
+
+pytest.importorskip('pyarrow')
+
+GRID = {'seed': [1, 2], 'threshold': [200, 250], 'spawn_interval': [25]}
+
+
+def test_expand_grid():
+    points = expand_grid(GRID)
+    assert points[0] == {'spawn_interval': 25, 'threshold': 200, 'seed': 1}
+    assert len(points) == 4 and len({point_id(p) for p in points}) == 4
+    assert point_id({'lights': [(15, 15, 5)]}) == point_id({'lights': [[15.0, 15.0, 5.0]]})
+    assert point_id(points[0]) != point_id(points[0], ticks=10)
+    with pytest.raises(ValueError, match='unknown sweep parameters'):
+        expand_grid({'speed': [1]})
+
+
+def test_run_point_uses_the_simulated_path_data():
+    row = run_point({'seed': 3}, ticks=200)
+    df = simulate(200, seed=3).path_data()
+    metrics, _ = analyze_path_data(df)
+    assert row['finished'] == len(df)
+    assert row['global_eff'] == metrics['global_eff']
+    assert row['mean_efficiency'] == df['efficiency'].mean()
+
+
+def test_sweep_resumes_and_matches_parallel(tmp_path):
+    serial = run_sweep(GRID, str(tmp_path / 'serial'), ticks=150, workers=1)
+    parallel = run_sweep(GRID, str(tmp_path / 'parallel'), ticks=150, workers=2)
+    assert len(serial) == 4
+    pd.testing.assert_frame_equal(serial, parallel)
+
+    out_dir = str(tmp_path / 'serial')
+    points = expand_grid(GRID)
+    dropped = _part_path(out_dir, point_id(points[1], 150))
+    kept = _part_path(out_dir, point_id(points[0], 150))
+    os.remove(dropped)
+    os.utime(kept, ns=(1, 1))
+    resumed = run_sweep(GRID, out_dir, ticks=150, workers=1)
+    assert os.path.exists(dropped) and os.stat(kept).st_mtime_ns == 1
+    pd.testing.assert_frame_equal(resumed, serial)
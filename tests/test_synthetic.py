@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from netbimas.benchmark import benchmark_file, regressions
+from netbimas.loader import COLUMNS, load_path_data
+from netbimas.synthetic import synthetic_path_data, write_path_csv, write_synthetic_csv
+
+
+def test_synthetic_rows_follow_the_path_data_format():
+    rows = synthetic_path_data(500, duplication=3.0, cluster_size=4.0, seed=0)
+    assert list(rows.columns) == COLUMNS
+    assert rows['who'].nunique() == 500
+    assert (np.diff(rows['tick'].to_numpy()) >= 0).all()
+    latest = rows.groupby('who').tail(1)
+    assert (latest.groupby('who')['tick'].max() == rows.groupby('who')['tick'].max()).all()
+    # Cells sharing an endpoint
+    assert latest.groupby(['end-x', 'end-y']).size().mean() > 1.5
+
+
+def test_written_file_loads_as_latest_rows(tmp_path):
+    rows = synthetic_path_data(300, seed=1)
+    path = write_path_csv(str(tmp_path / 'synthetic.csv'), rows, headers=5)
+    with open(path) as fh:
+        assert sum(line.startswith('who,') for line in fh) == 5
+    df = load_path_data(path, cache=False)
+    expected = rows.groupby('who').tail(1).sort_values(['tick', 'who'])
+    assert len(df) == 300
+    np.testing.assert_allclose(df.sort_values('who')[['end-x', 'end-y']].to_numpy(),
+                               expected.sort_values('who')[['end-x', 'end-y']].to_numpy())
+
+
+def test_no_agents_gives_an_empty_file(tmp_path):
+    rows = synthetic_path_data(0, seed=0)
+    assert list(rows.columns) == COLUMNS
+    assert rows.empty
+    path = write_synthetic_csv(str(tmp_path / 'empty.csv'), 0)
+    assert load_path_data(path, cache=False).empty
+
+
+def test_benchmark_stages_and_regressions(tmp_path):
+    path = write_synthetic_csv(str(tmp_path / 'bench.csv'), 200, seed=2)
+    stages = benchmark_file(path, n_nulls=5, memory=False)
+    assert {'load_clean', 'dedup', 'load_sidecar', 'graph_build', 'chung_lu_metrics'} <= set(stages)
+    assert all(result['seconds'] >= 0 and result['peak_mb'] is None for result in stages.values())
+
+    dataset = {'agents': 200}
+    history = [
+        {'dataset': dataset, 'commit': 'a', 'stages': {'load': {'seconds': 1.0}, 'fast': {'seconds': 0.001}}},
+        {'dataset': dataset, 'commit': 'b', 'stages': {'load': {'seconds': 2.0}, 'fast': {'seconds': 0.005}}},
+    ]
+    slower = regressions(history)
+    assert isinstance(slower, pd.DataFrame)
+    assert slower['stage'].tolist() == ['load']
+    assert slower['commits'].tolist() == ['a..b']
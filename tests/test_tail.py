@@ -0,0 +1,59 @@
+import networkx as nx
+import pandas as pd
+import pytest
+
+from netbimas.loader import load_path_data
+from netbimas.synthetic import synthetic_path_data
+from netbimas.tail import PathTail
+
+
+def csv_text(rows, header=True):
+    return rows.to_csv(header=header, index=False)
+
+
+def edge_set(G):
+    return {frozenset(edge) for edge in G.edges}
+
+
+def test_tail_matches_a_full_reload(tmp_path):
+    path = tmp_path / 'live.csv'
+    rows = synthetic_path_data(300, duplication=3.0, seed=0)
+    # Two setups: the header is repeated half way through
+    text = csv_text(rows.iloc[:400]) + csv_text(rows.iloc[400:])
+    path.write_text('')
+    tail = PathTail(str(path))
+    # Appends in uneven pieces, most ending in a partial line
+    cuts = [0, 57, 1000, 5003, len(text) // 2, len(text) - 11, len(text)]
+    for start, stop in zip(cuts[:-1], cuts[1:]):
+        with open(path, 'a') as fh:
+            fh.write(text[start:stop])
+        tail.poll()
+        complete = text[:text.rfind('\n', 0, stop) + 1]
+        (tmp_path / 'prefix.csv').write_text(complete)
+        expected = load_path_data(str(tmp_path / 'prefix.csv'), cache=False)
+        pd.testing.assert_frame_equal(tail.table(), expected)
+
+        G = nx.Graph()
+        G.add_nodes_from(f"Cell-{w}" for w in expected['who'])
+        for _, group in expected.groupby([expected['end-x'].round(3), expected['end-y'].round(3)]):
+            nodes = [f"Cell-{w}" for w in group['who']]
+            G.add_edges_from((u, v) for j, u in enumerate(nodes) for v in nodes[j + 1:])
+        assert set(tail.graph) == set(G)
+        assert edge_set(tail.graph) == edge_set(G)
+        metrics = tail.metrics()
+        if len(G) > 1:
+            assert metrics['global_eff'] == pytest.approx(nx.global_efficiency(G), abs=1e-12)
+            assert metrics['clustering'] == pytest.approx(nx.average_clustering(G), abs=1e-12)
+            assert metrics['avg_degree'] == pytest.approx(2 * G.number_of_edges() / len(G), abs=1e-12)
+
+
+def test_truncated_file_starts_over(tmp_path):
+    path = tmp_path / 'live.csv'
+    path.write_text(csv_text(synthetic_path_data(50, seed=1)))
+    tail = PathTail(str(path))
+    tail.poll()
+    replacement = synthetic_path_data(10, seed=2)
+    path.write_text(csv_text(replacement))
+    tail.poll()
+    assert sorted(tail.table()['who']) == sorted(replacement['who'].unique())
+    assert tail.graph.number_of_nodes() == 10
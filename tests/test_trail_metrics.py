@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import spearmanr
+
+from netbimas.light import light_field
+from netbimas.trail_metrics import quadrant_masks, summarize_runs, trail_summary
+from netbimas.trails import TrailRecorder
+
+LIGHTS = [(4, 4, 5), (-4, -4, 5)]
+
+
+def random_frames(seed, n=25, side=9):
+    return np.random.default_rng(seed).gamma(0.3, 1.0, size=(n, side, side)).astype(np.float32)
+
+
+def test_quadrant_masks_skip_the_axes():
+    masks = quadrant_masks((5, 5))
+    assert sum(mask.sum() for mask in masks.values()) == 16
+    assert masks['Q1'][4, 4] and masks['Q3'][0, 0] and masks['Q2'][4, 0] and masks['Q4'][0, 4]
+
+
+def test_summary_matches_whole_array_statistics():
+    frames = random_frames(0)
+    ticks = 10 + 2 * np.arange(len(frames))
+    light = light_field(LIGHTS, 4)
+    summary = trail_summary(frames, ticks, light=light, chunk_frames=4)
+    data = frames.astype(np.float64)
+    np.testing.assert_allclose(summary['mean'], data.mean(axis=0))
+    np.testing.assert_array_equal(summary['max'], data.max(axis=0))
+
+    hit = data >= 1.0
+    first = np.where(hit.any(axis=0), ticks[hit.argmax(axis=0)], np.nan)
+    np.testing.assert_array_equal(summary['first_saturation'], first)
+    assert summary['saturation_tick'] == np.nanmin(first)
+
+    series = summary['series']
+    assert series.index.tolist() == ticks.tolist()
+    np.testing.assert_allclose(series['total_mass'], data.sum(axis=(1, 2)))
+    np.testing.assert_allclose(series['q3_mass'], data[:, quadrant_masks((9, 9))['Q3']].sum(axis=1))
+    for i in (0, 13):
+        assert series['light_corr'].iloc[i] == pytest.approx(
+            np.corrcoef(data[i].ravel(), np.log10(light.ravel()))[0, 1])
+    assert summary['light_correlation'] == pytest.approx(spearmanr(data.mean(axis=0).ravel(), light.ravel())[0])
+
+    whole = trail_summary(frames, ticks, light=light, chunk_frames=1000)
+    pd.testing.assert_frame_equal(whole['series'], series)
+
+
+def test_empty_recording():
+    summary = trail_summary(np.zeros((0, 3, 3), dtype=np.float32))
+    assert summary['frames'] == 0 and np.isnan(summary['saturation_tick'])
+    assert not summary['max'].any()
+
+
+def test_summarize_runs(tmp_path):
+    recordings = {}
+    for run in (1, 2):
+        path = str(tmp_path / f'{run}.nbtr')
+        with TrailRecorder(path, (9, 9), compress=run == 2) as recorder:
+            for tick, frame in enumerate(random_frames(run, n=10 * run)):
+                recorder.record(tick, frame)
+        recordings[run] = path
+    table, heatmaps = summarize_runs(recordings, lights=LIGHTS, chunk_frames=7)
+    assert table.index.tolist() == [1, 2]
+    assert table['trail_frames'].tolist() == [10, 20]
+    shares = table[[f'trail_q{i}_share' for i in range(1, 5)]].sum(axis=1)
+    np.testing.assert_allclose(shares, 1.0)
+    everything = np.concatenate([random_frames(1, n=10), random_frames(2, n=20)]).astype(np.float64)
+    np.testing.assert_allclose(heatmaps['mean'], everything.mean(axis=0))
+    np.testing.assert_array_equal(heatmaps['max'], everything.max(axis=0))
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from netbimas.simulator import Simulation
+from netbimas.trails import (DECODED_SUFFIX, TrailRecorder, decode_zero_runs, encode_zero_runs, read_header,
+                             read_trails)
+
+
+def test_zero_run_coding_roundtrip():
+    rng = np.random.default_rng(0)
+    for size in (0, 1, 7, 500):
+        for density in (0.0, 0.05, 0.5, 1.0):
+            words = np.where(rng.random(size) < density, rng.integers(1, 2 ** 32, size), 0).astype(np.uint32)
+            stream = encode_zero_runs(words)
+            assert stream[-1] == 0
+            np.testing.assert_array_equal(decode_zero_runs(stream, size), words)
+    assert encode_zero_runs(np.zeros(1000, dtype=np.uint32)).size == 2
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_recorded_simulation_roundtrip(tmp_path, compress):
+    path = str(tmp_path / 'trail.nbtr')
+    sim = Simulation(seed=1)
+    expected = []
+    with TrailRecorder(path, sim.trail.shape, every=3, first_tick=2, compress=compress) as recorder:
+        for _ in range(40):
+            tick = sim.ticks
+            sim.step(recorder)
+            if tick >= 2 and (tick - 2) % 3 == 0:
+                expected.append(sim.trail.astype(np.float32))
+    frames, ticks = read_trails(path)
+    assert recorder.frames == len(expected) == 13
+    np.testing.assert_array_equal(ticks, 2 + 3 * np.arange(13))
+    np.testing.assert_array_equal(frames, np.array(expected))
+    assert bool(read_header(path)['flags']) == compress
+    if compress:
+        assert os.path.getsize(path) < 13 * frames[0].nbytes
+        assert os.path.exists(path + DECODED_SUFFIX)
+
+
+def test_compressed_recording_drops_a_partial_frame(tmp_path):
+    path = str(tmp_path / 'trail.nbtr')
+    rng = np.random.default_rng(2)
+    grids = rng.random((4, 5, 6)).astype(np.float32)
+    with TrailRecorder(path, (5, 6), compress=True) as recorder:
+        for tick, grid in enumerate(grids):
+            recorder.record(tick, grid)
+    with open(path, 'r+b') as fh:
+        fh.truncate(os.path.getsize(path) - 8)
+    frames, ticks = read_trails(path)
+    np.testing.assert_array_equal(frames, grids[:3])
+    np.testing.assert_array_equal(ticks, [0, 1, 2])
+
+
+def test_bad_input_is_rejected(tmp_path):
+    with TrailRecorder(str(tmp_path / 'trail.nbtr'), (3, 3)) as recorder:
+        with pytest.raises(ValueError, match='expected 9'):
+            recorder.record(0, np.zeros((4, 4)))
+    other = tmp_path / 'other.nbtr'
+    other.write_bytes(b'NBEV' + b'\0' * 28)
+    with pytest.raises(ValueError, match='not a trail recording'):
+        read_trails(str(other))
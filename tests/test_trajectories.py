@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from netbimas.simulator import Simulation, patch_index
+from netbimas.trajectories import (TrajectoryRecorder, VisitIndex, load_positions, patch_visits,
+                                   shared_path_adjacency, shared_path_network)
+
+
+def recorded_run(ticks=300, seed=1, every=1):
+    sim = Simulation(seed=seed)
+    tracker = TrajectoryRecorder(every=every)
+    sim.run(ticks, tracker=tracker)
+    return sim, tracker
+
+
+def test_recorder_captures_every_cell(tmp_path):
+    sim, tracker = recorded_run(ticks=30, every=4)
+    positions = tracker.positions()
+    assert sorted(positions['tick'].unique()) == list(range(0, 30, 4))
+    last = positions[positions['tick'] == 28]
+    assert len(last) == tracker.samples - len(positions[positions['tick'] < 28])
+    tracker.save(str(tmp_path / 'positions.npz'))
+    pd.testing.assert_frame_equal(load_positions(str(tmp_path / 'positions.npz')), positions)
+
+
+def test_patch_visits_collapse_repeated_patches():
+    positions = pd.DataFrame({'who': [2, 1, 1, 1, 1, 2], 'tick': [0, 3, 0, 1, 2, 1],
+                              'x': [0.0, 0.2, 0.1, 0.3, 1.2, 0.4], 'y': [0.0] * 6})
+    visits = patch_visits(positions)
+    assert visits['who'].tolist() == [1, 1, 1, 2]
+    assert visits['first_tick'].tolist() == [0, 2, 3, 0]
+    assert visits['last_tick'].tolist() == [1, 2, 3, 1]
+    assert visits['samples'].tolist() == [2, 1, 1, 2]
+
+    index = VisitIndex(visits)
+    origin = int(patch_index(0.0, 0.0))
+    assert index.agents_at(origin).tolist() == [1, 2]
+    assert index.agents_at(origin, tick=2).tolist() == []
+    assert index.agents_at(origin + 1).tolist() == [1]
+
+
+def test_shared_path_adjacency_matches_brute_force():
+    sim, tracker = recorded_run()
+    visits = patch_visits(tracker.positions())
+    A, who = shared_path_network(sim, tracker.positions())
+    assert (who == sim.path_data()['who'].to_numpy()).all()
+    patches = {w: set(group) for w, group in visits.groupby('who')['patch']}
+    expected = np.array([[len(patches[a] & patches[b]) if a != b else 0 for b in who] for a in who])
+    np.testing.assert_array_equal(A.toarray(), expected)
+
+    strong = shared_path_adjacency(visits, who, min_shared=5)
+    np.testing.assert_array_equal(strong.toarray(), np.where(expected >= 5, expected, 0))
+    # Cells without visits get empty rows
+    padded = shared_path_adjacency(visits, np.append(who, 10 ** 6))
+    assert padded.shape == (who.size + 1, who.size + 1) and padded[[-1]].nnz == 0